@@ -1,43 +1,60 @@
-import smtplib
-from email.mime.text import MIMEText
-from config.settings import PRICE_CHANGE_ALERT, VOLUME_CHANGE_ALERT
+import threading
+from alerts.rule_engine import AlertRule, RuleEngine
+from alerts.delivery import AlertDispatcher, ConsoleSink, SMTPSink, build_sinks
+from config.settings import PRICE_CHANGE_ALERT, VOLUME_CHANGE_ALERT, ALERT_RULES, ALERT_SINKS
+
+def default_rules():
+    """Global price and volume rules from settings, then the configured overrides"""
+    rules = [
+        AlertRule('price_change', field='price', threshold=PRICE_CHANGE_ALERT),
+        AlertRule('volume_spike', field='volume_24h', threshold=VOLUME_CHANGE_ALERT, direction='up', alert_type='VOLUME_ALERT')
+    ]
+    rules.extend(AlertRule(**rule) for rule in ALERT_RULES)
+    return rules
 
 class AlertSystem:
-    def __init__(self, email_config=None):
+    def __init__(self, email_config=None, engine=None, sinks=None):
         self.email_config = email_config
+        self.engine = engine or RuleEngine(default_rules())
+        # The stream consumer and the polling stage may evaluate at the same time
+        self._lock = threading.Lock()
         
-    def check_price_alerts(self, current_data, historical_data):
-        """Check for significant price changes"""
-        alerts = []
+        if sinks is None:
+            sinks = build_sinks(ALERT_SINKS)
+            if email_config:
+                sinks.append(SMTPSink.from_config(email_config))
+        self.dispatcher = AlertDispatcher(sinks or [ConsoleSink()])
         
-        for coin in current_data:
-            prev_price = historical_data.get(coin['symbol'], {}).get('price', 0)
-            if prev_price > 0:
-                change_pct = ((coin['price'] - prev_price) / prev_price) * 100
-                if abs(change_pct) >= PRICE_CHANGE_ALERT:
-                    alerts.append({
-                        'type': 'PRICE_ALERT',
-                        'symbol': coin['symbol'],
-                        'change': change_pct,
-                        'message': f"{coin['symbol']} price changed by {change_pct:.2f}%"
-                    })
+    def check_alerts(self, current_data, previous_data=None):
+        """Evaluate the rules that apply to each coin; previous values default to the engine's baselines"""
+        with self._lock:
+            return self.engine.evaluate_batch(current_data, previous_data)
+        
+    def set_baselines(self, baselines):
+        """Reset change baselines per symbol, e.g. to the prices stored by the last polling tick"""
+        with self._lock:
+            self.engine.set_baselines(baselines)
+
+    def set_categories(self, categories):
+        """Let category rules find their symbols"""
+        with self._lock:
+            self.engine.set_categories(categories)
         
-        return alerts
+    def check_price_alerts(self, current_data, historical_data):
+        """Check for significant price and volume changes against the previous values"""
+        return self.check_alerts(current_data, historical_data)
     
     def send_alert(self, alert_data):
-        """Send alert via email"""
-        if not self.email_config:
-            print(f"Alert: {alert_data['message']}")
-            return
-            
-        msg = MIMEText(alert_data['message'])
-        msg['Subject'] = f"Crypto Alert: {alert_data['type']}"
-        msg['From'] = self.email_config['from']
-        msg['To'] = self.email_config['to']
+        """Queue an alert; sinks deliver it in digests on background threads"""
+        self.dispatcher.submit(alert_data)
+        
+    def flush(self, timeout=None):
+        """Deliver queued alerts now instead of at the end of the digest window"""
+        return self.dispatcher.flush(timeout)
+        
+    def health_check(self):
+        return self.dispatcher.is_alive()
         
-        try:
-            with smtplib.SMTP(self.email_config['smtp_server']) as server:
-                server.login(self.email_config['username'], self.email_config['password'])
-                server.send_message(msg)
-        except Exception as e:
-            print(f"Failed to send alert: {e}") 
\ No newline at end of file
+    def close(self):
+        """Deliver remaining alerts and close sink connections"""
+        self.dispatcher.close()
@@ -0,0 +1,309 @@
+import abc
+import json
+import time
+import random
+import smtplib
+import threading
+from collections import deque
+from email.mime.text import MIMEText
+import requests
+from config.settings import (
+    ALERT_DIGEST_WINDOW, ALERT_MAX_DIGEST, ALERT_MAX_PENDING, ALERT_MAX_RETRIES, ALERT_BACKOFF_BASE,
+    ALERT_SMTP_TIMEOUT, ALERT_WEBHOOK_TIMEOUT
+)
+
+class AlertSink(abc.ABC):
+    """Destination for alert digests; `alert_types`/`symbols` restrict which alerts it receives"""
+    name = 'sink'
+
+    def __init__(self, alert_types=None, symbols=None):
+        self.alert_types = set(alert_types) if alert_types else None
+        self.symbols = set(symbols) if symbols else None
+
+    def accepts(self, alert):
+        if self.alert_types is not None and alert.get('type') not in self.alert_types:
+            return False
+        return self.symbols is None or alert.get('symbol') in self.symbols
+
+    @abc.abstractmethod
+    def send(self, alerts):
+        """Deliver one digest; raise to have the worker retry it"""
+
+    def retryable(self, error):
+        """Whether a failed send may succeed if tried again"""
+        return True
+
+    def close(self):
+        pass
+
+class ConsoleSink(AlertSink):
+    name = 'console'
+
+    def send(self, alerts):
+        for alert in alerts:
+            print(f"Alert: {alert['message']}")
+
+class FileSink(AlertSink):
+    """Append alerts as JSON lines"""
+    name = 'file'
+
+    def __init__(self, path, **filters):
+        super().__init__(**filters)
+        self.path = path
+
+    def send(self, alerts):
+        with open(self.path, 'a') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, default=str) + '\n')
+
+class WebhookSink(AlertSink):
+    """POST each digest as JSON over a pooled keep-alive session"""
+    name = 'webhook'
+
+    def __init__(self, url, headers=None, timeout=ALERT_WEBHOOK_TIMEOUT, **filters):
+        super().__init__(**filters)
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+
+    def send(self, alerts):
+        response = self.session.post(self.url, json={'alerts': alerts}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+class SMTPSink(AlertSink):
+    """Email each digest over one persistent, logged-in SMTP connection"""
+    name = 'smtp'
+
+    def __init__(self, smtp_server, sender, to, username=None, password=None, use_tls=False,
+                 timeout=ALERT_SMTP_TIMEOUT, **filters):
+        super().__init__(**filters)
+        self.smtp_server = smtp_server
+        self.sender = sender
+        self.to = [to] if isinstance(to, str) else list(to)
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.server = None
+
+    @classmethod
+    def from_config(cls, email_config):
+        """Build from the legacy AlertSystem email_config dict"""
+        config = dict(email_config)
+        return cls(config.pop('smtp_server'), config.pop('from'), config.pop('to'), **config)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_server, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        return server
+
+    def _message(self, alerts):
+        if len(alerts) == 1:
+            msg = MIMEText(alerts[0]['message'])
+            msg['Subject'] = f"Crypto Alert: {alerts[0]['type']}"
+        else:
+            msg = MIMEText('\n'.join(alert['message'] for alert in alerts))
+            msg['Subject'] = f"Crypto Alerts: {len(alerts)} alerts"
+        msg['From'] = self.sender
+        msg['To'] = ', '.join(self.to)
+        return msg
+
+    def send(self, alerts):
+        msg = self._message(alerts)
+        if self.server is not None:
+            try:
+                self.server.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Idle connections get dropped by the server; reconnect once
+                self._drop()
+            except smtplib.SMTPException:
+                # The server answered, so the session is still usable
+                raise
+            except OSError:
+                # A timeout leaves the session in an unknown state; the retry reconnects
+                self._drop()
+                raise
+        self.server = self._connect()
+        self.server.send_message(msg)
+
+    def retryable(self, error):
+        """Permanent (5xx) rejections fail the digest instead of being retried"""
+        if isinstance(error, smtplib.SMTPResponseException):
+            return not 500 <= error.smtp_code < 600
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return not all(500 <= code < 600 for code, _ in error.recipients.values())
+        return True
+
+    def _drop(self):
+        try:
+            self.server.close()
+        finally:
+            self.server = None
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except smtplib.SMTPException:
+                pass
+            self.server = None
+
+SINK_TYPES = {
+    'console': ConsoleSink,
+    'file': FileSink,
+    'webhook': WebhookSink,
+    'smtp': SMTPSink
+}
+
+def build_sinks(configs):
+    """Instantiate sinks from settings entries like {"type": "webhook", "url": ...}"""
+    sinks = []
+    for config in configs:
+        config = dict(config)
+        sink_type = config.pop('type')
+        if sink_type == 'smtp':
+            sinks.append(SMTPSink.from_config(config))
+        else:
+            sinks.append(SINK_TYPES[sink_type](**config))
+    return sinks
+
+class SinkWorker:
+    """Queue for one sink, drained into digests by a background thread"""
+
+    def __init__(self, sink, digest_window=ALERT_DIGEST_WINDOW, max_digest=ALERT_MAX_DIGEST,
+                 max_pending=ALERT_MAX_PENDING, max_retries=ALERT_MAX_RETRIES, backoff_base=ALERT_BACKOFF_BASE):
+        self.sink = sink
+        self.digest_window = digest_window
+        self.max_digest = max_digest
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+        self.pending = deque()
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.flush_requested = False
+        self.stopping = False
+        self.stats = {'queued': 0, 'dropped': 0, 'delivered': 0, 'digests': 0, 'retries': 0, 'failed': 0}
+
+        self.thread = threading.Thread(target=self._run, name=f"alert-{sink.name}", daemon=True)
+        self.thread.start()
+
+    def put(self, alert):
+        """Queue an alert without blocking; drops it when the sink has fallen too far behind"""
+        with self.condition:
+            if len(self.pending) >= self.max_pending or self.stopping:
+                self.stats['dropped'] += 1
+                return False
+            self.pending.append(alert)
+            self.stats['queued'] += 1
+            self.condition.notify_all()
+            return True
+
+    def flush(self, timeout=None):
+        """Deliver everything queued so far without waiting for the digest window"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            self.flush_requested = bool(self.pending)
+            self.condition.notify_all()
+            while (self.pending or self.in_flight) and self.thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def close(self):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.sink.close()
+
+    def _take_digest(self):
+        """Wait for a first alert, then collect more until the window ends or the digest is full"""
+        with self.condition:
+            while not self.pending and not self.stopping:
+                self.condition.wait()
+
+            deadline = time.monotonic() + self.digest_window
+            while (len(self.pending) < self.max_digest and not self.flush_requested
+                   and not self.stopping):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            digest = [self.pending.popleft() for _ in range(min(len(self.pending), self.max_digest))]
+            self.in_flight = len(digest)
+            if not self.pending:
+                self.flush_requested = False
+            return digest
+
+    def _deliver(self, digest):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.sink.send(digest)
+                self.stats['delivered'] += len(digest)
+                self.stats['digests'] += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries or not self.sink.retryable(e):
+                    self.stats['failed'] += len(digest)
+                    print(f"Failed to deliver {len(digest)} alert(s) via {self.sink.name}: {e}")
+                    return
+                self.stats['retries'] += 1
+                delay = self.backoff_base * 2 ** attempt * (0.5 + random.random())
+                with self.condition:
+                    # Shutting down cuts the backoff short but still tries every attempt
+                    if not self.stopping:
+                        self.condition.wait(delay)
+
+    def _run(self):
+        while True:
+            digest = self._take_digest()
+            if digest:
+                self._deliver(digest)
+
+            with self.condition:
+                self.in_flight = 0
+                self.condition.notify_all()
+                if self.stopping and not self.pending:
+                    return
+
+class AlertDispatcher:
+    """Fan alerts out to every sink that accepts them, each with its own queue and thread"""
+
+    def __init__(self, sinks, **options):
+        self.workers = [SinkWorker(sink, **options) for sink in sinks]
+
+    def submit(self, alert):
+        for worker in self.workers:
+            if worker.sink.accepts(alert):
+                worker.put(alert)
+
+    def flush(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = True
+        for worker in self.workers:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            flushed = worker.flush(remaining) and flushed
+        return flushed
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+    def is_alive(self):
+        return all(worker.thread.is_alive() for worker in self.workers)
+
+    def stats(self):
+        return {f"{index}:{worker.sink.name}": dict(worker.stats) for index, worker in enumerate(self.workers)}
@@ -0,0 +1,189 @@
+import time
+from dataclasses import dataclass
+from collections import defaultdict
+from typing import Optional, Union
+from config.settings import ALERT_COOLDOWN
+
+@dataclass(slots=True)
+class AlertRule:
+    """One alert condition; the most specific rule with a given name wins for a symbol"""
+    name: str
+    kind: str = 'change'  # 'change': percent move of `field`; 'cross': `field` crosses `reference`
+    field: str = 'price'
+    threshold: float = 0.0
+    reference: Union[str, float, None] = None  # Another field or a fixed level, for 'cross'
+    direction: str = 'both'  # 'up', 'down' or 'both'
+    symbol: Optional[str] = None
+    category: Optional[str] = None
+    cooldown: float = ALERT_COOLDOWN  # seconds before the rule may fire again for the same symbol
+    alert_type: Optional[str] = None
+
+    def __post_init__(self):
+        if self.kind not in ('change', 'cross'):
+            raise ValueError(f"Unknown alert rule kind: {self.kind}")
+        if self.kind == 'cross' and self.reference is None:
+            raise ValueError(f"Cross rule {self.name} needs a reference field or level")
+        if self.symbol is not None and self.category is not None:
+            raise ValueError(f"Rule {self.name} can target a symbol or a category, not both")
+        if self.alert_type is None:
+            self.alert_type = f"{self.field.upper()}_ALERT" if self.kind == 'change' else 'INDICATOR_CROSS'
+
+class RuleEngine:
+    """Alert rules indexed by symbol, so a tick only evaluates the rules that apply to it"""
+
+    def __init__(self, rules=(), categories=None, clock=time.monotonic):
+        self.clock = clock
+        self.global_rules = {}
+        self.symbol_rules = defaultdict(dict)
+        self.category_rules = defaultdict(dict)
+        self.categories = {}
+        self._compiled = {}
+
+        # Per-symbol state: change baselines, last values for crosses, last firing per rule
+        self.baselines = defaultdict(dict)
+        self.previous = {}
+        self.last_fired = {}
+        self.stats = {'ticks': 0, 'rules_evaluated': 0, 'alerts': 0, 'suppressed': 0}
+
+        for rule in rules:
+            self.add_rule(rule)
+        if categories:
+            self.set_categories(categories)
+
+    def add_rule(self, rule):
+        """Add or replace a rule; scope is taken from its symbol/category"""
+        if rule.symbol is not None:
+            self.symbol_rules[rule.symbol][rule.name] = rule
+            self._compiled.pop(rule.symbol, None)
+        elif rule.category is not None:
+            self.category_rules[rule.category][rule.name] = rule
+            self._compiled.clear()
+        else:
+            self.global_rules[rule.name] = rule
+            self._compiled.clear()
+
+    def remove_rule(self, name, symbol=None, category=None):
+        if symbol is not None:
+            self.symbol_rules[symbol].pop(name, None)
+            self._compiled.pop(symbol, None)
+        elif category is not None:
+            self.category_rules[category].pop(name, None)
+            self._compiled.clear()
+        else:
+            self.global_rules.pop(name, None)
+            self._compiled.clear()
+
+    def set_categories(self, categories):
+        """Map symbols to their categories, most specific first"""
+        for symbol, names in categories.items():
+            self.categories[symbol] = [names] if isinstance(names, str) else [name for name in names if name]
+            self._compiled.pop(symbol, None)
+
+    def set_baselines(self, values):
+        """Reset change baselines, e.g. to the prices stored by the last polling tick"""
+        for symbol, fields in values.items():
+            self.baselines[symbol].update(fields)
+
+    def rules_for(self, symbol):
+        """Resolve global, category and symbol rules for one symbol; cached until rules change"""
+        rules = self._compiled.get(symbol)
+        if rules is None:
+            merged = dict(self.global_rules)
+            for category in reversed(self.categories.get(symbol, ())):
+                merged.update(self.category_rules.get(category, {}))
+            merged.update(self.symbol_rules.get(symbol, {}))
+            rules = self._compiled[symbol] = tuple(merged.values())
+        return rules
+
+    def evaluate(self, symbol, values, previous=None, now=None):
+        """Check one tick's values for a symbol; `previous` overrides the engine's own baselines"""
+        now = self.clock() if now is None else now
+        baselines = self.baselines[symbol]
+        last = self.previous.get(symbol)
+        rules = self.rules_for(symbol)
+        alerts = []
+
+        for rule in rules:
+            value = values.get(rule.field)
+            if value is None:
+                continue
+
+            if rule.kind == 'change':
+                base = previous.get(rule.field) if previous else None
+                if base is None:
+                    base = baselines.get(rule.field)
+                    if base is None:
+                        baselines[rule.field] = value
+                        continue
+                if not base:
+                    continue
+                change = (value - base) / base * 100
+                if rule.direction == 'up':
+                    hit = change >= rule.threshold
+                elif rule.direction == 'down':
+                    hit = change <= -rule.threshold
+                else:
+                    hit = abs(change) >= rule.threshold
+            else:
+                if last is None:
+                    continue
+                is_field = isinstance(rule.reference, str)
+                reference = values.get(rule.reference) if is_field else rule.reference
+                last_value = last.get(rule.field)
+                last_reference = last.get(rule.reference) if is_field else rule.reference
+                if reference is None or last_value is None or last_reference is None:
+                    continue
+                before = last_value - last_reference
+                change = value - reference
+                crossed_up = before <= 0 < change
+                crossed_down = before >= 0 > change
+                if rule.direction == 'up':
+                    hit = crossed_up
+                elif rule.direction == 'down':
+                    hit = crossed_down
+                else:
+                    hit = crossed_up or crossed_down
+
+            if not hit:
+                continue
+
+            key = (symbol, rule.name)
+            fired = self.last_fired.get(key)
+            if fired is not None and now - fired < rule.cooldown:
+                self.stats['suppressed'] += 1
+                continue
+            self.last_fired[key] = now
+
+            if rule.kind == 'change':
+                # Measure the next move from here so one move fires once
+                baselines[rule.field] = value
+            alerts.append(self._alert(rule, symbol, change))
+
+        self.previous[symbol] = values
+        self.stats['ticks'] += 1
+        self.stats['rules_evaluated'] += len(rules)
+        self.stats['alerts'] += len(alerts)
+        return alerts
+
+    def evaluate_batch(self, ticks, previous=None, now=None):
+        """Check a batch of ticks, each a mapping with a 'symbol' key"""
+        now = self.clock() if now is None else now
+        previous = previous or {}
+        alerts = []
+        for tick in ticks:
+            alerts.extend(self.evaluate(tick['symbol'], tick, previous.get(tick['symbol']), now))
+        return alerts
+
+    def _alert(self, rule, symbol, change):
+        if rule.kind == 'change':
+            message = f"{symbol} {rule.field.replace('_', ' ')} changed by {change:.2f}%"
+        else:
+            side = 'above' if change > 0 else 'below'
+            message = f"{symbol} {rule.field} crossed {side} {rule.reference}"
+        return {
+            'type': rule.alert_type,
+            'rule': rule.name,
+            'symbol': symbol,
+            'change': change,
+            'message': message
+        }
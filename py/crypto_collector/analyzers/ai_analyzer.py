@@ -1,44 +1,286 @@
-from openai import OpenAI
+import re
+import random
+import asyncio
+import threading
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
 import pandas as pd
-from config.settings import OPENAI_API_KEY, GPT_MODEL, ANALYSIS_PROMPT_TEMPLATE
+from analyzers.response_cache import ResponseCache, quantize_inputs, quantize_value
+from config.settings import (
+    OPENAI_API_KEY, OPENAI_BASE_URL, GPT_MODEL, ANALYSIS_PROMPT_TEMPLATE, BATCH_ANALYSIS_PROMPT_TEMPLATE,
+    AI_MAX_CONCURRENCY, AI_COINS_PER_PROMPT, AI_MAX_RETRIES, AI_BACKOFF_BASE, AI_MAX_RETRY_AFTER, AI_CACHE_ENABLED,
+    AI_CACHE_QUANTIZATION
+)
+
+ANALYSIS_SYSTEM_PROMPT = "You are a cryptocurrency market analysis expert."
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
 
 class AIAnalyzer:
-    def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self, base_url=OPENAI_BASE_URL, cache=None):
+        self.base_url = base_url
+        self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=base_url)
+        if cache is None and AI_CACHE_ENABLED:
+            cache = ResponseCache()
+        self.cache = cache
+        
+        # Batch fan-out runs on one long-lived event loop so its client keeps connections across ticks
+        self.loop = None
+        self.loop_thread = None
+        self.async_client = None
+        self._loop_lock = threading.Lock()
+        
+    def close(self):
+        """Close the underlying HTTP clients, the batch event loop and the response cache"""
+        self.client.close()
+        with self._loop_lock:
+            if self.loop is not None:
+                if self.async_client is not None:
+                    asyncio.run_coroutine_threadsafe(self.async_client.close(), self.loop).result()
+                    self.async_client = None
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self.loop_thread.join()
+                self.loop.close()
+                self.loop = None
+        if self.cache is not None:
+            self.cache.close()
+            
+    def _event_loop(self):
+        with self._loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.loop_thread = threading.Thread(target=self.loop.run_forever, name="ai-analyzer", daemon=True)
+                self.loop_thread.start()
+            return self.loop
+            
+    def _get_async_client(self):
+        """AsyncOpenAI client bound to the batch event loop; only called on that loop"""
+        if self.async_client is None:
+            # Retries are handled in _complete_async so backoff respects the shared semaphore
+            self.async_client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=self.base_url, max_retries=0)
+        return self.async_client
+            
+    def cache_stats(self):
+        """Hit/miss counters of the response cache"""
+        return self.cache.stats() if self.cache is not None else {}
+        
+    def _cache_key(self, system_prompt, prompt):
+        return self.cache.make_key(GPT_MODEL, f"{system_prompt}\n{prompt}")
+        
+    def _cache_get(self, system_prompt, prompt):
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(system_prompt, prompt))
+        
+    def _cache_set(self, system_prompt, prompt, content):
+        if self.cache is not None:
+            self.cache.set(self._cache_key(system_prompt, prompt), content)
+            
+    def _complete(self, system_prompt, prompt, cache_prompt=None):
+        """Run a chat completion, serving repeated (normalized) prompts from the cache"""
+        cache_prompt = prompt if cache_prompt is None else cache_prompt
+        cached = self._cache_get(system_prompt, cache_prompt)
+        if cached is not None:
+            return cached
+            
+        response = self.client.chat.completions.create(
+            model=GPT_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ]
+        )
+        content = response.choices[0].message.content
+        self._cache_set(system_prompt, cache_prompt, content)
+        return content
         
     def analyze_market_data(self, market_data, technical_indicators):
         """Generate AI analysis of market data"""
         try:
-            # Prepare data for analysis
-            analysis_data = {
-                "price": market_data["price"],
-                "market_cap": market_data["market_cap"],
-                "volume_24h": market_data["volume_24h"],
-                "rsi": technical_indicators["rsi"],
-                "macd": technical_indicators["macd"]
-            }
-            
             # Format prompt
+            analysis_data = self._analysis_data(market_data, technical_indicators)
             prompt = ANALYSIS_PROMPT_TEMPLATE.format(**analysis_data)
             
             # Get AI analysis
-            response = self.client.chat.completions.create(
-                model=GPT_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a cryptocurrency market analysis expert."},
-                    {"role": "user", "content": prompt}
-                ]
+            content = self._complete(
+                ANALYSIS_SYSTEM_PROMPT, prompt, self._cache_prompt(market_data["symbol"], analysis_data)
             )
             
-            return {
-                "analysis": response.choices[0].message.content,
-                "timestamp": pd.Timestamp.now(),
-                "coin": market_data["symbol"]
-            }
+            return self._analysis_result(market_data["symbol"], content)
             
         except Exception as e:
             raise Exception(f"AI analysis failed: {e}")
             
+    def _analysis_data(self, market_data, technical_indicators):
+        """Prepare data for analysis"""
+        return {
+            "price": market_data["price"],
+            "market_cap": market_data["market_cap"],
+            "volume_24h": market_data["volume_24h"],
+            "rsi": technical_indicators["rsi"],
+            "macd": technical_indicators["macd"]
+        }
+        
+    def _cache_prompt(self, symbol, analysis_data):
+        """Prompt with quantized inputs, used only to build the cache key"""
+        return f"{symbol}\n" + ANALYSIS_PROMPT_TEMPLATE.format(**quantize_inputs(analysis_data))
+        
+    def _analysis_result(self, symbol, content):
+        return {
+            "analysis": content,
+            "timestamp": pd.Timestamp.now(),
+            "coin": symbol
+        }
+        
+    def analyze_market_data_batch(self, items, max_concurrency=AI_MAX_CONCURRENCY,
+                                  coins_per_prompt=AI_COINS_PER_PROMPT):
+        """Analyze many (market_data, technical_indicators) pairs concurrently"""
+        return asyncio.run_coroutine_threadsafe(
+            self.analyze_market_data_async(items, max_concurrency, coins_per_prompt), self._event_loop()
+        ).result()
+        
+    async def analyze_market_data_async(self, items, max_concurrency=AI_MAX_CONCURRENCY,
+                                        coins_per_prompt=AI_COINS_PER_PROMPT):
+        """Fan out analysis requests with capped in-flight concurrency, packing several coins per prompt
+
+        Runs on the analyzer's own event loop; use analyze_market_data_batch from other threads.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        
+        # Serve coins whose quantized prompt is already cached
+        misses = []
+        for index, (market_data, technical_indicators) in enumerate(items):
+            cached = self._cache_get(
+                ANALYSIS_SYSTEM_PROMPT,
+                self._cache_prompt(market_data["symbol"], self._analysis_data(market_data, technical_indicators))
+            )
+            if cached is None:
+                misses.append(index)
+            else:
+                results[index] = self._analysis_result(market_data["symbol"], cached)
+                
+        if not misses:
+            return results
+            
+        semaphore = asyncio.Semaphore(max_concurrency)
+        chunks = [misses[i:i + coins_per_prompt] for i in range(0, len(misses), coins_per_prompt)]
+        
+        client = self._get_async_client()
+        try:
+            chunk_results = await asyncio.gather(
+                *(self._analyze_chunk(client, semaphore, [items[i] for i in chunk]) for chunk in chunks)
+            )
+        except Exception as e:
+            raise Exception(f"AI batch analysis failed: {e}")
+                
+        for chunk, analyses in zip(chunks, chunk_results):
+            for index, analysis in zip(chunk, analyses):
+                results[index] = analysis
+                
+        return results
+        
+    async def _analyze_chunk(self, client, semaphore, chunk):
+        """Analyze one chunk of coins, falling back to single-coin prompts for unparsed sections"""
+        if len(chunk) == 1:
+            market_data, technical_indicators = chunk[0]
+            analysis_data = self._analysis_data(market_data, technical_indicators)
+            prompt = ANALYSIS_PROMPT_TEMPLATE.format(**analysis_data)
+            content = await self._complete_async(client, semaphore, prompt)
+            self._cache_set(ANALYSIS_SYSTEM_PROMPT, self._cache_prompt(market_data["symbol"], analysis_data), content)
+            return [self._analysis_result(market_data["symbol"], content)]
+            
+        prompt = self._build_batch_prompt(chunk)
+        content = await self._complete_async(client, semaphore, prompt)
+        sections = self._parse_batch_response(content)
+        
+        results = []
+        for market_data, technical_indicators in chunk:
+            section = sections.get(str(market_data["symbol"]).upper())
+            if section is None:
+                # The model skipped or mangled this coin; ask for it on its own
+                section = (await self._analyze_chunk(client, semaphore, [(market_data, technical_indicators)]))[0]["analysis"]
+            else:
+                self._cache_set(
+                    ANALYSIS_SYSTEM_PROMPT,
+                    self._cache_prompt(market_data["symbol"], self._analysis_data(market_data, technical_indicators)),
+                    section
+                )
+            results.append(self._analysis_result(market_data["symbol"], section))
+            
+        return results
+        
+    def _build_batch_prompt(self, chunk):
+        """Pack several coins into a single prompt"""
+        coins = []
+        for market_data, technical_indicators in chunk:
+            data = self._analysis_data(market_data, technical_indicators)
+            coins.append(
+                f"### {str(market_data['symbol']).upper()}\n"
+                f"Price: {data['price']}\n"
+                f"Market Cap: {data['market_cap']}\n"
+                f"24h Volume: {data['volume_24h']}\n"
+                f"RSI: {data['rsi']}\n"
+                f"MACD: {data['macd']}"
+            )
+        return BATCH_ANALYSIS_PROMPT_TEMPLATE.format(coins="\n\n".join(coins))
+        
+    def _parse_batch_response(self, content):
+        """Split a packed response back into per-coin sections keyed by symbol"""
+        sections = {}
+        parts = re.split(r"^#{2,}\s*([A-Za-z0-9._-]+)\s*$", content or "", flags=re.MULTILINE)
+        for symbol, body in zip(parts[1::2], parts[2::2]):
+            body = body.strip()
+            if body:
+                sections[symbol.upper()] = body
+        return sections
+        
+    async def _complete_async(self, client, semaphore, prompt):
+        """Run one chat completion, backing off on rate limits and transient errors"""
+        for attempt in range(AI_MAX_RETRIES + 1):
+            async with semaphore:
+                try:
+                    response = await client.chat.completions.create(
+                        model=GPT_MODEL,
+                        messages=[
+                            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ]
+                    )
+                    return response.choices[0].message.content
+                except RETRYABLE_ERRORS as e:
+                    if attempt == AI_MAX_RETRIES:
+                        raise
+                    delay = self._retry_delay(e, attempt)
+                    
+            # Sleep outside the semaphore so other requests can proceed
+            await asyncio.sleep(delay)
+            
+    def _retry_delay(self, error, attempt):
+        """Honor Retry-After (up to AI_MAX_RETRY_AFTER) when the server sends it, otherwise use jittered exponential backoff"""
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(max(float(retry_after), 0.0), AI_MAX_RETRY_AFTER)
+            except ValueError:
+                pass
+        return AI_BACKOFF_BASE * (2 ** attempt) * (0.5 + random.random())
+            
+    def _report_cache_prompt(self, analyses):
+        """Cache key input of a report: the per-coin analyses without their timestamps"""
+        return "report\n" + "\n".join(f"{analysis['coin']}: {analysis['analysis']}" for analysis in analyses)
+        
+    def _prediction_cache_prompt(self, historical_data, technical_indicators):
+        """Cache key input of a prediction: quantized closes and quantized indicator inputs per symbol"""
+        mode, step = AI_CACHE_QUANTIZATION['price']
+        lines = [
+            f"{symbol}: {[quantize_value(price['price'], mode, step) for price in prices]}"
+            for symbol, prices in sorted(historical_data.items())
+        ]
+        columns = [column for column in ('symbol', *AI_CACHE_QUANTIZATION) if column in technical_indicators.columns]
+        lines.extend(str(quantize_inputs(row)) for row in technical_indicators[columns].to_dict('records'))
+        return "prediction\n" + "\n".join(lines)
+            
     def generate_market_report(self, analyses):
         """Generate comprehensive market report"""
         try:
@@ -54,16 +296,12 @@ class AIAnalyzer:
             5. Market outlook for next 24-48 hours
             """
             
-            response = self.client.chat.completions.create(
-                model=GPT_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a cryptocurrency market expert."},
-                    {"role": "user", "content": report_prompt}
-                ]
+            content = self._complete(
+                "You are a cryptocurrency market expert.", report_prompt, self._report_cache_prompt(analyses)
             )
             
             return {
-                "report": response.choices[0].message.content,
+                "report": content,
                 "timestamp": pd.Timestamp.now()
             }
             
@@ -85,16 +323,14 @@ class AIAnalyzer:
             4. Key factors that could invalidate prediction
             """
             
-            response = self.client.chat.completions.create(
-                model=GPT_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a cryptocurrency price prediction expert."},
-                    {"role": "user", "content": prediction_prompt}
-                ]
+            content = self._complete(
+                "You are a cryptocurrency price prediction expert.",
+                prediction_prompt,
+                self._prediction_cache_prompt(historical_data, technical_indicators)
             )
             
             return {
-                "prediction": response.choices[0].message.content,
+                "prediction": content,
                 "timestamp": pd.Timestamp.now()
             }
             
@@ -0,0 +1,211 @@
+import numpy as np
+from typing import Dict, List
+from config.settings import MA_PERIODS, RSI_PERIOD, MACD_PARAMS, BOLLINGER_PARAMS
+
+STATE_VERSION = 1
+FLOAT_STATE = ['last_price', 'ema_fast', 'ema_slow', 'ema_signal', 'avg_up', 'avg_down']
+
+class IncrementalIndicators:
+    """Per-symbol streaming indicator state updated in O(1) per new price
+
+    Produces the same values as indicator_engine.compute_indicators run over the
+    full history, but keeps only EMA accumulators, Wilder RSI averages and
+    rolling-window sums, so each tick costs O(symbols) instead of O(history).
+    """
+
+    def __init__(self):
+        self.fast = MACD_PARAMS["fast"]
+        self.slow = MACD_PARAMS["slow"]
+        self.signal = MACD_PARAMS["signal"]
+        self.bb_window = BOLLINGER_PARAMS["window"]
+        self.bb_dev = BOLLINGER_PARAMS["window_dev"]
+        self.windows = sorted(set(MA_PERIODS) | {self.bb_window})
+        self.capacity = max(self.windows)
+
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.count = np.zeros(0, dtype=np.int64)
+        for name in FLOAT_STATE:
+            setattr(self, name, np.zeros(0))
+        self.buffer = np.zeros((0, self.capacity))
+        self.sums = {window: np.zeros(0) for window in self.windows}
+        self.bb_sumsq = np.zeros(0)
+        self.updates = 0
+
+    def params(self):
+        """Indicator parameters the state was built with"""
+        return {
+            'macd': [self.fast, self.slow, self.signal],
+            'rsi': RSI_PERIOD,
+            'bollinger': [self.bb_window, self.bb_dev],
+            'ma_periods': list(MA_PERIODS)
+        }
+
+    def _ensure_symbols(self, symbols):
+        """Grow the state arrays for symbols seen for the first time"""
+        new = [s for s in dict.fromkeys(symbols) if s not in self.index]
+        if not new:
+            return
+        for symbol in new:
+            self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        extra = len(new)
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        for name in FLOAT_STATE:
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra)]))
+        self.buffer = np.vstack([self.buffer, np.zeros((extra, self.capacity))])
+        for window in self.windows:
+            self.sums[window] = np.concatenate([self.sums[window], np.zeros(extra)])
+        self.bb_sumsq = np.concatenate([self.bb_sumsq, np.zeros(extra)])
+
+    def update(self, symbols, prices) -> Dict[str, np.ndarray]:
+        """Fold one new price per symbol into the state and return the latest indicator values"""
+        symbols = list(symbols)
+        prices = np.asarray(prices, dtype=float)
+        if len(symbols) != len(prices):
+            raise Exception("symbols and prices must have the same length")
+
+        # Keep only the last price of a symbol that appears twice in one update
+        latest = {}
+        for position, symbol in enumerate(symbols):
+            latest[symbol] = position
+        self._ensure_symbols(latest)
+        positions = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+        idx = np.array([self.index[s] for s in latest], dtype=np.int64)
+        x = prices[positions]
+
+        count = self.count[idx]
+        first = count == 0
+
+        # MACD: ewm(adjust=False) seeded with the first price
+        alpha_fast, alpha_slow = 2 / (self.fast + 1), 2 / (self.slow + 1)
+        self.ema_fast[idx] = np.where(first, x, (1 - alpha_fast) * self.ema_fast[idx] + alpha_fast * x)
+        self.ema_slow[idx] = np.where(first, x, (1 - alpha_slow) * self.ema_slow[idx] + alpha_slow * x)
+        macd = self.ema_fast[idx] - self.ema_slow[idx]
+
+        # The signal line starts at the first valid MACD value
+        alpha_signal = 2 / (self.signal + 1)
+        new_count = count + 1
+        signal_seed = new_count == self.slow
+        self.ema_signal[idx] = np.where(
+            signal_seed, macd, (1 - alpha_signal) * self.ema_signal[idx] + alpha_signal * macd
+        )
+
+        # RSI: Wilder averages of gains and losses, the first sample contributes zero
+        diff = np.where(first, 0.0, x - self.last_price[idx])
+        alpha_rsi = 1 / RSI_PERIOD
+        up, down = np.maximum(diff, 0.0), np.maximum(-diff, 0.0)
+        self.avg_up[idx] = np.where(first, up, (1 - alpha_rsi) * self.avg_up[idx] + alpha_rsi * up)
+        self.avg_down[idx] = np.where(first, down, (1 - alpha_rsi) * self.avg_down[idx] + alpha_rsi * down)
+
+        # Rolling windows: add the new price and drop the one leaving each window
+        slot = count % self.capacity
+        for window in self.windows:
+            leaving = np.where(count >= window, self.buffer[idx, (count - window) % self.capacity], 0.0)
+            self.sums[window][idx] += x - leaving
+            if window == self.bb_window:
+                self.bb_sumsq[idx] += x ** 2 - leaving ** 2
+        self.buffer[idx, slot] = x
+
+        self.last_price[idx] = x
+        self.count[idx] = new_count
+        self.updates += 1
+
+        # Running sums drift slowly; rebuild them from the buffers every full cycle
+        if self.updates % self.capacity == 0:
+            self._resync()
+
+        return self._outputs(idx, x)
+
+    def _window_values(self, idx, window):
+        """Last `window` prices of each symbol from its ring buffer"""
+        count = self.count[idx]
+        offsets = np.arange(1, window + 1)
+        slots = (count[:, None] - offsets[None, :]) % self.capacity
+        return self.buffer[idx[:, None], slots]
+
+    def _resync(self):
+        idx = np.arange(len(self.symbols))
+        for window in self.windows:
+            values = self._window_values(idx, window)
+            self.sums[window] = np.where(self.count >= window, values.sum(axis=1), self.sums[window])
+            if window == self.bb_window:
+                self.bb_sumsq = np.where(self.count >= window, (values ** 2).sum(axis=1), self.bb_sumsq)
+
+    def _outputs(self, idx, x):
+        count = self.count[idx]
+        nan = np.full(len(idx), np.nan)
+        outputs = {'price': x}
+
+        macd = self.ema_fast[idx] - self.ema_slow[idx]
+        outputs['macd'] = np.where(count >= self.slow, macd, nan)
+        outputs['macd_signal'] = np.where(count >= self.slow + self.signal - 1, self.ema_signal[idx], nan)
+
+        avg_up, avg_down = self.avg_up[idx], self.avg_down[idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down))
+        outputs['rsi'] = np.where(count >= RSI_PERIOD, rsi, nan)
+
+        full = count >= self.bb_window
+        mean = self.sums[self.bb_window][idx] / self.bb_window
+        variance = np.maximum(self.bb_sumsq[idx] / self.bb_window - mean ** 2, 0.0)
+        std = np.sqrt(variance)
+        outputs['bb_mavg'] = np.where(full, mean, nan)
+        outputs['bb_high'] = np.where(full, mean + self.bb_dev * std, nan)
+        outputs['bb_low'] = np.where(full, mean - self.bb_dev * std, nan)
+
+        for period in MA_PERIODS:
+            outputs[f'ma_{period}'] = np.where(count >= period, self.sums[period][idx] / period, nan)
+
+        return outputs
+
+    def latest(self, symbols=None) -> Dict[str, np.ndarray]:
+        """Current indicator values without folding in a new price"""
+        symbols = self.symbols if symbols is None else symbols
+        idx = np.array([self.index[s] for s in symbols], dtype=np.int64)
+        return self._outputs(idx, self.last_price[idx])
+
+    @classmethod
+    def from_history(cls, symbols, panel):
+        """Build the state by replaying a symbol x time price panel one column at a time"""
+        state = cls()
+        symbols = list(symbols)
+        panel = np.asarray(panel, dtype=float)
+        for column in panel.T:
+            present = ~np.isnan(column)
+            if present.any():
+                state.update([s for s, p in zip(symbols, present) if p], column[present])
+        return state
+
+    def to_document(self):
+        """Serialize the state into a BSON/JSON friendly checkpoint"""
+        return {
+            'version': STATE_VERSION,
+            'params': self.params(),
+            'updates': self.updates,
+            'symbols': list(self.symbols),
+            'count': self.count.tolist(),
+            **{name: getattr(self, name).tolist() for name in FLOAT_STATE},
+            'buffer': self.buffer.tolist(),
+            'sums': {str(window): values.tolist() for window, values in self.sums.items()},
+            'bb_sumsq': self.bb_sumsq.tolist()
+        }
+
+    @classmethod
+    def from_document(cls, document):
+        """Restore a checkpoint, or return None when it was built with different parameters"""
+        state = cls()
+        if not document or document.get('version') != STATE_VERSION or document.get('params') != state.params():
+            return None
+
+        state.symbols = list(document['symbols'])
+        state.index = {symbol: i for i, symbol in enumerate(state.symbols)}
+        state.updates = document['updates']
+        state.count = np.asarray(document['count'], dtype=np.int64)
+        for name in FLOAT_STATE:
+            setattr(state, name, np.asarray(document[name], dtype=float))
+        state.buffer = np.asarray(document['buffer'], dtype=float).reshape(len(state.symbols), state.capacity)
+        state.sums = {int(window): np.asarray(values, dtype=float) for window, values in document['sums'].items()}
+        state.bb_sumsq = np.asarray(document['bb_sumsq'], dtype=float)
+        return state
@@ -0,0 +1,113 @@
+import numpy as np
+from typing import Dict
+from scipy.signal import lfilter
+from config.settings import MA_PERIODS, RSI_PERIOD, MACD_PARAMS, BOLLINGER_PARAMS
+
+def _ffill(panel: np.ndarray) -> np.ndarray:
+    """Forward-fill gaps along the time axis of each row"""
+    valid = ~np.isnan(panel)
+    index = np.where(valid, np.arange(panel.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = panel[np.arange(panel.shape[0])[:, None], index]
+    # Leading gaps have nothing to fill from
+    filled[np.cumsum(valid, axis=1) == 0] = np.nan
+    return filled
+
+def _shift_rows(panel: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Shift each row left by its offset (right for negative offsets), padding with NaN"""
+    n_rows, n_cols = panel.shape
+    cols = np.arange(n_cols)[None, :] + offsets[:, None]
+    inside = (cols >= 0) & (cols < n_cols)
+    rows = np.broadcast_to(np.arange(n_rows)[:, None], cols.shape)
+    shifted = np.full(panel.shape, np.nan)
+    shifted[inside] = panel[rows[inside], cols[inside]]
+    return shifted
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int, start: int = 0) -> np.ndarray:
+    """Row-wise ewm(adjust=False) seeded with the first value at column start, like pandas"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] <= start:
+        return out
+    values = x[:, start:]
+    seed = values[:, :1] * (1 - alpha)
+    out[:, start:], _ = lfilter([alpha], [1, alpha - 1], values, axis=1, zi=seed)
+    out[:, start:start + min_periods - 1] = np.nan
+    return out
+
+def _rolling(x: np.ndarray, window: int, with_std: bool = False):
+    """Row-wise rolling mean (and population std) over full windows from running sums"""
+    mean = np.full(x.shape, np.nan)
+    std = np.full(x.shape, np.nan) if with_std else None
+    if x.shape[1] < window:
+        return mean, std
+
+    # Center each row on its first value to keep the running sums well conditioned
+    ref = np.nan_to_num(x[:, :1])
+    centered = x - ref
+    zeros = np.zeros((x.shape[0], 1))
+
+    csum = np.cumsum(np.concatenate([zeros, centered], axis=1), axis=1)
+    window_mean = (csum[:, window:] - csum[:, :-window]) / window
+    mean[:, window - 1:] = window_mean + ref
+
+    if with_std:
+        csq = np.cumsum(np.concatenate([zeros, centered ** 2], axis=1), axis=1)
+        variance = (csq[:, window:] - csq[:, :-window]) / window - window_mean ** 2
+        std[:, window - 1:] = np.sqrt(np.maximum(variance, 0.0))
+
+    return mean, std
+
+def compute_indicators(panel: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute MACD, RSI, Bollinger Bands and moving averages for a symbol x time price panel
+
+    Rows are symbols and columns are time-ordered samples. Rows may start late
+    (leading NaN) and have gaps, which are forward-filled. Results match the
+    `ta` library computed per symbol.
+    """
+    panel = np.asarray(panel, dtype=float)
+    if panel.ndim != 2:
+        raise Exception(f"Expected a 2-D symbol x time panel, got shape {panel.shape}")
+
+    # Left-align every row so all series start at column 0 and one filter pass covers them all
+    filled = _ffill(panel)
+    valid = ~np.isnan(filled)
+    offsets = np.where(valid.any(axis=1), valid.argmax(axis=1), 0)
+    aligned = offsets.any()
+    x = _shift_rows(filled, offsets) if aligned else filled
+
+    results = {}
+
+    # MACD
+    fast, slow, signal = MACD_PARAMS["fast"], MACD_PARAMS["slow"], MACD_PARAMS["signal"]
+    macd = _ewm(x, 2 / (fast + 1), fast) - _ewm(x, 2 / (slow + 1), slow)
+    results["macd"] = macd
+    results["macd_signal"] = _ewm(macd, 2 / (signal + 1), signal, start=slow - 1)
+
+    # RSI (Wilder smoothing)
+    diff = np.diff(x, axis=1, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    up[np.isnan(x)] = np.nan
+    down[np.isnan(x)] = np.nan
+    avg_up = _ewm(up, 1 / RSI_PERIOD, RSI_PERIOD)
+    avg_down = _ewm(down, 1 / RSI_PERIOD, RSI_PERIOD)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down))
+    rsi[np.isnan(avg_up) | np.isnan(avg_down)] = np.nan
+    results["rsi"] = rsi
+
+    # Bollinger Bands
+    window, window_dev = BOLLINGER_PARAMS["window"], BOLLINGER_PARAMS["window_dev"]
+    bb_mavg, bb_std = _rolling(x, window, with_std=True)
+    results["bb_mavg"] = bb_mavg
+    results["bb_high"] = bb_mavg + window_dev * bb_std
+    results["bb_low"] = bb_mavg - window_dev * bb_std
+
+    # Moving averages
+    for period in MA_PERIODS:
+        results[f"ma_{period}"], _ = _rolling(x, period)
+
+    # Shift results back to each row's original time positions
+    if aligned:
+        results = {name: _shift_rows(values, -offsets) for name, values in results.items()}
+    return results
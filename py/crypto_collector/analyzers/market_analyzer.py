@@ -1,45 +1,44 @@
 import pandas as pd
-import numpy as np
-from ta.trend import MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
+from analyzers.incremental_indicators import IncrementalIndicators
+from models.crypto_data import ColumnBatch
 
 class MarketAnalyzer:
-    def __init__(self, price_data):
-        self.df = pd.DataFrame(price_data)
+    def __init__(self, price_data, incremental=None):
+        if isinstance(price_data, ColumnBatch):
+            self.df = price_data.to_frame()
+        else:
+            self.df = pd.DataFrame(price_data)
+        # Pipelines pass their long-lived state; a fresh one only covers this analyzer's prices
+        self.incremental = incremental if incremental is not None else IncrementalIndicators()
         
     def calculate_technical_indicators(self):
-        """Calculate technical indicators for analysis"""
-        # Calculate MACD
-        macd = MACD(self.df['price'])
-        self.df['macd'] = macd.macd()
-        self.df['macd_signal'] = macd.macd_signal()
+        """Fold this tick's prices into the streaming indicator state"""
+        # Only the latest sample per symbol matters for the streaming state
+        latest = self.df.drop_duplicates('symbol', keep='last').reset_index(drop=True)
+        indicators = self.incremental.update(latest['symbol'], latest['price'])
+        indicators.pop('price')
         
-        # Calculate RSI
-        rsi = RSIIndicator(self.df['price'])
-        self.df['rsi'] = rsi.rsi()
-        
-        # Calculate Bollinger Bands
-        bb = BollingerBands(self.df['price'])
-        self.df['bb_high'] = bb.bollinger_hband()
-        self.df['bb_low'] = bb.bollinger_lband()
+        for name, values in indicators.items():
+            latest[name] = values
+        self.df = latest
         
         return self.df
     
     def generate_signals(self):
-        """Generate trading signals based on indicators"""
+        """Generate trading signals for each symbol based on its latest indicators"""
         signals = []
         
-        # MACD signals
-        if self.df['macd'].iloc[-1] > self.df['macd_signal'].iloc[-1]:
-            signals.append({"indicator": "MACD", "signal": "BUY"})
-        elif self.df['macd'].iloc[-1] < self.df['macd_signal'].iloc[-1]:
-            signals.append({"indicator": "MACD", "signal": "SELL"})
-            
-        # RSI signals
-        if self.df['rsi'].iloc[-1] < 30:
-            signals.append({"indicator": "RSI", "signal": "OVERSOLD"})
-        elif self.df['rsi'].iloc[-1] > 70:
-            signals.append({"indicator": "RSI", "signal": "OVERBOUGHT"})
-            
+        for row in self.df.drop_duplicates('symbol', keep='last').itertuples(index=False):
+            # MACD signals
+            if row.macd > row.macd_signal:
+                signals.append({"symbol": row.symbol, "indicator": "MACD", "signal": "BUY"})
+            elif row.macd < row.macd_signal:
+                signals.append({"symbol": row.symbol, "indicator": "MACD", "signal": "SELL"})
+                
+            # RSI signals
+            if row.rsi < 30:
+                signals.append({"symbol": row.symbol, "indicator": "RSI", "signal": "OVERSOLD"})
+            elif row.rsi > 70:
+                signals.append({"symbol": row.symbol, "indicator": "RSI", "signal": "OVERBOUGHT"})
+                
         return signals 
\ No newline at end of file
@@ -0,0 +1,152 @@
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from config.settings import AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL, AI_CACHE_PATH, AI_CACHE_QUANTIZATION
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting differences do not change the cache key"""
+    return " ".join(prompt.split())
+
+def quantize_value(value, mode, step):
+    """Snap a numeric input to a coarse grid so tiny moves map to the same prompt"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return value
+    if math.isnan(value) or math.isinf(value) or step <= 0:
+        return value
+
+    if mode == 'absolute':
+        return round(round(value / step) * step, 12)
+
+    # Relative steps use log-spaced buckets so every magnitude gets the same precision
+    if value == 0:
+        return 0.0
+    bucket = round(math.log(abs(value)) / math.log1p(step))
+    return math.copysign(float(f"{math.exp(bucket * math.log1p(step)):.12g}"), value)
+
+def quantize_inputs(data: dict, rules=AI_CACHE_QUANTIZATION) -> dict:
+    """Quantize the prompt inputs listed in rules, leaving the rest unchanged"""
+    quantized = dict(data)
+    for name, (mode, step) in rules.items():
+        if name in quantized:
+            quantized[name] = quantize_value(quantized[name], mode, step)
+    return quantized
+
+class ResponseCache:
+    """LRU + TTL cache of model responses keyed on model and normalized prompt hash"""
+
+    def __init__(self, max_entries=AI_CACHE_MAX_ENTRIES, ttl=AI_CACHE_TTL, path=AI_CACHE_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+        # Optional on-disk persistence so the cache survives restarts
+        self.conn = None
+        if path:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """Content-addressed key for a model/prompt pair"""
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_prompt(prompt).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached response or None, counting hits and misses"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None and self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+
+            value, created = entry
+            if self.ttl and now - created > self.ttl:
+                self._forget(key)
+                self.counters['expired'] += 1
+                self.counters['misses'] += 1
+                return None
+
+            self.entries.move_to_end(key)
+            if self.conn is not None:
+                self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+            self.counters['hits'] += 1
+            return value
+
+    def set(self, key, value):
+        """Store a response, evicting the least recently used entries beyond max_entries"""
+        if value is None:
+            return
+        now = time.time()
+        with self.lock:
+            self._remember(key, (value, now))
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                self.conn.commit()
+
+    def _remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def _forget(self, key):
+        self.entries.pop(key, None)
+        if self.conn is not None:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self.lock:
+            lookups = self.counters['hits'] + self.counters['misses']
+            return {
+                **self.counters,
+                'size': len(self.entries),
+                'hit_rate': self.counters['hits'] / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM responses")
+                self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
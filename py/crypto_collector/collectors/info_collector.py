@@ -0,0 +1,31 @@
+from utils.api_client import get_shared_client
+from models.crypto_data import CoinInfo
+from config.settings import SUPPORTED_COINS
+
+class InfoCollector:
+    def __init__(self, api_client=None):
+        self.api_client = api_client or get_shared_client()
+        
+    def collect(self):
+        """Collect descriptive information for the supported cryptocurrencies"""
+        try:
+            info_data = []
+            for coin_id in SUPPORTED_COINS:
+                coin = self.api_client.get_coin_info(coin_id)
+                links = coin.get('links', {})
+                data = CoinInfo(
+                    symbol=coin['symbol'],
+                    name=coin['name'],
+                    description=coin.get('description', {}).get('en', ''),
+                    website=next(iter(links.get('homepage') or []), ''),
+                    github=next(iter(links.get('repos_url', {}).get('github') or []), ''),
+                    twitter=links.get('twitter_screen_name') or '',
+                    reddit=links.get('subreddit_url') or '',
+                    last_updated=coin.get('last_updated')
+                )
+                info_data.append(data)
+                
+            return info_data
+            
+        except Exception as e:
+            raise Exception(f"Failed to collect coin info: {e}")
@@ -0,0 +1,25 @@
+from utils.api_client import get_shared_client
+from collectors.market_snapshot import MarketSnapshotFetcher
+from models.crypto_data import MarketBatch
+
+class MarketCollector:
+    def __init__(self, api_client=None, fetcher=None):
+        self.api_client = api_client or get_shared_client()
+        self.fetcher = fetcher or MarketSnapshotFetcher(self.api_client)
+        
+    def collect(self):
+        """Collect market capitalization and volume for the top cryptocurrencies"""
+        try:
+            # Same pages as the price collector; the shared client coalesces the requests
+            response = self.fetcher.fetch()
+            
+            return MarketBatch.from_rows(response, {
+                'symbol': 'symbol',
+                'market_cap': 'market_cap',
+                'volume_24h': 'total_volume',
+                'price_change_24h': 'price_change_percentage_24h',
+                'timestamp': 'last_updated'
+            })
+            
+        except Exception as e:
+            raise Exception(f"Failed to collect market data: {e}")
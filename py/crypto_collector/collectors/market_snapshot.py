@@ -0,0 +1,104 @@
+import math
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from utils.api_client import get_shared_client
+from config.settings import TOP_COINS, MARKET_PAGE_SIZE, MARKET_FETCH_WORKERS, MARKET_PAGE_MAX_AGE
+
+class MarketSnapshotFetcher:
+    """Fetch the top-N market universe as concurrent pages, reusing stale pages on failure"""
+
+    def __init__(self, api_client=None, universe_size=TOP_COINS, page_size=MARKET_PAGE_SIZE,
+                 max_workers=MARKET_FETCH_WORKERS, max_page_age=MARKET_PAGE_MAX_AGE):
+        self.api_client = api_client or get_shared_client()
+        self.universe_size = universe_size
+        self.page_size = min(page_size, universe_size)
+        self.max_page_age = max_page_age
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-page")
+        self.pages = {}
+        self.freshness = {}
+        self.lock = threading.Lock()
+        self.in_flight = None
+
+    def page_count(self):
+        return math.ceil(self.universe_size / self.page_size)
+
+    def fetch(self):
+        """Return one deduplicated snapshot of the universe, ordered by market cap rank"""
+        # Collectors running in parallel share a single snapshot fetch
+        with self.lock:
+            future = self.in_flight
+            owner = future is None
+            if owner:
+                future = self.in_flight = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            snapshot = self._fetch_pages()
+            future.set_result(snapshot)
+            return snapshot
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight = None
+
+    def _fetch_pages(self):
+        # Requests still go through the client's global rate limit
+        futures = {
+            self.executor.submit(self.api_client.get_prices, per_page=self.page_size, page=page): page
+            for page in range(1, self.page_count() + 1)
+        }
+
+        freshness = {}
+        for future in as_completed(futures):
+            page = futures[future]
+            now = time.time()
+            try:
+                self.pages[page] = {'rows': future.result(), 'fetched_at': now}
+                freshness[page] = {'status': 'fresh', 'fetched_at': now, 'age_seconds': 0.0}
+                continue
+            except Exception as e:
+                error = str(e)
+
+            cached = self.pages.get(page)
+            if cached is not None and now - cached['fetched_at'] <= self.max_page_age:
+                freshness[page] = {
+                    'status': 'stale',
+                    'fetched_at': cached['fetched_at'],
+                    'age_seconds': now - cached['fetched_at'],
+                    'error': error
+                }
+            else:
+                freshness[page] = {'status': 'missing', 'fetched_at': None, 'age_seconds': None, 'error': error}
+
+        self.freshness = dict(sorted(freshness.items()))
+        degraded = {page: info['status'] for page, info in self.freshness.items() if info['status'] != 'fresh'}
+        if len(degraded) == len(self.freshness):
+            raise Exception(f"Failed to fetch any market page: {degraded}")
+        if degraded:
+            print(f"Market snapshot degraded, pages: {degraded}")
+
+        return self._merge()
+
+    def _merge(self):
+        """Concatenate pages in rank order, dropping coins that moved across a page boundary between fetches"""
+        seen = set()
+        rows = []
+        for page in sorted(self.freshness):
+            status = self.freshness[page]['status']
+            if status == 'missing':
+                continue
+            for coin in self.pages[page]['rows']:
+                key = coin.get('id') or coin.get('symbol')
+                if key in seen:
+                    continue
+                seen.add(key)
+                # Stale rows keep the universe complete but must not be stored again
+                rows.append(dict(coin, stale=True) if status == 'stale' else coin)
+        return rows[:self.universe_size]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -1,27 +1,24 @@
-from utils.api_client import APIClient
-from models.crypto_data import PriceData
+from utils.api_client import get_shared_client
+from collectors.market_snapshot import MarketSnapshotFetcher
+from models.crypto_data import PriceBatch
 
 class PriceCollector:
-    def __init__(self):
-        self.api_client = APIClient()
+    def __init__(self, api_client=None, fetcher=None):
+        self.api_client = api_client or get_shared_client()
+        self.fetcher = fetcher or MarketSnapshotFetcher(self.api_client)
         
     def collect(self):
         """Collect current prices for major cryptocurrencies"""
         try:
-            # Get price data from API
-            response = self.api_client.get_prices()
+            # Get price data from API, one page per TOP_COINS slice
+            response = self.fetcher.fetch()
             
-            # Process and format data
-            price_data = []
-            for coin in response:
-                data = PriceData(
-                    symbol=coin['symbol'],
-                    price=coin['current_price'],
-                    timestamp=coin['last_updated']
-                )
-                price_data.append(data)
-                
-            return price_data
+            # Process and format data into one column per field
+            return PriceBatch.from_rows(response, {
+                'symbol': 'symbol',
+                'price': 'current_price',
+                'timestamp': 'last_updated'
+            })
             
         except Exception as e:
             raise Exception(f"Failed to collect price data: {e}") 
\ No newline at end of file
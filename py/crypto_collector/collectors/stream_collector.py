@@ -0,0 +1,209 @@
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timezone
+import websockets
+from models.crypto_data import PriceData
+from analyzers.incremental_indicators import IncrementalIndicators
+from config.settings import (
+    STREAM_URL, STREAM_SUBSCRIBE_MESSAGE, STREAM_QUOTE_ASSET, STREAM_QUEUE_SIZE, STREAM_RECONNECT_DELAY,
+    COLLECTION_INTERVAL
+)
+
+def parse_mini_ticker(raw, quote_asset=STREAM_QUOTE_ASSET):
+    """Turn a Binance-style miniTicker message (single or array) into PriceData"""
+    message = json.loads(raw)
+    events = message if isinstance(message, list) else [message]
+    ticks = []
+    for event in events:
+        pair = event.get('s', '')
+        if 'c' not in event or not pair.endswith(quote_asset):
+            continue
+        ticks.append(PriceData(
+            symbol=pair[:-len(quote_asset)].lower(),
+            price=float(event['c']),
+            timestamp=datetime.fromtimestamp(event.get('E', time.time() * 1000) / 1000, tz=timezone.utc)
+        ))
+    return ticks
+
+class StreamCollector:
+    """Streaming ingest from a ticker WebSocket feed that fires alerts per tick on polling-interval indicators"""
+
+    def __init__(self, alert_system=None, url=STREAM_URL, queue_size=STREAM_QUEUE_SIZE,
+                 reconnect_delay=STREAM_RECONNECT_DELAY, parser=parse_mini_ticker, bar_seconds=COLLECTION_INTERVAL * 60):
+        self.alert_system = alert_system
+        self.url = url
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.parser = parser
+        self.bar_seconds = bar_seconds
+
+        # Indicators advance once per bar of the polling interval, so they mean the same as the polled ones
+        self.indicators = IncrementalIndicators()
+        self.bars = {}
+        self.latest = {}
+        self.received = {}
+        self.connected = False
+        self.stats = {
+            'ticks': 0, 'coalesced': 0, 'dropped': 0, 'processed': 0, 'alerts': 0,
+            'reconnects': 0, 'failed': 0, 'last_latency_ms': 0.0
+        }
+
+        self.loop = None
+        self.queue = None
+        self.thread = None
+        self.main_task = None
+        self.consumer = None
+
+    async def run(self):
+        """Connect, reconnecting on failure, and process ticks until cancelled"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.consumer = asyncio.create_task(self._consume())
+        try:
+            while True:
+                try:
+                    async with websockets.connect(self.url) as websocket:
+                        if STREAM_SUBSCRIBE_MESSAGE:
+                            await websocket.send(json.dumps(STREAM_SUBSCRIBE_MESSAGE))
+                        self.connected = True
+                        async for raw in websocket:
+                            self._on_message(raw)
+                except (OSError, websockets.ConnectionClosed, websockets.InvalidURI, websockets.InvalidHandshake) as e:
+                    print(f"Ticker stream disconnected: {e}")
+                self.connected = False
+                self.stats['reconnects'] += 1
+                # Polling keeps collecting in the meantime
+                await asyncio.sleep(self.reconnect_delay)
+        finally:
+            self.connected = False
+            self.consumer.cancel()
+
+    def _on_message(self, raw):
+        now = time.perf_counter()
+        try:
+            ticks = self.parser(raw)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Skipping malformed ticker message: {e}")
+            return
+
+        for tick in ticks:
+            self.stats['ticks'] += 1
+            if tick.symbol in self.latest:
+                # Already queued; a burst collapses into the newest price
+                self.latest[tick.symbol] = tick
+                self.stats['coalesced'] += 1
+                continue
+            try:
+                self.queue.put_nowait(tick.symbol)
+            except asyncio.QueueFull:
+                self.stats['dropped'] += 1
+                continue
+            self.latest[tick.symbol] = tick
+            self.received[tick.symbol] = now
+
+    async def _consume(self):
+        while True:
+            symbols = [await self.queue.get()]
+            while not self.queue.empty():
+                symbols.append(self.queue.get_nowait())
+
+            ticks = [self.latest.pop(symbol) for symbol in symbols]
+            try:
+                alerts = self._process(ticks)
+                for alert in alerts:
+                    # Only queues the alert; delivery happens on the alert system's threads
+                    self.alert_system.send_alert(alert)
+            except Exception as e:
+                # Losing one batch beats a dead consumer that silently stops all stream alerts
+                self.stats['failed'] += 1
+                print(f"Failed to process {len(ticks)} ticker updates: {e}")
+
+    def _close_bars(self, ticks):
+        """Fold the last price of every bar the ticks have moved past into the indicator state"""
+        closed = {}
+        for tick in ticks:
+            bar = int(tick.timestamp.timestamp() // self.bar_seconds)
+            pending = self.bars.get(tick.symbol)
+            if pending is not None and bar < pending[0]:
+                # Late tick from a bar that is already closed
+                continue
+            if pending is not None and bar > pending[0]:
+                closed[tick.symbol] = pending[1]
+            self.bars[tick.symbol] = (bar, tick.price)
+        if closed:
+            self.indicators.update(list(closed), list(closed.values()))
+
+    def _process(self, ticks):
+        """Close finished bars, then evaluate the alert rules on live prices and the latest bar indicators"""
+        symbols = [tick.symbol for tick in ticks]
+        self._close_bars(ticks)
+
+        alerts = []
+        if self.alert_system is not None:
+            # Indicator values ride along with the price so cross rules can see them
+            known = [symbol for symbol in dict.fromkeys(symbols) if symbol in self.indicators.index]
+            indicators = {}
+            if known:
+                latest = self.indicators.latest(known)
+                names = list(latest)
+                rows = zip(*(values.tolist() for values in latest.values()))
+                indicators = {symbol: dict(zip(names, row)) for symbol, row in zip(known, rows)}
+            current = [
+                {**indicators.get(tick.symbol, {}), 'symbol': tick.symbol, 'price': tick.price}
+                for tick in ticks
+            ]
+            alerts = self.alert_system.check_alerts(current)
+
+        now = time.perf_counter()
+        latencies = [now - self.received.pop(symbol, now) for symbol in symbols]
+        self.stats['last_latency_ms'] = max(latencies) * 1000
+        self.stats['processed'] += len(ticks)
+        self.stats['alerts'] += len(alerts)
+        return alerts
+
+    def set_reference_prices(self, prices):
+        """Reset alert baselines, e.g. to the prices stored by the last polling tick"""
+        self.alert_system.set_baselines({symbol: {'price': price} for symbol, price in prices.items()})
+
+    def set_indicators(self, indicators):
+        """Continue from another indicator state, e.g. the one the polling pipeline restored at startup"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(setattr, self, 'indicators', indicators)
+        else:
+            self.indicators = indicators
+
+    def warm_up(self):
+        """Start streaming on a background thread with its own event loop"""
+        if self.thread is not None:
+            return
+        started = threading.Event()
+
+        def target():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.main_task = self.loop.create_task(self.run())
+            started.set()
+            try:
+                self.loop.run_until_complete(self.main_task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self.loop.close()
+
+        self.thread = threading.Thread(target=target, name="ticker-stream", daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def health_check(self):
+        """Healthy only while connected and still processing ticks, since polling alerts defer to the stream"""
+        consuming = self.consumer is not None and not self.consumer.done()
+        return self.thread is not None and self.thread.is_alive() and self.connected and consuming
+
+    def close(self):
+        """Stop streaming and wait for the background thread"""
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.main_task.cancel)
+        self.thread.join()
+        self.thread = None
@@ -5,26 +5,87 @@ load_dotenv()
 
 # API Configuration
 API_KEY = os.getenv("CRYPTO_API_KEY")
-API_BASE_URL = "https://api.coingecko.com/api/v3"
+API_KEY_HEADER = "x-cg-demo-api-key"
+API_BASE_URL = os.getenv("CRYPTO_API_BASE_URL", "https://api.coingecko.com/api/v3")
+API_RATE_LIMIT_PER_MINUTE = int(os.getenv("CRYPTO_API_RATE_LIMIT", 30))  # Requests per minute allowed by the plan
+API_POOL_SIZE = 10  # Keep-alive connections shared by all collectors
+API_TIMEOUT = 10  # seconds
+API_MAX_RETRIES = 5
+API_BACKOFF_BASE = 1.0  # seconds
 
 # Data Collection Settings
 COLLECTION_INTERVAL = 5  # minutes
-TOP_COINS = 100  # Number of top coins to track
+TOP_COINS = int(os.getenv("TOP_COINS", 100))  # Number of top coins to track
+MARKET_PAGE_SIZE = 250  # Coins per /coins/markets page (API maximum)
+MARKET_FETCH_WORKERS = 4  # Pages fetched concurrently, still under the global rate limit
+MARKET_PAGE_MAX_AGE = 900  # seconds a previously fetched page may be reused when its refresh fails
 HISTORICAL_DATA_DAYS = 30  # Days of historical data to maintain
+ROLLUP_RETENTION_DAYS = {"1h": 400, "1d": None}  # Days to keep each rollup, None keeps it forever
+ROLLUP_INTERVAL = 60  # minutes between rollup runs
+HISTORICAL_READ_MIN_POINTS = 100  # Reads without a resolution use the coarsest source giving at least this many buckets
+HEALTH_CHECK_INTERVAL = 300  # seconds between pipeline component health checks
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", 8))  # Concurrent pipeline stages
+
+# Streaming Ingest Settings
+STREAM_ENABLED = os.getenv("STREAM_ENABLED", "false").lower() == "true"  # Polling still runs as the fallback
+STREAM_URL = os.getenv("STREAM_URL", "wss://stream.binance.com:9443/ws/!miniTicker@arr")
+STREAM_SUBSCRIBE_MESSAGE = None  # Sent after connecting, for feeds that subscribe by message instead of URL
+STREAM_QUOTE_ASSET = "USDT"  # Pairs quoted in this asset are mapped to tracked symbols
+STREAM_QUEUE_SIZE = 10000  # Symbols waiting to be processed before new ticks are dropped
+STREAM_RECONNECT_DELAY = 5  # seconds
 
 # Database Configuration
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", 27017))
 DB_NAME = os.getenv("DB_NAME", "crypto_data")
 
+# Write-behind Buffer Settings
+DB_WRITE_BEHIND = True  # Buffer inserts and write them on a background thread
+DB_WRITE_BATCH_SIZE = 1000  # Documents per bulk_write
+DB_WRITE_FLUSH_INTERVAL = 2.0  # seconds between flushes of a partial batch
+DB_WRITE_MAX_PENDING = 50000  # Documents held in memory before producers block
+DB_WRITE_PUT_TIMEOUT = 5.0  # seconds a producer blocks before spilling to disk
+DB_WRITE_SPILL_PATH = os.getenv("DB_WRITE_SPILL_PATH", "db_spill.jsonl")
+DB_READ_BATCH_SIZE = 10000  # Documents per cursor batch for columnar historical reads
+
 # Alert Settings
 PRICE_CHANGE_ALERT = 5.0  # Alert if price changes by 5%
 VOLUME_CHANGE_ALERT = 20.0  # Alert if volume changes by 20%
 ENABLE_ALERTS = True
+ALERT_COOLDOWN = 900  # seconds before the same rule fires again for a symbol
+ALERT_RULES = [
+    # Per-symbol and per-category overrides of the global rules above, plus extra rules, e.g.
+    # {"name": "price_change", "threshold": 2.0, "symbol": "btc"},
+    # {"name": "price_change", "threshold": 15.0, "category": "MEME"},
+    # {"name": "macd_cross", "kind": "cross", "field": "macd", "reference": "macd_signal"},
+    # {"name": "rsi_overbought", "kind": "cross", "field": "rsi", "reference": 70, "direction": "up"},
+]
+ALERT_SINKS = [
+    # Alert destinations; alerts are printed when none are configured, e.g.
+    # {"type": "smtp", "smtp_server": "smtp.example.com:587", "from": "...", "to": "...", "username": "...", "password": "...", "use_tls": True},
+    # {"type": "webhook", "url": "https://hooks.example.com/crypto", "alert_types": ["PRICE_ALERT"]},
+    # {"type": "file", "path": "alerts.jsonl"},
+]
+ALERT_DIGEST_WINDOW = 10  # seconds alerts are collected into one digest per sink
+ALERT_MAX_DIGEST = 100  # Alerts per digest
+ALERT_MAX_PENDING = 10000  # Alerts queued per sink before new ones are dropped
+ALERT_MAX_RETRIES = 5
+ALERT_BACKOFF_BASE = 2.0  # seconds
+ALERT_SMTP_TIMEOUT = 10  # seconds
+ALERT_WEBHOOK_TIMEOUT = 10  # seconds
 
 # Export Settings
-EXPORT_FORMATS = ["csv", "json", "excel"]
-EXPORT_PATH = "exports"
+EXPORT_FORMATS = ["csv", "json", "excel", "parquet"]
+EXPORT_PATH = "exports"  # CSV, JSON and Excel files go in one subdirectory per day
+EXPORT_COMPRESSION = os.getenv("EXPORT_COMPRESSION") or None  # "gzip" or "zstd" for CSV and JSON
+EXPORT_WORKERS = 2  # Background threads writing exports
+EXPORT_SCHEDULES = {"csv": "hourly", "json": "hourly", "parquet": "tick", "excel": "hourly"}  # "tick", "hourly" or "daily"
+EXPORT_PARQUET_PATH = os.path.join(EXPORT_PATH, "parquet")  # Partitioned as <data_type>/date=<day>, rows sorted by symbol
+EXPORT_PARQUET_FLUSH_SECONDS = 900  # Buffered rows are written as one file per data type; a crash loses at most this much
+EXPORT_PARQUET_ROW_GROUP_SIZE = 100000  # Rows per row group; a full buffer is written immediately
+EXPORT_PARQUET_COMPRESSION = "zstd"
+EXPORT_PARQUET_COMPACT_MIN_FILES = 8  # Partitions with at least this many files are merged
+EXPORT_PARQUET_COMPACT_INTERVAL = 360  # minutes between compaction runs
 
 # Supported Cryptocurrencies
 SUPPORTED_COINS = [
@@ -46,6 +107,11 @@ MACD_PARAMS = {
     "slow": 26,
     "signal": 9
 }
+BOLLINGER_PARAMS = {
+    "window": 20,
+    "window_dev": 2
+}
+INDICATOR_SEED_SAMPLES = 200  # Stored ticks replayed into the indicator state when no checkpoint exists
 
 # Coin Classification Settings
 CLASSIFICATION_CATEGORIES = {
@@ -86,11 +152,39 @@ CLASSIFICATION_THRESHOLDS = {
     'confidence_required': 0.3  # Minimum confidence score required
 }
 
+# Price Model Training
+PRICE_MODEL_DIR = os.getenv("PRICE_MODEL_DIR", "price_models")  # One directory of artifacts per symbol
+TRAINING_HISTORY_DAYS = 365
+TRAINING_EPOCHS = 100  # Upper bound; early stopping usually ends sooner
+TRAINING_THREADS_PER_JOB = int(os.getenv("TRAINING_THREADS_PER_JOB", 1))  # TensorFlow threads per symbol job
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", 0))  # Parallel symbol jobs, 0 fills the cores at TRAINING_THREADS_PER_JOB each
+TRAINING_RESOLUTION_MINUTES = 60  # Bucket size of training data; full and incremental fits read the same rollup
+TRAINING_FINE_TUNE_EPOCHS = 5  # Epochs when warm-starting from the previous model
+TRAINING_FINE_TUNE_DAYS = 14  # Days before the watermark replayed with the new data, so fine-tuning keeps recent context
+TRAINING_DRIFT_THRESHOLD = 1.5  # Full refit when fine-tuned validation loss exceeds the last full fit's by this factor
+
+# Price Prediction Service
+PREDICTION_MAX_BATCH = 1024  # Windows per forward pass
+PREDICTION_MAX_WAIT_MS = 5  # How long a submitted request waits for others to share its batch
+
+# Sentiment Model Settings
+SENTIMENT_MODEL = "finiteautomata/bertweet-base-sentiment-analysis"
+SENTIMENT_BATCH_SIZE = 32  # Texts per forward pass; batches are sorted by length and padded per batch
+SENTIMENT_MAX_LENGTH = 128  # Tokens; BERTweet's position embeddings stop at 130
+SENTIMENT_NUM_THREADS = int(os.getenv("SENTIMENT_NUM_THREADS", 0))  # torch intra-op threads, 0 keeps torch's default
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")  # "torch" (FP32), "int8" (dynamic quantization) or "onnx"
+SENTIMENT_ONNX_DIR = "model_cache"  # Exported ONNX graphs, reused across runs
+SENTIMENT_CACHE_SIZE = 50000  # Scored texts kept in memory, 0 disables the cache
+SENTIMENT_PARITY_MIN_AGREEMENT = 0.98  # Label agreement a non-FP32 backend needs against FP32
+
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # Override to point at a local stub server
 GPT_MODEL = "gpt-4"  # or "gpt-3.5-turbo"
 
 # AI Analysis Settings
+PREDICTION_HISTORY_DAYS = 7  # Days of history in each tick's AI price prediction prompt
+PREDICTION_HISTORY_SYMBOLS = 10  # Leading symbols of the price list (by market cap) included in that prompt
 ANALYSIS_PROMPT_TEMPLATE = """
 Analyze the following cryptocurrency data and provide insights:
 Price: {price}
@@ -106,4 +200,39 @@ Please provide:
 3. Key factors affecting the price
 4. Trading recommendations
 5. Risk assessment
-""" 
\ No newline at end of file
+""" 
+
+# Batched AI Analysis Settings
+AI_MAX_CONCURRENCY = 8  # Maximum in-flight chat completion requests
+AI_COINS_PER_PROMPT = 5  # Coins packed into one batched prompt
+AI_MAX_RETRIES = 5
+AI_BACKOFF_BASE = 1.0  # seconds
+AI_MAX_RETRY_AFTER = 60  # seconds; a longer Retry-After from the server is capped to this
+
+BATCH_ANALYSIS_PROMPT_TEMPLATE = """
+Analyze each of the following cryptocurrencies and provide insights.
+Start the analysis of every coin with a line containing only "### " followed by its symbol,
+exactly as given below, and cover:
+1. Market sentiment analysis
+2. Short-term price prediction (24h)
+3. Key factors affecting the price
+4. Trading recommendations
+5. Risk assessment
+
+{coins}
+"""
+
+# AI Response Cache Settings
+AI_CACHE_ENABLED = True
+AI_CACHE_TTL = 900  # seconds before a cached response expires
+AI_CACHE_MAX_ENTRIES = 10000
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH")  # SQLite file for persistence, memory only when unset
+# Inputs are snapped to these grids before hashing so tiny moves still hit the cache:
+# "relative" steps are fractions of the value, "absolute" steps are in the input's units
+AI_CACHE_QUANTIZATION = {
+    "price": ("relative", 0.001),
+    "market_cap": ("relative", 0.005),
+    "volume_24h": ("relative", 0.02),
+    "rsi": ("absolute", 1.0),
+    "macd": ("absolute", 0.01)
+}
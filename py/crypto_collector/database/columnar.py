@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from pymongoarrow.api import find_numpy_all
+except ImportError:
+    find_numpy_all = None
+
+DEFAULT_DTYPES = {
+    'timestamp': 'datetime64[ms]',
+    'symbol': object
+}
+
+def _empty_column(field, size, dtypes):
+    dtype = np.dtype(dtypes.get(field, DEFAULT_DTYPES.get(field, np.float64)))
+    if dtype.kind == 'M':
+        return np.full(size, np.datetime64('NaT'), dtype=dtype)
+    if dtype.kind == 'f':
+        return np.full(size, np.nan, dtype=dtype)
+    return np.empty(size, dtype=dtype)
+
+def read_columns(cursor, fields, expected=0, dtypes=None):
+    """Fill preallocated NumPy columns from a cursor without keeping the documents around"""
+    dtypes = dtypes or {}
+    size = max(expected, 1)
+    columns = {field: _empty_column(field, size, dtypes) for field in fields}
+
+    count = 0
+    for document in cursor:
+        if count == size:
+            # More documents than counted (concurrent inserts); grow geometrically
+            size *= 2
+            for field in fields:
+                grown = _empty_column(field, size, dtypes)
+                grown[:count] = columns[field][:count]
+                columns[field] = grown
+        for field in fields:
+            value = document.get(field)
+            if value is not None:
+                columns[field][count] = value
+        count += 1
+
+    return {field: column[:count] for field, column in columns.items()}
+
+def read_columns_arrow(collection, query, fields, sort=None):
+    """Decode a query straight into NumPy arrays with PyMongoArrow"""
+    kwargs = {'projection': {field: True for field in fields}}
+    if sort:
+        kwargs['sort'] = sort
+    arrays = find_numpy_all(collection, query, **kwargs)
+    return {field: arrays[field] for field in fields if field in arrays}
+
+def to_frame(columns):
+    """Wrap columns in a DataFrame without copying them"""
+    return pd.DataFrame(columns, copy=False)
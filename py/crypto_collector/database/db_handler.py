@@ -1,30 +1,96 @@
+from datetime import datetime, timedelta
 from pymongo import MongoClient
-from config.settings import DB_HOST, DB_PORT, DB_NAME
+from database.write_buffer import WriteBehindBuffer
+from database.schema import bootstrap_schema, verify_schema
+from database.rollups import run_rollups, resolve_source
+from models.crypto_data import ColumnBatch, record_document
+from database.columnar import read_columns, read_columns_arrow, to_frame, find_numpy_all
+from config.settings import DB_HOST, DB_PORT, DB_NAME, DB_WRITE_BEHIND, DB_READ_BATCH_SIZE
 
 class DatabaseHandler:
-    def __init__(self):
+    def __init__(self, write_behind=DB_WRITE_BEHIND):
         self.client = MongoClient(host=DB_HOST, port=DB_PORT)
         self.db = self.client[DB_NAME]
+        self.writer = WriteBehindBuffer(self.db) if write_behind else None
+        
+    def warm_up(self):
+        """Open the connection pool and make sure indexes exist before the first write"""
+        self.client.admin.command('ping')
+        self.ensure_schema()
+        
+    def ensure_schema(self):
+        """Create the collection indexes once and report any that are missing or unused"""
+        bootstrap_schema(self.db)
+        report = verify_schema(self.db)
+        for collection, names in report['missing'].items():
+            print(f"Missing indexes on {collection}: {', '.join(names)}")
+        for collection, names in report['unused'].items():
+            print(f"Unused indexes on {collection}: {', '.join(names)}")
+        for collection in report['collection_scans']:
+            print(f"Historical queries on {collection} still scan the whole collection")
+        return report
+        
+    def health_check(self):
+        """Check that the MongoDB server is reachable"""
+        try:
+            self.client.admin.command('ping')
+        except Exception:
+            return False
+        return self.writer is None or self.writer.is_alive()
+            
+    def flush(self, timeout=None):
+        """Wait for buffered writes to reach the database"""
+        if self.writer is not None:
+            return self.writer.flush(timeout)
+        return True
+            
+    def close(self):
+        """Flush buffered writes and close the MongoDB client and its connection pool"""
+        if self.writer is not None:
+            self.writer.close()
+        self.client.close()
+        
+    def _insert_many(self, collection, documents):
+        """Insert documents inline, or hand them to the write-behind buffer"""
+        documents = list(documents)
+        if not documents:
+            return
+        if self.writer is not None:
+            self.writer.put(collection, documents)
+        else:
+            self.db[collection].insert_many(documents)
+        
+    def _time_series_document(self, item):
+        """Time-series collections need a BSON date in the timeField"""
+        document = record_document(item)
+        if isinstance(document.get('timestamp'), str):
+            document['timestamp'] = datetime.fromisoformat(document['timestamp'])
+        return document
+        
+    def _time_series_documents(self, items):
+        """Documents for a columnar batch or a list of records"""
+        if isinstance(items, ColumnBatch):
+            # Rows reused from a stale page were stored on the tick that fetched them
+            return items.fresh().to_documents()
+        return [self._time_series_document(item) for item in items]
         
     def store_data(self, price_data, market_data, info_data):
         """Store collected data in MongoDB"""
         try:
             # Store price data
-            self.db.prices.insert_many([vars(p) for p in price_data])
+            self._insert_many('prices', self._time_series_documents(price_data))
             
             # Store market data
-            self.db.markets.create_index([('primary_category', 1)])
-            self.db.markets.create_index([('secondary_category', 1)])
-            self.db.markets.insert_many([vars(m) for m in market_data])
+            self._insert_many('markets', self._time_series_documents(market_data))
             
             # Store coin info
-            self.db.info.insert_many([vars(i) for i in info_data])
+            self._insert_many('info', [vars(i) for i in info_data])
             
         except Exception as e:
             raise Exception(f"Failed to store data in database: {e}")
             
-    def get_historical_data(self, symbol, start_date, end_date):
-        """Retrieve historical data for analysis"""
+    def get_historical_data(self, symbol, start_date, end_date, resolution=None):
+        """Retrieve historical data for analysis, from the coarsest rollup that satisfies the range and resolution"""
         query = {
             "symbol": symbol,
             "timestamp": {
@@ -32,27 +98,102 @@ class DatabaseHandler:
                 "$lte": end_date
             }
         }
+        prices = self.db[resolve_source('prices', start_date, resolution, end_date=end_date)]
+        markets = self.db[resolve_source('markets', start_date, resolution, end_date=end_date)]
         return {
-            "prices": list(self.db.prices.find(query)),
-            "markets": list(self.db.markets.find(query)),
+            "prices": list(prices.find(query)),
+            "markets": list(markets.find(query)),
             "info": list(self.db.info.find({"symbol": symbol}))
-        } 
+        }
+        
+    def get_latest_prices(self, days=1):
+        """Most recent price and 24h volume per symbol, keyed by symbol"""
+        since = datetime.utcnow() - timedelta(days=days)
+        latest = {}
+        for collection, fields in (('prices', ['price']), ('markets', ['volume_24h'])):
+            pipeline = [
+                {'$match': {'timestamp': {'$gte': since}}},
+                {'$sort': {'symbol': 1, 'timestamp': 1}},
+                {'$group': {'_id': '$symbol', **{field: {'$last': f"${field}"} for field in fields}}}
+            ]
+            for document in self.db[collection].aggregate(pipeline):
+                latest.setdefault(document.pop('_id'), {}).update(document)
+        return latest
+        
+    def get_symbol_categories(self):
+        """Primary and secondary category of every classified coin, keyed by symbol"""
+        pipeline = [
+            {'$match': {'primary_category': {'$exists': True}}},
+            {'$sort': {'timestamp': 1}},
+            {'$group': {
+                '_id': '$symbol',
+                'primary': {'$last': '$primary_category'},
+                'secondary': {'$last': '$secondary_category'}
+            }}
+        ]
+        return {
+            document['_id']: [document['primary'], document.get('secondary')]
+            for document in self.db.markets.aggregate(pipeline)
+        }
+        
+    def get_coin_symbols(self):
+        """Symbols of the coins whose info has been collected, i.e. the supported coins"""
+        return sorted(self.db.info.distinct('symbol'))
+        
+    def get_historical_columns(self, symbol, start_date, end_date, fields=('timestamp', 'price'),
+                               collection='prices', resolution=None, batch_size=DB_READ_BATCH_SIZE,
+                               dtypes=None, as_frame=False, use_arrow=True):
+        """Stream a historical range into NumPy columns, fetching only the projected fields"""
+        query = {
+            "symbol": symbol,
+            "timestamp": {
+                "$gte": start_date,
+                "$lte": end_date
+            }
+        }
+        source = self.db[resolve_source(collection, start_date, resolution, end_date=end_date)]
+        sort = [('timestamp', 1)]
+        
+        if use_arrow and find_numpy_all is not None:
+            columns = read_columns_arrow(source, query, fields, sort)
+        else:
+            projection = {'_id': 0, **{field: 1 for field in fields}}
+            cursor = source.find(query, projection, sort=sort, batch_size=batch_size)
+            columns = read_columns(cursor, fields, source.count_documents(query), dtypes)
+            
+        return to_frame(columns) if as_frame else columns
+        
+    def run_rollups(self):
+        """Downsample prices and markets since the last rollup run into the 1h and 1d rollups"""
+        try:
+            self.flush()
+            run_rollups(self.db)
+        except Exception as e:
+            raise Exception(f"Failed to roll up historical data: {e}")
+        
+    def store_analysis(self, analysis_results):
+        """Store technical analysis results"""
+        self._insert_many('analysis', analysis_results.to_dict('records'))
         
     def store_signals(self, signals):
         """Store trading signals"""
-        self.db.signals.insert_many(signals)
+        self._insert_many('signals', signals)
         
     def store_ai_analysis(self, analyses):
         """Store AI analyses"""
-        self.db.ai_analyses.insert_many(analyses)
+        self._insert_many('ai_analyses', analyses)
         
     def store_market_report(self, report):
         """Store market report"""
-        self.db.market_reports.insert_one(report)
+        self._insert_many('market_reports', [report])
         
     def store_predictions(self, predictions):
         """Store price predictions"""
-        self.db.predictions.insert_many(predictions) 
+        self._insert_many('predictions', predictions if isinstance(predictions, list) else [predictions])
+        
+    def store_price_forecasts(self, forecasts):
+        """Store price model forecasts"""
+        self._insert_many('price_forecasts', forecasts)
         
     def get_coins_by_category(self, category: str, include_secondary: bool = True):
         """Get all coins in a specific category"""
@@ -62,4 +203,16 @@ class DatabaseHandler:
                 {'secondary_category': category} if include_secondary else {}
             ]
         }
-        return list(self.db.markets.find(query)) 
\ No newline at end of file
+        return list(self.db.markets.find(query))
+        
+    def save_indicator_state(self, state_document):
+        """Checkpoint incremental indicator state"""
+        self.db.indicator_state.replace_one(
+            {'_id': 'incremental_indicators'},
+            {'_id': 'incremental_indicators', **state_document},
+            upsert=True
+        )
+        
+    def load_indicator_state(self):
+        """Load the last incremental indicator checkpoint, if any"""
+        return self.db.indicator_state.find_one({'_id': 'incremental_indicators'}, {'_id': 0})
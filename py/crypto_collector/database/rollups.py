@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from config.settings import HISTORICAL_DATA_DAYS, ROLLUP_RETENTION_DAYS, HISTORICAL_READ_MIN_POINTS
+
+# Read sources ordered from finest to coarsest: (suffix, bucket size, retention in days)
+SOURCES = [
+    (None, timedelta(0), HISTORICAL_DATA_DAYS),
+    ('1h', timedelta(hours=1), ROLLUP_RETENTION_DAYS['1h']),
+    ('1d', timedelta(days=1), ROLLUP_RETENTION_DAYS['1d'])
+]
+
+# $dateTrunc unit and how far back each run recomputes buckets at least, for samples written late
+ROLLUP_UNITS = {
+    '1h': ('hour', timedelta(hours=2)),
+    '1d': ('day', timedelta(days=2))
+}
+
+def rollup_collection(collection, suffix):
+    return collection if suffix is None else f"{collection}_{suffix}"
+
+def _bucket_fields(collection):
+    """Aggregations per bucket; rollups keep a `price` field so readers of raw data keep working"""
+    if collection == 'prices':
+        return {
+            'open': {'$first': '$price'},
+            'high': {'$max': '$price'},
+            'low': {'$min': '$price'},
+            'close': {'$last': '$price'},
+            'price': {'$last': '$price'},
+            'samples': {'$sum': 1}
+        }
+    return {
+        'market_cap': {'$last': '$market_cap'},
+        'volume_24h': {'$last': '$volume_24h'},
+        'volume_24h_avg': {'$avg': '$volume_24h'},
+        'price_change_24h': {'$last': '$price_change_24h'},
+        'samples': {'$sum': 1}
+    }
+
+def rollup(db, collection, suffix, since):
+    """Downsample raw samples since `since` into OHLCV buckets, replacing buckets that already exist"""
+    unit, _ = ROLLUP_UNITS[suffix]
+    fields = _bucket_fields(collection)
+    db[collection].aggregate([
+        {'$match': {} if since is None else {'timestamp': {'$gte': since}}},
+        {'$sort': {'timestamp': 1}},
+        {'$group': {
+            '_id': {
+                'symbol': '$symbol',
+                'timestamp': {'$dateTrunc': {'date': '$timestamp', 'unit': unit}}
+            },
+            **fields
+        }},
+        {'$project': {
+            '_id': 0,
+            'symbol': '$_id.symbol',
+            'timestamp': '$_id.timestamp',
+            **{name: 1 for name in fields}
+        }},
+        {'$merge': {
+            'into': rollup_collection(collection, suffix),
+            'on': ['symbol', 'timestamp'],
+            'whenMatched': 'replace',
+            'whenNotMatched': 'insert'
+        }}
+    ])
+
+def _truncate(moment, unit):
+    if unit == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _watermark(db, suffix):
+    """Start of the last successful run of a rollup, or None if it never ran"""
+    state = db.rollup_state.find_one({'_id': suffix})
+    if state is None:
+        return None
+    watermark = state['watermark']
+    return watermark if watermark.tzinfo is not None else watermark.replace(tzinfo=timezone.utc)
+
+def run_rollups(db, now=None):
+    """Refresh the 1h and 1d rollups of prices and markets since their last successful run
+
+    Each run recomputes from the bucket holding the previous run's start, so
+    buckets missed during downtime are backfilled, and at least the lookback
+    of ROLLUP_UNITS for samples written late. A rollup that never ran covers
+    all raw samples.
+    """
+    now = now or datetime.now(timezone.utc)
+    for suffix, (unit, lookback) in ROLLUP_UNITS.items():
+        watermark = _watermark(db, suffix)
+        since = None if watermark is None else _truncate(min(watermark, now - lookback), unit)
+        for collection in ('prices', 'markets'):
+            rollup(db, collection, suffix, since)
+        # Only advanced once both collections are rolled up, so a failed run is redone
+        db.rollup_state.update_one({'_id': suffix}, {'$set': {'watermark': now}}, upsert=True)
+
+def resolve_source(collection, start_date, resolution=None, now=None, end_date=None):
+    """Pick the collection that serves a range starting at start_date
+
+    The coarsest source whose retention covers start_date and whose buckets
+    are no larger than the resolution (a timedelta) is used. Without a
+    resolution, the range (up to end_date, or now) is split into at least
+    HISTORICAL_READ_MIN_POINTS buckets, so a year reads daily rollups and a
+    week hourly ones. The finest covering source serves anything finer.
+    """
+    now = now or datetime.now(timezone.utc)
+    if start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    end_date = end_date or now
+    if end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+
+    covering = [
+        (suffix, bucket) for suffix, bucket, retention in SOURCES
+        if retention is None or start_date >= now - timedelta(days=retention)
+    ]
+    if not covering:
+        # Nothing keeps data that old; the longest-lived rollup has the most of it
+        return rollup_collection(collection, SOURCES[-1][0])
+
+    if resolution is None:
+        resolution = (end_date - start_date) / HISTORICAL_READ_MIN_POINTS
+
+    fitting = [suffix for suffix, bucket in covering if bucket <= resolution]
+    suffix = fitting[-1] if fitting else covering[0][0]
+    return rollup_collection(collection, suffix)
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, IndexModel
+from config.settings import HISTORICAL_DATA_DAYS, ROLLUP_RETENTION_DAYS
+
+def _symbol_timestamp():
+    return IndexModel([('symbol', ASCENDING), ('timestamp', ASCENDING)], name='symbol_timestamp')
+
+# Indexes every collection needs, created once at startup
+INDEXES = {
+    'prices': [_symbol_timestamp()],
+    'markets': [
+        _symbol_timestamp(),
+        IndexModel([('primary_category', ASCENDING)], name='primary_category'),
+        IndexModel([('secondary_category', ASCENDING)], name='secondary_category')
+    ],
+    'info': [IndexModel([('symbol', ASCENDING)], name='symbol')],
+    'analysis': [_symbol_timestamp()],
+    'ai_analyses': [IndexModel([('coin', ASCENDING), ('timestamp', ASCENDING)], name='coin_timestamp')]
+}
+
+def _rollup_indexes(retention_days):
+    """Rollup buckets are upserted by (symbol, timestamp), which $merge requires to be unique"""
+    indexes = [IndexModel([('symbol', ASCENDING), ('timestamp', ASCENDING)], name='symbol_timestamp', unique=True)]
+    if retention_days:
+        indexes.append(IndexModel([('timestamp', ASCENDING)], name='retention', expireAfterSeconds=retention_days * 86400))
+    return indexes
+
+INDEXES.update({
+    f"{collection}_{suffix}": _rollup_indexes(days)
+    for suffix, days in ROLLUP_RETENTION_DAYS.items()
+    for collection in ('prices', 'markets')
+})
+
+# Raw samples live in native time-series collections with symbol as the metaField
+TIME_SERIES_COLLECTIONS = {
+    'prices': {'timeField': 'timestamp', 'metaField': 'symbol', 'granularity': 'minutes'},
+    'markets': {'timeField': 'timestamp', 'metaField': 'symbol', 'granularity': 'minutes'}
+}
+
+# Collections read by symbol and timestamp range in get_historical_data
+RANGE_QUERY_COLLECTIONS = ['prices', 'markets']
+
+def create_time_series_collections(db, retention_days=HISTORICAL_DATA_DAYS):
+    """Create the raw time-series collections and keep their retention in sync with settings"""
+    warnings = []
+    expire_after = retention_days * 86400
+    existing = {info['name']: info for info in db.list_collections()}
+
+    for name, options in TIME_SERIES_COLLECTIONS.items():
+        info = existing.get(name)
+        if info is None:
+            db.create_collection(name, timeseries=options, expireAfterSeconds=expire_after)
+        elif info.get('type') == 'timeseries':
+            if info.get('options', {}).get('expireAfterSeconds') != expire_after:
+                db.command('collMod', name, expireAfterSeconds=expire_after)
+        else:
+            # Existing data has to be migrated by hand; a regular collection cannot be converted
+            warnings.append(f"{name} is a regular collection; retention of {retention_days} days is not enforced")
+
+    return warnings
+
+def bootstrap_schema(db):
+    """Create time-series collections, then the indexes listed in INDEXES; existing indexes are left untouched"""
+    # Must run first: create_indexes on a missing collection would create a regular one
+    for warning in create_time_series_collections(db):
+        print(warning)
+
+    created = {}
+    for collection, indexes in INDEXES.items():
+        created[collection] = db[collection].create_indexes(indexes)
+    return created
+
+def _plan_stages(plan):
+    """Yield every stage name in a query plan tree"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+def verify_schema(db):
+    """Report missing indexes, indexes never used since server start and range queries that scan collections"""
+    report = {'missing': {}, 'unused': {}, 'collection_scans': []}
+
+    for collection, indexes in INDEXES.items():
+        existing = db[collection].index_information()
+        missing = [index.document['name'] for index in indexes if index.document['name'] not in existing]
+        if missing:
+            report['missing'][collection] = missing
+
+        try:
+            stats = list(db[collection].aggregate([{'$indexStats': {}}]))
+        except Exception:
+            # $indexStats needs a real server and the right privileges
+            stats = []
+        unused = [
+            stat['name'] for stat in stats
+            if stat['name'] != '_id_' and stat.get('accesses', {}).get('ops', 0) == 0
+        ]
+        if unused:
+            report['unused'][collection] = unused
+
+    # The historical range query should be answered by an index scan
+    now = datetime.utcnow()
+    query = {'symbol': '', 'timestamp': {'$gte': now - timedelta(days=1), '$lte': now}}
+    for collection in RANGE_QUERY_COLLECTIONS:
+        try:
+            plan = db[collection].find(query).explain().get('queryPlanner', {}).get('winningPlan', {})
+        except Exception:
+            continue
+        if 'COLLSCAN' in set(_plan_stages(plan)):
+            report['collection_scans'].append(collection)
+
+    return report
@@ -0,0 +1,228 @@
+import os
+import time
+import threading
+from collections import deque
+from bson import json_util
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, DuplicateKeyError, ServerSelectionTimeoutError
+from config.settings import (
+    DB_WRITE_BATCH_SIZE, DB_WRITE_FLUSH_INTERVAL, DB_WRITE_MAX_PENDING, DB_WRITE_PUT_TIMEOUT,
+    DB_WRITE_SPILL_PATH
+)
+
+UNREACHABLE_ERRORS = (ConnectionFailure, ServerSelectionTimeoutError)
+
+class WriteBehindBuffer:
+    """Batch inserts across collections and write them with unordered bulk_write on a background thread"""
+
+    def __init__(self, db, batch_size=DB_WRITE_BATCH_SIZE, flush_interval=DB_WRITE_FLUSH_INTERVAL,
+                 max_pending=DB_WRITE_MAX_PENDING, put_timeout=DB_WRITE_PUT_TIMEOUT,
+                 spill_path=DB_WRITE_SPILL_PATH):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self.spill_path = spill_path
+
+        self.pending = deque()
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.spill_lock = threading.Lock()
+        self.flush_requested = False
+        self.stopping = False
+        self.stats = {'written': 0, 'batches': 0, 'spilled': 0, 'replayed': 0, 'write_errors': 0, 'rejected': 0}
+
+        self.thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self.thread.start()
+
+    def put(self, collection, documents):
+        """Queue documents for a collection, blocking while the buffer is full"""
+        # Copy so the bulk insert does not add _id to the caller's dicts
+        items = [(collection, dict(document)) for document in documents]
+        if not items:
+            return
+
+        with self.condition:
+            deadline = time.monotonic() + self.put_timeout
+            while len(self.pending) + len(items) > self.max_pending and not self.stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            # A dead writer would never drain the queue; spill instead of piling up in memory
+            if (len(self.pending) + len(items) <= self.max_pending and not self.stopping
+                    and self.thread.is_alive()):
+                self.pending.extend(items)
+                if len(self.pending) >= self.batch_size:
+                    self.condition.notify_all()
+                return
+
+        # The writer could not keep up; keep the data on disk rather than in memory
+        self._spill(items)
+
+    def flush(self, timeout=None):
+        """Write everything queued so far and wait for it to land; False if it did not"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            while (self.pending or self.in_flight) and self.thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            # The writer died with documents still queued
+            return not self.pending
+
+    def close(self):
+        """Flush remaining documents and stop the background thread"""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join()
+
+    def is_alive(self):
+        return self.thread.is_alive()
+
+    def _take_batch(self):
+        """Wait for a full batch, the flush interval or a flush request, then take pending documents"""
+        with self.condition:
+            deadline = time.monotonic() + self.flush_interval
+            while (len(self.pending) < self.batch_size and not self.flush_requested
+                   and not self.stopping):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            size = min(len(self.pending), self.batch_size)
+            if self.flush_requested or self.stopping:
+                size = len(self.pending)
+            batch = [self.pending.popleft() for _ in range(size)]
+            self.in_flight = len(batch)
+            self.flush_requested = False
+            # Space was freed for producers blocked on back-pressure
+            self.condition.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                if batch:
+                    self._write(batch)
+                elif self._has_spill():
+                    self._replay_spill()
+            except Exception as e:
+                # Never let one bad batch stop the writer for good
+                print(f"Write-behind failed on a batch of {len(batch)} documents: {e}")
+
+            with self.condition:
+                self.in_flight = 0
+                self.condition.notify_all()
+                if self.stopping and not self.pending:
+                    return
+
+    def _write(self, batch):
+        """Write one batch grouped per collection, spilling it if Mongo is unreachable"""
+        by_collection = {}
+        for collection, document in batch:
+            by_collection.setdefault(collection, []).append(document)
+
+        reachable = True
+        for collection, documents in by_collection.items():
+            try:
+                self.db[collection].bulk_write([InsertOne(d) for d in documents], ordered=False)
+                self.stats['written'] += len(documents)
+            except BulkWriteError as e:
+                # Unordered writes keep going past individual failures such as duplicate keys
+                details = e.details or {}
+                self.stats['written'] += details.get('nInserted', 0)
+                self.stats['write_errors'] += len(details.get('writeErrors', []))
+                print(f"Bulk write to {collection} had {len(details.get('writeErrors', []))} errors")
+            except UNREACHABLE_ERRORS as e:
+                print(f"MongoDB unreachable, spilling {len(documents)} documents: {e}")
+                self._spill([(collection, d) for d in documents])
+                reachable = False
+            except Exception as e:
+                # e.g. InvalidDocument: the whole bulk fails to encode, so find the bad documents one by one
+                print(f"Bulk write to {collection} failed, retrying documents individually: {e}")
+                reachable = self._write_each(collection, documents) and reachable
+        self.stats['batches'] += 1
+
+        # The server is reachable again; retry anything left on disk
+        if reachable and self._has_spill():
+            self._replay_spill()
+
+    def _write_each(self, collection, documents):
+        """Insert documents one at a time, dropping those the server or encoder rejects"""
+        for position, document in enumerate(documents):
+            try:
+                self.db[collection].insert_one(document)
+                self.stats['written'] += 1
+            except DuplicateKeyError:
+                # Already landed before the bulk write failed
+                pass
+            except UNREACHABLE_ERRORS as e:
+                print(f"MongoDB unreachable, spilling {len(documents) - position} documents: {e}")
+                self._spill([(collection, d) for d in documents[position:]])
+                return False
+            except Exception as e:
+                self.stats['rejected'] += 1
+                print(f"Dropped a document for {collection}: {e}")
+        return True
+
+    def _has_spill(self):
+        return os.path.exists(self.spill_path) or os.path.exists(f"{self.spill_path}.replay")
+
+    def _spill(self, items):
+        """Append documents to the local spill file"""
+        with self.spill_lock:
+            with open(self.spill_path, 'a') as f:
+                # Keep any _id already assigned so a replay of a partial write hits duplicate keys
+                for collection, document in items:
+                    f.write(json_util.dumps({'collection': collection, 'document': document}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        self.stats['spilled'] += len(items)
+
+    def _replay_spill(self):
+        """Re-insert spilled documents; on failure they stay on disk for the next attempt"""
+        replay_path = f"{self.spill_path}.replay"
+        with self.spill_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replay_path)
+
+        by_collection = {}
+        with open(replay_path) as f:
+            for line in f:
+                if line.strip():
+                    record = json_util.loads(line)
+                    by_collection.setdefault(record['collection'], []).append(record['document'])
+
+        try:
+            for collection, documents in by_collection.items():
+                try:
+                    self.db[collection].bulk_write([InsertOne(d) for d in documents], ordered=False)
+                except BulkWriteError as e:
+                    self.stats['write_errors'] += len((e.details or {}).get('writeErrors', []))
+                except UNREACHABLE_ERRORS:
+                    raise
+                except Exception:
+                    self._write_each(collection, documents)
+                self.stats['replayed'] += len(documents)
+                # Drop what landed so a later failure does not write it twice
+                by_collection[collection] = []
+        except UNREACHABLE_ERRORS:
+            with self.spill_lock:
+                with open(replay_path, 'w') as f:
+                    for collection, documents in by_collection.items():
+                        for document in documents:
+                            f.write(json_util.dumps({'collection': collection, 'document': document}) + "\n")
+            return
+
+        os.remove(replay_path)
@@ -1,34 +1,203 @@
 import os
-import json
+import threading
 import pandas as pd
 from datetime import datetime
-from config.settings import EXPORT_PATH, EXPORT_FORMATS
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+from models.crypto_data import ColumnBatch
+from exporters.parquet_store import ParquetStore, pa
+from config.settings import (
+    EXPORT_PATH, EXPORT_FORMATS, EXPORT_COMPRESSION, EXPORT_WORKERS, EXPORT_SCHEDULES, EXPORT_PARQUET_PATH
+)
+
+try:
+    import xlsxwriter
+    # Write-only engine, several times faster than openpyxl
+    EXCEL_ENGINE = 'xlsxwriter'
+except ImportError:
+    EXCEL_ENGINE = None
+
+# File suffix added by each compression method; Excel is already a zip container
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+# Period covered by one file for each non-tick schedule
+PERIOD_KEYS = {'hourly': "%Y%m%d_%H", 'daily': "%Y%m%d"}
+EXCEL_MAX_ROWS = 1048575
+
+def to_frame(data):
+    """Convert any dataset the pipeline emits to a DataFrame, once"""
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, ColumnBatch):
+        return data.to_frame()
+    if isinstance(data, dict):
+        # A single report or prediction becomes one row
+        return pd.DataFrame([data])
+    return pd.DataFrame(list(data))
+
+def _naive_datetimes(frame):
+    """Excel cannot store timezone-aware datetimes"""
+    aware = [column for column in frame.columns if isinstance(frame[column].dtype, pd.DatetimeTZDtype)]
+    if not aware:
+        return frame
+    return frame.assign(**{column: frame[column].dt.tz_localize(None) for column in aware})
 
 class DataExporter:
-    def __init__(self):
-        os.makedirs(EXPORT_PATH, exist_ok=True)
-        
+    def __init__(self, formats=EXPORT_FORMATS, compression=EXPORT_COMPRESSION, max_workers=EXPORT_WORKERS,
+                 schedules=EXPORT_SCHEDULES, path=EXPORT_PATH, parquet_path=EXPORT_PARQUET_PATH):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.formats = formats
+        self.compression = compression
+        self.schedules = {fmt: schedules.get(fmt, 'tick') for fmt in formats}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="exporter")
+        self.parquet = None
+        if "parquet" in self.formats:
+            if pa is None:
+                print("pyarrow is not installed; skipping Parquet export")
+            else:
+                self.parquet = ParquetStore(parquet_path)
+        self.pending = set()
+
+        # cadence -> {'period': key, 'frames': {data_type: [frames]}} for formats written once per period
+        self.periods = {}
+        self.lock = threading.Lock()
+
     def export_data(self, data, data_type):
         """Export data in multiple formats"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_filename = f"{data_type}_{timestamp}"
-        
+        now = datetime.now()
+        base_filename = os.path.join(self._directory(now), f"{data_type}_{now:%Y%m%d_%H%M%S}")
+
+        # Convert once and let every writer stream from the same frame
+        frame = to_frame(data)
+        results = {}
+
+        for fmt in self.formats:
+            if fmt != "parquet" and self.schedules[fmt] == 'tick':
+                results[fmt] = self._write(fmt, {data_type: frame}, base_filename)
+
+        if self.parquet is not None:
+            # Appended to the partitioned dataset rather than a new file per tick
+            results['parquet'] = self.parquet.append(frame, data_type)
+
+        results.update(self._accumulate(frame, data_type))
+        return results
+
+    def _directory(self, day):
+        """One subdirectory per day keeps the export directory small"""
+        directory = os.path.join(self.path, f"{day:%Y-%m-%d}")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def _write(self, fmt, frames, base_filename):
+        """Write datasets in one format; Excel puts them in one workbook, other formats one file each"""
+        paths = self._output_paths(fmt, list(frames), base_filename)
+
+        if fmt == "excel":
+            with pd.ExcelWriter(paths[0], engine=EXCEL_ENGINE) as writer:
+                for data_type, frame in frames.items():
+                    frame = _naive_datetimes(frame)
+                    # A sheet holds at most EXCEL_MAX_ROWS data rows
+                    for number, offset in enumerate(range(0, max(len(frame), 1), EXCEL_MAX_ROWS)):
+                        sheet = data_type[:28] if number == 0 else f"{data_type[:24]} ({number + 1})"
+                        frame.iloc[offset:offset + EXCEL_MAX_ROWS].to_excel(writer, sheet_name=sheet, index=False)
+            return paths[0]
+
+        for frame, path in zip(frames.values(), paths):
+            if fmt == "csv":
+                frame.to_csv(path, index=False, date_format='%Y-%m-%dT%H:%M:%S.%f', compression=self.compression)
+            else:
+                # pandas serializes Timestamp/datetime values itself, unlike json.dump
+                frame.to_json(path, orient='records', date_format='iso', date_unit='ms', compression=self.compression)
+        return paths[0] if len(paths) == 1 else paths
+
+    def _output_paths(self, fmt, data_types, base_filename):
+        """Files _write produces for these datasets in one format"""
+        if fmt == "excel":
+            return [f"{base_filename}.xlsx"]
+        if fmt not in ("csv", "json"):
+            raise Exception(f"Unknown export format: {fmt}")
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        return [
+            f"{base_filename if len(data_types) == 1 else f'{base_filename}_{data_type}'}.{fmt}{suffix}"
+            for data_type in data_types
+        ]
+
+    def _accumulate(self, frame, data_type, now=None):
+        """Collect frames for periodic formats and write the previous period once a new one starts"""
+        cadences = {cadence for fmt, cadence in self.schedules.items() if cadence != 'tick' and fmt != "parquet"}
+        now = now or datetime.now()
+        finished = []
+
+        with self.lock:
+            for cadence in cadences:
+                period = now.strftime(PERIOD_KEYS[cadence])
+                state = self.periods.get(cadence)
+                if state is not None and state['period'] != period:
+                    finished.append((cadence, self.periods.pop(cadence)))
+                    state = None
+                if state is None:
+                    state = self.periods[cadence] = {'period': period, 'frames': {}}
+                state['frames'].setdefault(data_type, []).append(frame)
+
         results = {}
-        
-        if "csv" in EXPORT_FORMATS:
-            csv_path = os.path.join(EXPORT_PATH, f"{base_filename}.csv")
-            pd.DataFrame(data).to_csv(csv_path, index=False)
-            results['csv'] = csv_path
-            
-        if "json" in EXPORT_FORMATS:
-            json_path = os.path.join(EXPORT_PATH, f"{base_filename}.json")
-            with open(json_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            results['json'] = json_path
-            
-        if "excel" in EXPORT_FORMATS:
-            excel_path = os.path.join(EXPORT_PATH, f"{base_filename}.xlsx")
-            pd.DataFrame(data).to_excel(excel_path, index=False)
-            results['excel'] = excel_path
-            
-        return results 
\ No newline at end of file
+        for cadence, state in finished:
+            results.update(self._write_period(cadence, state))
+        return results
+
+    def _write_period(self, cadence, state):
+        """Write one file (or workbook) per format for everything collected in a period"""
+        frames = {
+            data_type: pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+            for data_type, parts in state['frames'].items()
+        }
+        day = datetime.strptime(state['period'], PERIOD_KEYS[cadence])
+        base_filename = os.path.join(self._directory(day), f"{cadence}_{state['period']}")
+        formats = [fmt for fmt, fmt_cadence in self.schedules.items() if fmt_cadence == cadence and fmt != "parquet"]
+        if any(os.path.exists(path) for fmt in formats for path in self._output_paths(fmt, list(frames), base_filename)):
+            # A restart inside the period already wrote part of it
+            base_filename = f"{base_filename}_{datetime.now():%H%M%S}"
+
+        return {fmt: self._write(fmt, frames, base_filename) for fmt in formats}
+
+    def flush_periods(self):
+        """Write the periodic exports of the current, unfinished periods"""
+        with self.lock:
+            finished = list(self.periods.items())
+            self.periods = {}
+        results = {}
+        for cadence, state in finished:
+            results.update(self._write_period(cadence, state))
+        return results
+
+    def compact(self):
+        """Merge small Parquet files; runs on the export threads"""
+        if self.parquet is not None:
+            return self._track(self.executor.submit(self.parquet.compact), "compact Parquet exports")
+
+    def submit(self, data, data_type):
+        """Export on a background thread so the pipeline tick does not wait for disk"""
+        return self._track(self.executor.submit(self.export_data, data, data_type), f"export {data_type}")
+
+    def _track(self, future, action):
+        """Keep a job pending until it finishes and log its failure"""
+        self.pending.add(future)
+        future.add_done_callback(lambda done: self._finished(done, action))
+        return future
+
+    def _finished(self, future, action):
+        self.pending.discard(future)
+        if future.exception() is not None:
+            print(f"Failed to {action}: {future.exception()}")
+
+    def flush(self, timeout=None):
+        """Wait for exports already submitted, up to timeout seconds in total"""
+        _, running = wait(list(self.pending), timeout)
+        if running:
+            raise TimeoutError(f"{len(running)} export jobs still running after {timeout}s")
+
+    def close(self):
+        """Finish queued exports, write the partial periodic exports and buffered Parquet rows"""
+        self.executor.shutdown(wait=True)
+        self.flush_periods()
+        if self.parquet is not None:
+            self.parquet.close()
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from config.settings import (
+    EXPORT_PARQUET_PATH, EXPORT_PARQUET_FLUSH_SECONDS, EXPORT_PARQUET_ROW_GROUP_SIZE,
+    EXPORT_PARQUET_COMPRESSION, EXPORT_PARQUET_COMPACT_MIN_FILES
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Hive-style directories: <data_type>/date=YYYY-MM-DD/part-*.parquet, rows sorted by symbol within a file
+PARTITION_KEYS = ('date',)
+SYMBOL_COLUMNS = ('symbol', 'coin')
+
+def _partition_dir(root, data_type, date):
+    return os.path.join(root, data_type, f"date={date}")
+
+def _sort_keys(table):
+    """Symbol then time, so row-group statistics let readers skip other symbols"""
+    keys = [column for column in SYMBOL_COLUMNS if column in table.column_names][:1]
+    if 'timestamp' in table.column_names:
+        keys.append('timestamp')
+    return [(key, 'ascending') for key in keys]
+
+def _flatten_nested(frame):
+    """Store dict/list cells (reports, predictions) as JSON text so every file keeps the same schema"""
+    nested = [
+        column for column in frame.columns
+        if frame[column].dtype == object and frame[column].map(lambda value: isinstance(value, (dict, list))).any()
+    ]
+    if not nested:
+        return frame
+    return frame.assign(**{
+        column: frame[column].map(lambda value: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value)
+        for column in nested
+    })
+
+def _partitions(frame):
+    """Yield (date, table) for each day the frame touches, slicing one Arrow conversion"""
+    if frame.empty:
+        return
+    if 'timestamp' in frame.columns:
+        timestamps = pd.to_datetime(frame['timestamp'], utc=True, errors='coerce', format='mixed')
+        dates = timestamps.dt.strftime('%Y-%m-%d').fillna(datetime.utcnow().strftime('%Y-%m-%d'))
+    else:
+        dates = pd.Series(datetime.utcnow().strftime('%Y-%m-%d'), index=frame.index)
+
+    # The partition path carries the date; readers get it back as a column
+    data = frame.drop(columns=[column for column in PARTITION_KEYS if column in frame.columns])
+    if 'timestamp' in frame.columns:
+        # One timestamp type across files: naive UTC milliseconds, like PriceBatch
+        data['timestamp'] = timestamps.dt.tz_localize(None).astype('datetime64[ms]')
+
+    # Sort rows by partition once, then hand out zero-copy slices
+    keys = dates.to_numpy()
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    table = pa.Table.from_pandas(data, preserve_index=False).take(pa.array(order))
+    bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    for start, end in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(keys)]])):
+        yield keys[start], table.slice(start, end - start)
+
+class ParquetStore:
+    """Append-only, partitioned Parquet dataset; rows are buffered per partition and written as row groups"""
+
+    def __init__(self, root=EXPORT_PARQUET_PATH, flush_seconds=EXPORT_PARQUET_FLUSH_SECONDS,
+                 row_group_size=EXPORT_PARQUET_ROW_GROUP_SIZE, compression=EXPORT_PARQUET_COMPRESSION):
+        if pa is None:
+            raise Exception("Parquet export requires pyarrow")
+        self.root = root
+        self.flush_seconds = flush_seconds
+        self.row_group_size = row_group_size
+        self.compression = compression
+
+        # (data_type, date) -> {'tables': [...], 'rows': n, 'since': monotonic time}
+        self.buffers = {}
+        self.lock = threading.Lock()
+        self.stats = {'appended_rows': 0, 'files_written': 0, 'files_compacted': 0}
+
+    def append(self, frame, data_type):
+        """Buffer a dataset's rows in their partitions, writing partitions that are full or old"""
+        frame = _flatten_nested(frame)
+        with self.lock:
+            for date, table in _partitions(frame):
+                buffer = self.buffers.setdefault(
+                    (data_type, date), {'tables': [], 'rows': 0, 'since': time.monotonic()}
+                )
+                buffer['tables'].append(table)
+                buffer['rows'] += table.num_rows
+                self.stats['appended_rows'] += table.num_rows
+        return self.flush(max_age=self.flush_seconds)
+
+    def flush(self, max_age=0):
+        """Write every partition buffered for at least `max_age` seconds (or holding a full row group)"""
+        written = []
+        now = time.monotonic()
+        with self.lock:
+            for key in list(self.buffers):
+                buffer = self.buffers[key]
+                if now - buffer['since'] < max_age and buffer['rows'] < self.row_group_size:
+                    continue
+                written.append(self._write(key, buffer['tables']))
+                del self.buffers[key]
+        return written
+
+    def _write(self, key, tables):
+        directory = _partition_dir(self.root, *key)
+        os.makedirs(directory, exist_ok=True)
+        table = pa.concat_tables(tables, promote_options='permissive')
+        table = table.sort_by(_sort_keys(table))
+        name = f"part-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        path = os.path.join(directory, name)
+
+        # Readers ignore dot-files, so a half-written file is never picked up
+        temporary = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, temporary, row_group_size=self.row_group_size, compression=self.compression)
+        os.replace(temporary, path)
+        self.stats['files_written'] += 1
+        return path
+
+    def compact(self, data_type=None, min_files=EXPORT_PARQUET_COMPACT_MIN_FILES):
+        """Merge partitions holding many small files into one file sorted by symbol and timestamp"""
+        compacted = 0
+        data_types = [data_type] if data_type else sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+        for name in data_types:
+            for directory, _, files in os.walk(os.path.join(self.root, name)):
+                parts = sorted(os.path.join(directory, f) for f in files if f.startswith('part-') and f.endswith('.parquet'))
+                if len(parts) < min_files:
+                    continue
+                with self.lock:
+                    table = pa.concat_tables([pq.read_table(part) for part in parts], promote_options='permissive')
+                    table = table.sort_by(_sort_keys(table))
+                    name_part = f"part-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+                    temporary = os.path.join(directory, f".{name_part}.tmp")
+                    pq.write_table(table, temporary, row_group_size=self.row_group_size, compression=self.compression)
+                    os.replace(temporary, os.path.join(directory, name_part))
+                    for part in parts:
+                        os.remove(part)
+                compacted += 1
+                self.stats['files_compacted'] += len(parts)
+        return compacted
+
+    def close(self):
+        """Write everything still buffered"""
+        return self.flush()
+
+def _utc_naive(value):
+    value = pd.Timestamp(value)
+    return value.tz_convert('UTC').tz_localize(None) if value.tzinfo is not None else value
+
+def _date_range(start, end):
+    day = start.date()
+    while day <= end.date():
+        yield day.strftime('%Y-%m-%d')
+        day += timedelta(days=1)
+
+def read_range(data_type, symbols=None, start=None, end=None, columns=None, root=EXPORT_PARQUET_PATH):
+    """Load a symbol/time range, opening only the partitions that can match"""
+    if pa is None:
+        raise Exception("Reading Parquet exports requires pyarrow")
+    base = os.path.join(root, data_type)
+    if not os.path.isdir(base):
+        return pd.DataFrame()
+    start = _utc_naive(start) if start is not None else None
+    end = _utc_naive(end) if end is not None else None
+
+    # Enumerate matching partition directories instead of discovering the whole dataset
+    if start is not None and end is not None:
+        dates = [f"date={date}" for date in _date_range(start, end)]
+    else:
+        dates = [entry for entry in os.listdir(base) if entry.startswith('date=')]
+    files = []
+    for date in dates:
+        directory = os.path.join(base, date)
+        if os.path.isdir(directory):
+            files.extend(
+                os.path.join(directory, f) for f in sorted(os.listdir(directory))
+                if f.startswith('part-') and f.endswith('.parquet')
+            )
+    if not files:
+        return pd.DataFrame()
+
+    partitioning = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+    schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options='permissive')
+    if 'date' not in schema.names:
+        schema = schema.append(pa.field('date', pa.string()))
+    dataset = ds.dataset(files, schema=schema, partitioning=partitioning, partition_base_dir=base)
+
+    # Symbol and timestamp bounds are pushed down to row-group statistics
+    condition = None
+    symbol_column = next((column for column in SYMBOL_COLUMNS if column in schema.names), None)
+    if symbols is not None and symbol_column is not None:
+        condition = ds.field(symbol_column).isin([str(symbol) for symbol in symbols])
+    if 'timestamp' in schema.names:
+        timestamp_type = schema.field('timestamp').type
+        for bound, op in ((start, 'ge'), (end, 'le')):
+            if bound is None:
+                continue
+            value = pa.scalar(bound.to_pydatetime(), type=timestamp_type)
+            term = ds.field('timestamp') >= value if op == 'ge' else ds.field('timestamp') <= value
+            condition = term if condition is None else condition & term
+
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
@@ -1,89 +1,177 @@
 import time
 import schedule
-from collectors.price_collector import PriceCollector
-from collectors.market_collector import MarketCollector
-from collectors.info_collector import InfoCollector
-from database.db_handler import DatabaseHandler
+from datetime import datetime, timedelta
 from analyzers.market_analyzer import MarketAnalyzer
-from analyzers.ai_analyzer import AIAnalyzer
-from alerts.alert_system import AlertSystem
-from exporters.data_exporter import DataExporter
-from config.settings import COLLECTION_INTERVAL
+from pipeline.runtime import PipelineRuntime
+from pipeline.scheduler import format_report
+from config.settings import (
+    COLLECTION_INTERVAL, ROLLUP_INTERVAL, EXPORT_PARQUET_COMPACT_INTERVAL,
+    PREDICTION_HISTORY_DAYS, PREDICTION_HISTORY_SYMBOLS
+)
 
-def collect_and_analyze_data():
-    """Collect, analyze and process cryptocurrency data"""
-    price_collector = PriceCollector()
-    market_collector = MarketCollector()
-    info_collector = InfoCollector()
-    db = DatabaseHandler()
-    analyzer = MarketAnalyzer()
-    ai_analyzer = AIAnalyzer()
-    alert_system = AlertSystem()
-    exporter = DataExporter()
+def build_stages(runtime, scheduler):
+    """Register the collect/analyze/export/store stages of one tick"""
+    db = runtime.db
+    ai_analyzer = runtime.ai_analyzer
+    alert_system = runtime.alert_system
+    exporter = runtime.exporter
 
-    try:
-        # Collect data
-        price_data = price_collector.collect()
-        market_data = market_collector.collect()
-        info_data = info_collector.collect()
-        
-        # Analyze market data
-        analysis_results = analyzer.calculate_technical_indicators()
-        trading_signals = analyzer.generate_signals()
-        
-        # AI Analysis
-        ai_analyses = []
-        for coin_data in market_data:
-            ai_analysis = ai_analyzer.analyze_market_data(
-                coin_data,
-                analysis_results[analysis_results['symbol'] == coin_data['symbol']].iloc[0]
-            )
-            ai_analyses.append(ai_analysis)
-        
-        # Generate market report
-        market_report = ai_analyzer.generate_market_report(ai_analyses)
-        
-        # Price predictions
-        predictions = ai_analyzer.predict_price_movement(
-            db.get_historical_data(days=7),
-            analysis_results
+    def analyze(prices):
+        # A stale page repeats old prices, which would count as new samples in the indicator state
+        analyzer = MarketAnalyzer(prices.fresh(), incremental=runtime.indicators)
+        return analyzer.calculate_technical_indicators(), analyzer.generate_signals()
+
+    def analyze_coins(markets, analysis):
+        # Market rows carry no price; take it from the symbol's analysis row, which has the indicators too
+        indicators = analysis[0].drop_duplicates('symbol', keep='last').set_index('symbol')
+        return ai_analyzer.analyze_market_data_batch(
+            (dict(coin_data, price=indicators.at[coin_data['symbol'], 'price']), indicators.loc[coin_data['symbol']])
+            for coin_data in markets.to_documents()
+            if coin_data['symbol'] in indicators.index
         )
-        
-        # Check for alerts
-        alerts = alert_system.check_price_alerts(price_data, db.get_latest_prices())
+
+    def load_history(prices):
+        # Daily closes of the leading symbols keep the prediction prompt small
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=PREDICTION_HISTORY_DAYS)
+        history = {}
+        for symbol in dict.fromkeys([coin.symbol for coin in prices][:PREDICTION_HISTORY_SYMBOLS]):
+            data = db.get_historical_data(symbol, start_date, end_date, resolution=timedelta(days=1))
+            history[symbol] = [{'timestamp': price['timestamp'], 'price': price['price']} for price in data['prices']]
+        return history
+
+    def check_alerts(prices, markets, latest_prices, analysis):
+        # The ticker stream already alerts within milliseconds; polling only covers outages
+        if runtime.streaming():
+            return []
+        volumes = dict(zip(markets['symbol'].tolist(), markets['volume_24h'].tolist()))
+        # Indicator values (MACD, RSI, ...) per symbol, so cross rules can fire too
+        indicators = (
+            analysis[0].drop_duplicates('symbol', keep='last')
+            .set_index('symbol')
+            .drop(columns=['price', 'timestamp'], errors='ignore')
+        )
+        indicators = indicators.astype(object).where(indicators.notna(), None).to_dict('index')
+        current = [
+            {**indicators.get(coin['symbol'], {}), **coin, 'volume_24h': volumes.get(coin['symbol'])}
+            for coin in prices.to_documents()
+        ]
+        alerts = alert_system.check_price_alerts(current, latest_prices)
         for alert in alerts:
             alert_system.send_alert(alert)
-        
-        # Export data
-        exporter.export_data(price_data, "prices")
-        exporter.export_data(analysis_results, "analysis")
-        exporter.export_data(ai_analyses, "ai_analysis")
-        exporter.export_data(market_report, "market_report")
-        exporter.export_data(predictions, "predictions")
-        
-        # Store data in database
-        db.store_data(price_data, market_data, info_data)
-        db.store_analysis(analysis_results)
-        db.store_signals(trading_signals)
-        db.store_ai_analysis(ai_analyses)
-        db.store_market_report(market_report)
-        db.store_predictions(predictions)
+        return alerts
+
+    # Collect data
+    scheduler.add_stage('prices', runtime.price_collector.collect)
+    scheduler.add_stage('markets', runtime.market_collector.collect)
+    scheduler.add_stage('info', runtime.info_collector.collect)
+    scheduler.add_stage('latest_prices', db.get_latest_prices)
+
+    # Analyze market data
+    scheduler.add_stage('history', load_history, ['prices'])
+    scheduler.add_stage('analysis', analyze, ['prices'])
+    scheduler.add_stage('ai_analysis', analyze_coins, ['markets', 'analysis'])
+    scheduler.add_stage(
+        'market_report',
+        lambda ai_analysis: ai_analyzer.generate_market_report(ai_analysis),
+        ['ai_analysis']
+    )
+    scheduler.add_stage(
+        'predictions',
+        lambda history, analysis: ai_analyzer.predict_price_movement(history, analysis[0]),
+        ['history', 'analysis']
+    )
+
+    scheduler.add_stage(
+        'price_forecasts',
+        lambda prices: runtime.forecast_prices(prices.fresh()['symbol'].tolist()),
+        ['prices']
+    )
+
+    # Check for alerts
+    scheduler.add_stage('alerts', check_alerts, ['prices', 'markets', 'latest_prices', 'analysis'])
+
+    # Export data; files are written on the exporter's threads
+    scheduler.add_stage('export_prices', lambda prices: exporter.submit(prices.fresh(), "prices"), ['prices'])
+    scheduler.add_stage('export_analysis', lambda analysis: exporter.submit(analysis[0], "analysis"), ['analysis'])
+    scheduler.add_stage('export_ai_analysis', lambda ai_analysis: exporter.submit(ai_analysis, "ai_analysis"), ['ai_analysis'])
+    scheduler.add_stage('export_market_report', lambda market_report: exporter.submit(market_report, "market_report"), ['market_report'])
+    scheduler.add_stage('export_predictions', lambda predictions: exporter.submit(predictions, "predictions"), ['predictions'])
+    scheduler.add_stage(
+        'export_price_forecasts',
+        lambda price_forecasts: exporter.submit(price_forecasts, "price_forecasts") if price_forecasts else None,
+        ['price_forecasts']
+    )
+
+    # Store data in database; prices are stored only after the previous prices were read for alerts
+    scheduler.add_stage(
+        'store_data',
+        lambda prices, markets, info, latest_prices: db.store_data(prices, markets, info),
+        ['prices', 'markets', 'info', 'latest_prices']
+    )
+    scheduler.add_stage('store_analysis', lambda analysis: db.store_analysis(analysis[0]), ['analysis'])
+    scheduler.add_stage('store_signals', lambda analysis: db.store_signals(analysis[1]), ['analysis'])
+    scheduler.add_stage('store_ai_analysis', lambda ai_analysis: db.store_ai_analysis(ai_analysis), ['ai_analysis'])
+    scheduler.add_stage('store_market_report', lambda market_report: db.store_market_report(market_report), ['market_report'])
+    scheduler.add_stage('store_predictions', lambda predictions: db.store_predictions(predictions), ['predictions'])
+    scheduler.add_stage('store_price_forecasts', lambda price_forecasts: db.store_price_forecasts(price_forecasts), ['price_forecasts'])
+    scheduler.add_stage('store_indicator_state', lambda analysis: runtime.checkpoint_indicators(), ['analysis'])
+
+def collect_and_analyze_data(runtime):
+    """Collect, analyze and process cryptocurrency data"""
+    scheduler = runtime.scheduler
+
+    try:
+        with runtime.tick():
+            scheduler.clear()
+            build_stages(runtime, scheduler)
+            _, report = scheduler.run()
+            runtime.stats['last_stage_report'] = report
+            print(format_report(report))
+            
+            if report['errors']:
+                raise Exception(f"{len(report['errors'])} stage(s) failed")
         
     except Exception as e:
         print(f"Error in data collection and analysis: {e}")
 
+def run_rollups(runtime):
+    """Downsample raw samples since the last run into the hourly and daily rollups"""
+    try:
+        runtime.db.run_rollups()
+    except Exception as e:
+        print(f"Error in rollup job: {e}")
+
+def compact_exports(runtime):
+    """Merge the small Parquet files written by each tick"""
+    try:
+        runtime.exporter.compact()
+    except Exception as e:
+        print(f"Error in export compaction job: {e}")
+
 def main():
     print("Starting Crypto Data Collector...")
     
-    # Run initial collection
-    collect_and_analyze_data()
+    # Build long-lived components once and reuse them across ticks
+    runtime = PipelineRuntime()
+    runtime.warm_up()
     
-    # Schedule regular collection
-    schedule.every(COLLECTION_INTERVAL).minutes.do(collect_and_analyze_data)
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    try:
+        # Run initial collection
+        collect_and_analyze_data(runtime)
+        
+        # Schedule regular collection
+        schedule.every(COLLECTION_INTERVAL).minutes.do(collect_and_analyze_data, runtime)
+        schedule.every(ROLLUP_INTERVAL).minutes.do(run_rollups, runtime)
+        schedule.every(EXPORT_PARQUET_COMPACT_INTERVAL).minutes.do(compact_exports, runtime)
+        
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Shutting down Crypto Data Collector...")
+    finally:
+        runtime.shutdown()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
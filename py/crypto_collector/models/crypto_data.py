@@ -1,21 +1,23 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 from typing import Optional
+import numpy as np
+import pandas as pd
 
-@dataclass
+@dataclass(slots=True)
 class PriceData:
     symbol: str
     price: float
     timestamp: datetime
-    
-@dataclass
+
+@dataclass(slots=True)
 class MarketData:
     symbol: str
     market_cap: float
     volume_24h: float
     price_change_24h: float
     timestamp: datetime
-    
+
 @dataclass
 class CoinInfo:
     symbol: str
@@ -25,4 +27,121 @@ class CoinInfo:
     github: str
     twitter: str
     reddit: str
-    last_updated: datetime 
\ No newline at end of file
+    last_updated: datetime
+
+def record_document(record):
+    """Plain dict of a (possibly slotted) dataclass instance"""
+    names = getattr(record, '__slots__', None) or [field.name for field in fields(record)]
+    return {name: getattr(record, name) for name in names}
+
+def _as_column(values, dtype):
+    """Convert one field to a NumPy array, without copying when it already has the right dtype"""
+    if dtype.kind == 'M':
+        if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+            return values.astype(dtype, copy=False)
+        # ISO strings from the API and naive datetimes are both taken as UTC
+        return pd.to_datetime(pd.Series(values, dtype=object), utc=True, format='ISO8601').dt.tz_localize(None).to_numpy(dtype)
+    return np.asarray(values, dtype=dtype)
+
+class ColumnBatch:
+    """Many samples stored as one NumPy array per field instead of one object per sample"""
+    RECORD = None
+    DTYPES = {}
+
+    def __init__(self, stale=None, **columns):
+        self.columns = {field: _as_column(columns[field], np.dtype(dtype)) for field, dtype in self.DTYPES.items()}
+        if len({len(column) for column in self.columns.values()}) > 1:
+            raise ValueError(f"{type(self).__name__} columns must all have the same length")
+        # Rows reused from an earlier fetch; they were already stored when they were fresh
+        self.stale = np.zeros(len(self), dtype=bool) if stale is None else np.asarray(stale, dtype=bool)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a batch from record objects such as PriceData"""
+        records = list(records)
+        return cls(**{field: [getattr(record, field) for record in records] for field in cls.DTYPES})
+
+    @classmethod
+    def from_rows(cls, rows, mapping):
+        """Build a batch straight from API rows, `mapping` giving the row key for each field"""
+        rows = list(rows)
+        return cls(
+            stale=[bool(row.get('stale')) for row in rows],
+            **{field: [row.get(key) for row in rows] for field, key in mapping.items()}
+        )
+
+    @classmethod
+    def concat(cls, batches):
+        batches = list(batches)
+        return cls(
+            stale=np.concatenate([batch.stale for batch in batches]),
+            **{field: np.concatenate([batch.columns[field] for batch in batches]) for field in cls.DTYPES}
+        )
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def fresh(self):
+        """The rows fetched this time, without those reused from a stale page"""
+        if not self.stale.any():
+            return self
+        keep = ~self.stale
+        return type(self)(**{field: column[keep] for field, column in self.columns.items()})
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def __iter__(self):
+        for values in zip(*self._python_columns()):
+            yield self.RECORD(*values)
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+    def _python_columns(self):
+        """Columns as lists of Python scalars, the one copy every row-wise output needs"""
+        python_columns = []
+        for column in self.columns.values():
+            values = column.tolist()
+            if column.dtype.kind == 'f' and np.isnan(column).any():
+                # Missing API values were stored as None before they became NaN
+                values = [None if value != value else value for value in values]
+            python_columns.append(values)
+        return python_columns
+
+    def to_frame(self):
+        """DataFrame over the batch arrays without copying them"""
+        return pd.DataFrame(self.columns, copy=False)
+
+    def to_documents(self):
+        """MongoDB documents; timestamps become datetimes, which BSON stores natively"""
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self._python_columns())]
+
+    def to_json_records(self):
+        """JSON-ready records with ISO-8601 UTC timestamps"""
+        names = list(self.columns)
+        columns = self._python_columns()
+        for index, column in enumerate(self.columns.values()):
+            if column.dtype.kind == 'M':
+                columns[index] = np.datetime_as_string(column, unit='ms', timezone='UTC').tolist()
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+class PriceBatch(ColumnBatch):
+    RECORD = PriceData
+    DTYPES = {
+        'symbol': object,
+        'price': np.float64,
+        'timestamp': 'datetime64[ms]'
+    }
+
+class MarketBatch(ColumnBatch):
+    RECORD = MarketData
+    DTYPES = {
+        'symbol': object,
+        'market_cap': np.float64,
+        'volume_24h': np.float64,
+        'price_change_24h': np.float64,
+        'timestamp': 'datetime64[ms]'
+    }
@@ -0,0 +1,116 @@
+import os
+import time
+import threading
+from concurrent.futures import Future
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from config.settings import SENTIMENT_MODEL, SENTIMENT_BACKEND, SENTIMENT_ONNX_DIR, SENTIMENT_MAX_LENGTH
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+BACKENDS = ('torch', 'int8', 'onnx')
+
+class SentimentModel:
+    """Tokenizer plus a backend that maps a padded batch to logits"""
+
+    def __init__(self, name, backend, tokenizer, model=None, session=None, load_seconds=0.0):
+        self.name = name
+        self.backend = backend
+        self.tokenizer = tokenizer
+        self.model = model
+        self.session = session
+        self.load_seconds = load_seconds
+
+    def logits(self, batch):
+        """Logits as a NumPy array for a batch from tokenizer.pad(..., return_tensors="pt")"""
+        if self.session is not None:
+            inputs = {
+                node.name: batch[node.name].numpy().astype(np.int64)
+                for node in self.session.get_inputs()
+            }
+            return self.session.run(None, inputs)[0]
+        with torch.inference_mode():
+            return self.model(**batch).logits.numpy()
+
+def _export_onnx(model, tokenizer, path):
+    """Export the FP32 model once; later loads reuse the file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = ['input_ids', 'attention_mask']
+    axes = {name: {0: 'batch', 1: 'sequence'} for name in names}
+    temporary = f"{path}.tmp"
+    torch.onnx.export(
+        model,
+        (sample['input_ids'], sample['attention_mask']),
+        temporary,
+        input_names=names,
+        output_names=['logits'],
+        dynamic_axes={**axes, 'logits': {0: 'batch'}},
+        opset_version=18,
+        # Weights inline, so the rename below moves a single self-contained file
+        external_data=False
+    )
+    os.replace(temporary, path)
+
+def _load(name, backend):
+    start = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    tokenizer.model_max_length = SENTIMENT_MAX_LENGTH
+    model = AutoModelForSequenceClassification.from_pretrained(name)
+    model.eval()
+
+    if backend == 'torch':
+        return SentimentModel(name, backend, tokenizer, model=model, load_seconds=time.perf_counter() - start)
+
+    if backend == 'int8':
+        # Dynamic quantization: int8 weights for the Linear layers, activations quantized on the fly
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return SentimentModel(name, backend, tokenizer, model=quantized, load_seconds=time.perf_counter() - start)
+
+    if backend == 'onnx':
+        if onnxruntime is None:
+            raise Exception("ONNX sentiment backend requires onnxruntime")
+        path = os.path.join(SENTIMENT_ONNX_DIR, f"{name.replace('/', '--')}.onnx")
+        if not os.path.exists(path):
+            _export_onnx(model, tokenizer, path)
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = torch.get_num_threads()
+        session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        return SentimentModel(name, backend, tokenizer, session=session, load_seconds=time.perf_counter() - start)
+
+    raise Exception(f"Unknown sentiment backend: {backend}")
+
+# (name, backend) -> Future of the SentimentModel, so concurrent callers share one load
+_models = {}
+_models_lock = threading.Lock()
+
+def get_sentiment_model(name=SENTIMENT_MODEL, backend=SENTIMENT_BACKEND):
+    """Process-wide sentiment model, loaded on first use and shared by every analyzer"""
+    key = (name, backend)
+    with _models_lock:
+        future = _models.get(key)
+        loading = future is None
+        if loading:
+            future = _models[key] = Future()
+
+    if loading:
+        # Loaded outside the registry lock: other models stay available, callers of this one wait on the future
+        try:
+            future.set_result(_load(name, backend))
+        except BaseException as e:
+            with _models_lock:
+                if _models.get(key) is future:
+                    # A later call retries the load
+                    del _models[key]
+            future.set_exception(e)
+            raise
+    return future.result()
+
+def unload_sentiment_models():
+    """Drop loaded models, e.g. to free memory after a batch job"""
+    with _models_lock:
+        _models.clear()
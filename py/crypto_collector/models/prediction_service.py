@@ -0,0 +1,230 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import LSTM, Dense, Dropout
+from models.price_predictor import PricePredictor
+from pipeline.training import symbol_dir
+from config.settings import PRICE_MODEL_DIR, PREDICTION_MAX_BATCH, PREDICTION_MAX_WAIT_MS
+
+def model_weights(model):
+    """Weights of each LSTM and Dense layer, in order; Dropout is inactive at inference"""
+    weights = []
+    for layer in model.layers:
+        if isinstance(layer, Dropout):
+            continue
+        if not isinstance(layer, (LSTM, Dense)):
+            raise Exception(f"Unsupported layer for batched inference: {layer.__class__.__name__}")
+        weights.append(layer.get_weights())
+    return weights
+
+def stack_weights(models_weights):
+    """Per-layer weights of same-shaped models stacked along a leading symbol axis"""
+    shapes = [[w.shape for w in layer] for layer in models_weights[0]]
+    for weights in models_weights[1:]:
+        if [[w.shape for w in layer] for layer in weights] != shapes:
+            raise Exception("Batched inference needs every symbol model to share one architecture")
+
+    return [
+        [tf.constant(np.stack([weights[depth][k] for weights in models_weights])) for k in range(len(layer))]
+        for depth, layer in enumerate(shapes)
+    ]
+
+def compile_forward(layers, sequence_length, features):
+    """Compiled forward pass over stacked weights, one row per (window, symbol index)"""
+    *lstm_layers, (dense_kernel, dense_bias) = layers
+
+    @tf.function(input_signature=[
+        tf.TensorSpec([None, sequence_length, features], tf.float32),
+        tf.TensorSpec([None], tf.int32)
+    ])
+    def forward(windows, index):
+        """Keras LSTM (gates i, f, c, o) with each row's weights gathered by its symbol index"""
+        x = windows
+        for depth, (kernel, recurrent, bias) in enumerate(lstm_layers):
+            kernel, recurrent, bias = (tf.gather(w, index) for w in (kernel, recurrent, bias))
+            units = recurrent.shape[1]
+            # The input projection of every timestep in one batched matmul
+            projected = tf.einsum('bti,bij->btj', x, kernel) + bias[:, None, :]
+            h = tf.zeros([tf.shape(x)[0], units])
+            c = tf.zeros([tf.shape(x)[0], units])
+            outputs = []
+            for t in range(sequence_length):
+                z = projected[:, t] + tf.einsum('bi,bij->bj', h, recurrent)
+                i, f, g, o = tf.split(z, 4, axis=-1)
+                c = tf.sigmoid(f) * c + tf.sigmoid(i) * tf.tanh(g)
+                h = tf.sigmoid(o) * tf.tanh(c)
+                outputs.append(h)
+            if depth < len(lstm_layers) - 1:
+                x = tf.stack(outputs, axis=1)
+        return tf.einsum('bi,bij->bj', h, tf.gather(dense_kernel, index)) + tf.gather(dense_bias, index)
+
+    return forward
+
+class BatchedModels:
+    """Stacked weights, scaler parameters and compiled forward pass of a set of symbols"""
+
+    def __init__(self, symbols, directory):
+        weights, scales, offsets, lengths = [], [], [], set()
+        for symbol in symbols:
+            predictor = PricePredictor.load(symbol_dir(symbol, directory))
+            # Only the stacked weights and scaler parameters stay resident, not the Keras models
+            weights.append(model_weights(predictor.model))
+            scales.append(predictor.scaler.scale_)
+            offsets.append(predictor.scaler.min_)
+            lengths.add(predictor.sequence_length)
+            tf.keras.backend.clear_session()
+        if len(lengths) != 1:
+            raise Exception("Batched inference needs one sequence length across symbols")
+
+        self.sequence_length = lengths.pop()
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.scale = np.stack(scales).astype(np.float32)
+        self.offset = np.stack(offsets).astype(np.float32)
+        self.forward = compile_forward(stack_weights(weights), self.sequence_length, self.scale.shape[1])
+
+    def predict(self, symbols, windows, max_batch):
+        """Next-step price for each (symbol, window) pair, chunked to max_batch"""
+        try:
+            index = np.array([self.index[symbol] for symbol in symbols], dtype=np.int32)
+        except KeyError as e:
+            raise Exception(f"No price model loaded for {e.args[0]}")
+
+        X = np.empty((len(windows), self.sequence_length, self.scale.shape[1]), dtype=np.float32)
+        for row, window in enumerate(windows):
+            window = np.asarray(window, dtype=np.float32)
+            if len(window) < self.sequence_length:
+                raise Exception(f"Window for {symbols[row]} has {len(window)} rows, needs {self.sequence_length}")
+            X[row] = window[-self.sequence_length:].reshape(self.sequence_length, -1)
+
+        X = X * self.scale[index][:, None, :] + self.offset[index][:, None, :]
+        scaled = np.empty(len(index), dtype=np.float32)
+        for start in range(0, len(index), max_batch):
+            chunk = slice(start, start + max_batch)
+            scaled[chunk] = self.forward(X[chunk], index[chunk]).numpy()[:, 0]
+
+        # Inverse of the price column's MinMax scaling
+        return (scaled - self.offset[index, 0]) / self.scale[index, 0]
+
+class PredictionService:
+    """Keeps every symbol's price model resident and predicts for many symbols in one forward pass
+
+    Each request carries a symbol index that selects that symbol's weights
+    inside a single compiled graph, so 1,000 symbols cost one call rather
+    than 1,000 Keras `predict` calls. `predict_batch` is the synchronous
+    path; `submit` queues single requests and a background thread merges
+    whatever arrives within PREDICTION_MAX_WAIT_MS into one batch.
+    """
+
+    def __init__(self, symbols, directory=PRICE_MODEL_DIR, max_batch=PREDICTION_MAX_BATCH,
+                 max_wait=PREDICTION_MAX_WAIT_MS / 1000):
+        self.directory = directory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.stats = {'requests': 0, 'batches': 0, 'failed': 0, 'cancelled': 0}
+        self.models = BatchedModels(symbols, directory)
+
+        self.thread = threading.Thread(target=self._run, name="price-predictions", daemon=True)
+        self.thread.start()
+
+    def load(self, symbols):
+        """(Re)load the saved models of symbols, e.g. after a training run"""
+        # Built aside and swapped in whole, so a batch in flight never mixes old and new state
+        models = BatchedModels(symbols, self.directory)
+        with self.condition:
+            self.models = models
+
+    @property
+    def sequence_length(self):
+        """Prices each window needs"""
+        return self.models.sequence_length
+
+    def has_model(self, symbol):
+        return symbol in self.models.index
+
+    def _predict(self, symbols, windows):
+        return self.models.predict(symbols, windows, self.max_batch)
+
+    def predict_batch(self, windows):
+        """Predicted next price per symbol for a {symbol: recent prices} mapping"""
+        symbols = list(windows)
+        predictions = self._predict(symbols, [windows[symbol] for symbol in symbols])
+        return dict(zip(symbols, predictions.tolist()))
+
+    def submit(self, symbol, window):
+        """Queue one prediction; the Future resolves once its micro-batch has run"""
+        future = Future()
+        with self.condition:
+            if self.stopping:
+                raise Exception("Prediction service has been closed")
+            if not self.thread.is_alive():
+                raise Exception("Prediction service batching thread has stopped")
+            self.pending.append((symbol, window, future))
+            self.stats['requests'] += 1
+            self.condition.notify_all()
+        return future
+
+    def predict(self, symbol, window, timeout=None):
+        return self.submit(symbol, window).result(timeout)
+
+    def _take_batch(self):
+        """Wait for a first request, then for company until max_wait passes or the batch is full
+
+        Returns an empty batch only once the service is stopping and drained.
+        """
+        with self.condition:
+            while True:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+
+                deadline = time.monotonic() + self.max_wait
+                while len(self.pending) < self.max_batch and not self.stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                taken = [self.pending.popleft() for _ in range(min(len(self.pending), self.max_batch))]
+                # Callers may have given up on their Future; the rest can no longer be cancelled
+                batch = [request for request in taken if request[2].set_running_or_notify_cancel()]
+                self.stats['cancelled'] += len(taken) - len(batch)
+                if batch or not self.pending and self.stopping:
+                    return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            with self.condition:
+                self.stats['batches'] += 1
+            try:
+                predictions = self._predict([symbol for symbol, _, _ in batch], [window for _, window, _ in batch])
+            except Exception:
+                # One bad request fails its whole batch; retry the requests one by one
+                with self.condition:
+                    self.stats['failed'] += 1
+                for symbol, window, future in batch:
+                    try:
+                        future.set_result(float(self._predict([symbol], [window])[0]))
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            for (_, _, future), prediction in zip(batch, predictions):
+                future.set_result(float(prediction))
+
+    def health_check(self):
+        return self.thread.is_alive()
+
+    def close(self):
+        """Finish queued requests, then stop the batching thread"""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join()
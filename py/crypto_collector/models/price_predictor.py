@@ -1,16 +1,27 @@
+import os
+import json
+import pickle
 import numpy as np
 import pandas as pd
 import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import MinMaxScaler
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, BackupAndRestore
+
+def best_val_loss(history):
+    """Lowest validation loss of a fit, the one restore_best_weights keeps; None without validation data"""
+    losses = history.history.get('val_loss')
+    return float(min(losses)) if losses else None
 
 class PricePredictor:
     def __init__(self, sequence_length=60):
         self.sequence_length = sequence_length
         self.model = None
         self.scaler = MinMaxScaler()
+        self.watermark = None  # Timestamp of the newest row the model has been trained on
+        self.val_loss = None  # Validation loss of the last full fit, the reference for drift
         
     def create_model(self, input_shape):
         """Create LSTM model for price prediction"""
@@ -32,58 +43,145 @@ class PricePredictor:
         
         return model
     
-    def prepare_data(self, data):
+    def split_index(self, rows, validation_split=0.0):
+        """Number of training windows when the last validation_split of them is held out"""
+        windows = max(rows - self.sequence_length, 0)
+        return int(windows * (1 - validation_split))
+
+    def scale(self, data, validation_split=0.0, fit=True):
+        """Fit the scaler on the rows training windows see, then scale the whole series"""
+        values = np.asarray(data, dtype=np.float32)
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
+
+        # Validation rows stay out of the fit so their range doesn't leak into training
+        if fit:
+            train_rows = self.split_index(len(values), validation_split) + self.sequence_length
+            self.scaler.fit(values[:train_rows])
+        return self.scaler.transform(values).astype(np.float32)
+
+    def prepare_data(self, data, validation_split=0.0):
         """Prepare data for LSTM model"""
-        # Scale the data
-        scaled_data = self.scaler.fit_transform(data)
-        
-        X, y = [], []
-        for i in range(self.sequence_length, len(scaled_data)):
-            X.append(scaled_data[i-self.sequence_length:i])
-            y.append(scaled_data[i, 0])
-            
-        return np.array(X), np.array(y)
-    
-    def train(self, price_data, validation_split=0.2):
+        scaled_data = self.scale(data, validation_split)
+
+        # X[i] is scaled_data[i:i + sequence_length], a read-only view rather than a copy per window
+        X = sliding_window_view(scaled_data[:-1], self.sequence_length, axis=0).transpose(0, 2, 1)
+        y = scaled_data[self.sequence_length:, 0]
+
+        return X, y
+
+    def windows(self, series, targets, starts, batch_size=32, shuffle=False):
+        """tf.data pipeline of (window, target) batches gathered from series by window start"""
+        offsets = tf.range(self.sequence_length, dtype=tf.int64)
+        dataset = tf.data.Dataset.from_tensors(starts)
+        if shuffle:
+            # A fresh permutation of the whole index each epoch, without a per-element shuffle buffer
+            dataset = dataset.map(tf.random.shuffle)
+        dataset = dataset.unbatch()
+
+        # One vectorized gather per batch; only the batch in flight is ever materialized
+        return dataset.batch(batch_size).map(
+            lambda start: (tf.gather(series, start[:, None] + offsets), tf.gather(targets, start)),
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).prefetch(tf.data.AUTOTUNE)
+
+    def datasets(self, data, validation_split=0.2, batch_size=32, fit_scaler=True):
+        """Training and validation tf.data pipelines that cut windows batch by batch"""
+        scaled_data = self.scale(data, validation_split, fit=fit_scaler)
+        split = self.split_index(len(scaled_data), validation_split)
+        series = tf.constant(scaled_data)
+        targets = tf.constant(scaled_data[self.sequence_length:, 0])
+        starts = np.arange(len(scaled_data) - self.sequence_length, dtype=np.int64)
+
+        train = self.windows(series, targets, starts[:split], batch_size, shuffle=True)
+        validation = None
+        if split < len(starts):
+            validation = self.windows(series, targets, starts[split:], batch_size)
+
+        return train, validation, scaled_data.shape[1]
+
+    def train(self, price_data, validation_split=0.2, epochs=100, checkpoint_path=None, backup_dir=None, verbose=1):
         """Train the price prediction model"""
         # Prepare training data
-        X, y = self.prepare_data(price_data)
-        
+        train, validation, features = self.datasets(price_data, validation_split)
+
         # Create and compile model
-        self.model = self.create_model((X.shape[1], X.shape[2]))
-        
+        self.model = self.create_model((self.sequence_length, features))
+
+        history = self._fit(train, validation, epochs, checkpoint_path, backup_dir, verbose)
+        self.val_loss = best_val_loss(history)
+        self.watermark = price_data.index.max()
+        return history
+
+    def fine_tune(self, price_data, validation_split=0.2, epochs=5, checkpoint_path=None, backup_dir=None, verbose=1):
+        """Continue training the current model on recent data, keeping its scaler"""
+        if self.model is None:
+            raise Exception("Model not trained yet")
+
+        # Refitting the scaler would shift every input the weights were trained on
+        train, validation, _ = self.datasets(price_data, validation_split, fit_scaler=False)
+
+        history = self._fit(train, validation, epochs, checkpoint_path, backup_dir, verbose)
+        self.watermark = price_data.index.max()
+        return history
+
+    def _fit(self, train, validation, epochs, checkpoint_path, backup_dir, verbose):
         # Setup callbacks
-        callbacks = [
-            EarlyStopping(patience=5, restore_best_weights=True),
-            ModelCheckpoint(
-                'models/best_model.h5',
-                save_best_only=True
-            )
-        ]
-        
+        callbacks = [EarlyStopping(patience=5, restore_best_weights=True)]
+        if checkpoint_path:
+            callbacks.append(ModelCheckpoint(checkpoint_path, save_best_only=True))
+        if backup_dir:
+            # An interrupted fit resumes from its last finished epoch instead of epoch one
+            callbacks.append(BackupAndRestore(backup_dir))
+
         # Train model
-        history = self.model.fit(
-            X, y,
-            epochs=100,
-            batch_size=32,
-            validation_split=validation_split,
+        return self.model.fit(
+            train,
+            epochs=epochs,
+            validation_data=validation,
+            shuffle=False,  # The training dataset reshuffles itself every epoch
             callbacks=callbacks,
-            verbose=1
+            verbose=verbose
         )
-        
-        return history
-    
+
+    def save(self, directory):
+        """Write the model, scaler and metadata needed to predict without retraining"""
+        os.makedirs(directory, exist_ok=True)
+        self.model.save(os.path.join(directory, 'model.keras'))
+        with open(os.path.join(directory, 'scaler.pkl'), 'wb') as f:
+            pickle.dump(self.scaler, f)
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({
+                'sequence_length': self.sequence_length,
+                'watermark': None if self.watermark is None else pd.Timestamp(self.watermark).isoformat(),
+                'val_loss': self.val_loss
+            }, f)
+
+    @classmethod
+    def load(cls, directory):
+        """Predictor restored from a directory written by save"""
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        predictor = cls(sequence_length=meta['sequence_length'])
+        predictor.model = tf.keras.models.load_model(os.path.join(directory, 'model.keras'))
+        with open(os.path.join(directory, 'scaler.pkl'), 'rb') as f:
+            predictor.scaler = pickle.load(f)
+        if meta.get('watermark'):
+            predictor.watermark = pd.Timestamp(meta['watermark'])
+        predictor.val_loss = meta.get('val_loss')
+        return predictor
+
     def predict(self, data):
         """Make price predictions"""
         if self.model is None:
             raise Exception("Model not trained yet")
             
-        # Prepare prediction data
-        scaled_data = self.scaler.transform(data)
-        X = np.array([scaled_data[-self.sequence_length:]])
+        # Only the last window is needed
+        scaled_data = self.scaler.transform(np.asarray(data)[-self.sequence_length:])
+        X = np.array([scaled_data])
         
-        # Make prediction
-        scaled_prediction = self.model.predict(X)
+        # Make prediction; predict_on_batch skips predict's per-call dataset and callback setup
+        scaled_prediction = self.model.predict_on_batch(X)
         prediction = self.scaler.inverse_transform(
             np.concatenate([scaled_prediction, np.zeros((1, data.shape[1]-1))], axis=1)
         )
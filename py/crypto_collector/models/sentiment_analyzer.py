@@ -1,67 +1,139 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import numpy as np
 from typing import List, Dict
 import pandas as pd
+from models.model_registry import get_sentiment_model
+from analyzers.response_cache import ResponseCache
+from config.settings import (
+    SENTIMENT_MODEL, SENTIMENT_BACKEND, SENTIMENT_BATCH_SIZE, SENTIMENT_MAX_LENGTH, SENTIMENT_NUM_THREADS,
+    SENTIMENT_CACHE_SIZE
+)
+
+LABELS = ['negative', 'neutral', 'positive']
 
 class SentimentAnalyzer:
-    def __init__(self):
-        self.tokenizer = AutoTokenizer.from_pretrained('finiteautomata/bertweet-base-sentiment-analysis')
-        self.model = AutoModelForSequenceClassification.from_pretrained('finiteautomata/bertweet-base-sentiment-analysis')
-        
-    def analyze_texts(self, texts: List[str]) -> List[Dict]:
-        """Analyze sentiment of multiple texts"""
-        results = []
-        
-        for text in texts:
-            # Tokenize text
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
+    def __init__(self, batch_size=SENTIMENT_BATCH_SIZE, max_length=SENTIMENT_MAX_LENGTH,
+                 num_threads=SENTIMENT_NUM_THREADS, backend=SENTIMENT_BACKEND, cache_size=SENTIMENT_CACHE_SIZE):
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.backend = backend
+        self._model = None
+
+        # In-memory LRU of scores keyed by normalized text
+        self.cache = ResponseCache(max_entries=cache_size, ttl=None, path=None) if cache_size else None
+
+        if num_threads:
+            # Process-wide setting; more threads than physical cores only adds contention
+            torch.set_num_threads(num_threads)
+
+    @property
+    def model(self):
+        """Shared model from the registry, loaded on first use rather than at construction"""
+        if self._model is None:
+            self._model = get_sentiment_model(SENTIMENT_MODEL, self.backend)
+        return self._model
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    def score_texts(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+        """Class probabilities for each text, as an (n, 3) array in LABELS order"""
+        scores = np.empty((len(texts), len(LABELS)), dtype=np.float32)
+        if not len(texts):
+            return scores
+
+        if self.cache is None:
+            scores[:] = self._infer(list(texts), batch_size)
+            return scores
+
+        # Serve repeated texts from the cache and run the model on the rest, each distinct text once
+        keys = [ResponseCache.make_key(f"{SENTIMENT_MODEL}:{self.backend}", text) for text in texts]
+        missing = {}
+        for index, key in enumerate(keys):
+            cached = self.cache.get(key) if key not in missing else None
+            if cached is not None:
+                scores[index] = cached
+            else:
+                missing.setdefault(key, []).append(index)
+
+        if missing:
+            first = [indexes[0] for indexes in missing.values()]
+            computed = self._infer([texts[index] for index in first], batch_size)
+            for (key, indexes), row in zip(missing.items(), computed):
+                scores[indexes] = row
+                self.cache.set(key, row)
+
+        return scores
+
+    def _infer(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+        batch_size = batch_size or self.batch_size
+        scores = np.empty((len(texts), len(LABELS)), dtype=np.float32)
+
+        # Tokenize everything once, unpadded, to learn each text's length
+        encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        input_ids = encoded['input_ids']
+        attention_mask = encoded['attention_mask']
+
+        # Similar lengths share a batch, so padding per batch wastes little compute
+        order = np.argsort([len(ids) for ids in input_ids], kind='stable')
+
+        for start in range(0, len(order), batch_size):
+            index = order[start:start + batch_size]
+            batch = self.tokenizer.pad(
+                {
+                    'input_ids': [input_ids[i] for i in index],
+                    'attention_mask': [attention_mask[i] for i in index]
+                },
                 padding=True,
-                truncation=True,
-                max_length=512
+                return_tensors="pt"
             )
-            
-            # Get prediction
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-                
-            # Get sentiment scores
-            sentiment_scores = predictions[0].numpy()
-            sentiment_dict = {
+            logits = torch.from_numpy(self.model.logits(batch))
+            scores[index] = torch.nn.functional.softmax(logits, dim=-1).numpy()
+
+        return scores
+
+    def analyze_texts(self, texts: List[str], batch_size: int = None) -> List[Dict]:
+        """Analyze sentiment of multiple texts"""
+        texts = list(texts)
+        scores = self.score_texts(texts, batch_size)
+        sentiments = np.array(LABELS)[scores.argmax(axis=1)] if len(texts) else []
+
+        return [
+            {
                 'text': text,
-                'negative': float(sentiment_scores[0]),
-                'neutral': float(sentiment_scores[1]),
-                'positive': float(sentiment_scores[2]),
-                'sentiment': ['negative', 'neutral', 'positive'][np.argmax(sentiment_scores)]
+                'negative': float(score[0]),
+                'neutral': float(score[1]),
+                'positive': float(score[2]),
+                'sentiment': str(sentiment)
             }
-            
-            results.append(sentiment_dict)
-            
-        return results
-    
+            for text, score, sentiment in zip(texts, scores, sentiments)
+        ]
+
+    @staticmethod
+    def market_texts(market_data: pd.DataFrame) -> List[str]:
+        """Describe each row as text, built column-wise instead of row by row"""
+        return (
+            "Price: " + market_data['price'].astype(str)
+            + ", Volume: " + market_data['volume_24h'].astype(str)
+            + ", Market Cap: " + market_data['market_cap'].astype(str)
+            + ", Price Change: " + market_data['price_change_24h'].astype(str) + "%"
+        ).tolist()
+
     def analyze_market_data(self, market_data: pd.DataFrame) -> Dict:
         """Analyze market sentiment based on various data points"""
         # Combine relevant market data into text descriptions
-        texts = []
-        
-        for _, row in market_data.iterrows():
-            text = f"Price: {row['price']}, Volume: {row['volume_24h']}, "
-            text += f"Market Cap: {row['market_cap']}, "
-            text += f"Price Change: {row['price_change_24h']}%"
-            texts.append(text)
-            
+        texts = self.market_texts(market_data)
+
         # Analyze sentiment
-        sentiments = self.analyze_texts(texts)
-        
+        scores = self.score_texts(texts)
+
         # Aggregate results
         overall_sentiment = {
-            'negative': np.mean([s['negative'] for s in sentiments]),
-            'neutral': np.mean([s['neutral'] for s in sentiments]),
-            'positive': np.mean([s['positive'] for s in sentiments]),
-            'samples': len(sentiments)
+            'negative': float(scores[:, 0].mean()) if len(texts) else np.nan,
+            'neutral': float(scores[:, 1].mean()) if len(texts) else np.nan,
+            'positive': float(scores[:, 2].mean()) if len(texts) else np.nan,
+            'samples': len(texts)
         }
-        
-        return overall_sentiment 
\ No newline at end of file
+
+        return overall_sentiment
@@ -0,0 +1,268 @@
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from contextlib import contextmanager
+from collectors.price_collector import PriceCollector
+from collectors.market_collector import MarketCollector
+from collectors.info_collector import InfoCollector
+from collectors.market_snapshot import MarketSnapshotFetcher
+from collectors.stream_collector import StreamCollector
+from database.db_handler import DatabaseHandler
+from analyzers.ai_analyzer import AIAnalyzer
+from analyzers.incremental_indicators import IncrementalIndicators
+from alerts.alert_system import AlertSystem
+from exporters.data_exporter import DataExporter
+from pipeline.scheduler import StageScheduler
+from pipeline.training import saved_symbols
+from utils.api_client import get_shared_client
+from config.settings import (
+    HEALTH_CHECK_INTERVAL, STREAM_ENABLED, COLLECTION_INTERVAL, INDICATOR_SEED_SAMPLES,
+    PRICE_MODEL_DIR, TRAINING_RESOLUTION_MINUTES
+)
+
+class PipelineRuntime:
+    """Long-lived pipeline context shared by every scheduled tick"""
+
+    def __init__(self):
+        start = time.perf_counter()
+
+        self.api_client = get_shared_client()
+        self.market_fetcher = MarketSnapshotFetcher(self.api_client)
+        self.price_collector = PriceCollector(self.api_client, self.market_fetcher)
+        self.market_collector = MarketCollector(self.api_client, self.market_fetcher)
+        self.info_collector = InfoCollector(self.api_client)
+        self.db = DatabaseHandler()
+        self.ai_analyzer = AIAnalyzer()
+        self.alert_system = AlertSystem()
+        self.exporter = DataExporter()
+        self.scheduler = StageScheduler()
+        self.indicators = IncrementalIndicators()
+        self.stream_collector = StreamCollector(self.alert_system) if STREAM_ENABLED else None
+        self.prediction_service = self.load_prediction_service()
+        self._forecast_bar = None
+
+        self.stats = {
+            'startup_seconds': time.perf_counter() - start,
+            'ticks': 0,
+            'last_tick_overhead_seconds': 0.0,
+            'last_tick_seconds': 0.0,
+            'total_tick_overhead_seconds': 0.0
+        }
+        self._last_health_check = 0.0
+        self._closed = False
+
+    def components(self):
+        """Return the long-lived components keyed by name"""
+        components = {
+            'api_client': self.api_client,
+            'market_fetcher': self.market_fetcher,
+            'price_collector': self.price_collector,
+            'market_collector': self.market_collector,
+            'info_collector': self.info_collector,
+            'db': self.db,
+            'ai_analyzer': self.ai_analyzer,
+            'alert_system': self.alert_system,
+            'exporter': self.exporter,
+            'scheduler': self.scheduler
+        }
+        if self.stream_collector is not None:
+            components['stream_collector'] = self.stream_collector
+        if self.prediction_service is not None:
+            components['prediction_service'] = self.prediction_service
+        return components
+
+    def warm_up(self):
+        """Open connections and prime pools before the first tick"""
+        start = time.perf_counter()
+
+        for component in self.components().values():
+            warm_up = getattr(component, 'warm_up', None)
+            if warm_up is not None:
+                warm_up()
+
+        self.restore_indicators()
+        self.load_alert_categories()
+        self.seed_stream_baselines()
+        self.stats['warm_up_seconds'] = time.perf_counter() - start
+        self._last_health_check = time.monotonic()
+
+    def streaming(self):
+        """Whether the ticker stream is currently delivering price alerts"""
+        return self.stream_collector is not None and self.stream_collector.health_check()
+
+    def load_alert_categories(self):
+        """Let category alert rules find their symbols"""
+        try:
+            self.alert_system.set_categories(self.db.get_symbol_categories())
+        except Exception as e:
+            print(f"Failed to load coin categories for alerts: {e}")
+
+    def seed_stream_baselines(self):
+        """Start stream alerts from the last stored prices and the polled indicator state rather than the first tick"""
+        if self.stream_collector is None:
+            return
+        # A copy: the stream closes its own bars on the event loop thread
+        self.stream_collector.set_indicators(IncrementalIndicators.from_document(self.indicators.to_document()))
+        try:
+            latest = self.db.get_latest_prices()
+        except Exception as e:
+            print(f"Failed to load reference prices for the ticker stream: {e}")
+            return
+        self.stream_collector.set_reference_prices({
+            symbol: values['price'] for symbol, values in latest.items() if values.get('price') is not None
+        })
+
+    def restore_indicators(self):
+        """Resume incremental indicators from the last checkpoint, or seed them from stored prices"""
+        try:
+            restored = IncrementalIndicators.from_document(self.db.load_indicator_state())
+        except Exception as e:
+            print(f"Failed to restore indicator state: {e}")
+            restored = None
+        if restored is None:
+            restored = self.seed_indicators()
+        if restored is not None:
+            self.indicators = restored
+            
+    def seed_indicators(self, samples=INDICATOR_SEED_SAMPLES):
+        """Replay the last stored ticks of each symbol so RSI and MACD are warm from the first tick"""
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(minutes=samples * COLLECTION_INTERVAL)
+        try:
+            symbols = list(self.db.get_latest_prices())
+            series = [
+                self.db.get_historical_columns(
+                    symbol, start_date, end_date, fields=('timestamp', 'price'),
+                    # Tick-sized buckets, i.e. the raw samples the state is updated with
+                    resolution=timedelta(minutes=COLLECTION_INTERVAL)
+                )['price'][-samples:]
+                for symbol in symbols
+            ]
+        except Exception as e:
+            print(f"Failed to seed indicator state from history: {e}")
+            return None
+        if not symbols:
+            return None
+
+        # Right-aligned so every symbol's latest sample is in the last column
+        panel = np.full((len(symbols), max(len(prices) for prices in series)), np.nan)
+        for row, prices in enumerate(series):
+            if len(prices):
+                panel[row, -len(prices):] = prices
+        return IncrementalIndicators.from_history(symbols, panel)
+            
+    def load_prediction_service(self, directory=PRICE_MODEL_DIR):
+        """Keep the trained price models resident, or None when there are none to serve"""
+        symbols = saved_symbols(directory)
+        if not symbols:
+            return None
+        try:
+            # TensorFlow is only imported when there are models to serve
+            from models.prediction_service import PredictionService
+            return PredictionService(symbols, directory=directory)
+        except ImportError:
+            print("TensorFlow is not installed; skipping price forecasts")
+            return None
+        except Exception as e:
+            print(f"Failed to load price models: {e}")
+            return None
+
+    def forecast_prices(self, symbols, now=None):
+        """Next-bar forecasts of the symbols with a price model, once per training bar"""
+        if self.prediction_service is None:
+            return []
+        now = now or datetime.utcnow()
+        # The models see hourly rollups, whose windows only change once per bar
+        bar = timedelta(minutes=TRAINING_RESOLUTION_MINUTES)
+        bar_start = datetime.min + (now - datetime.min) // bar * bar
+        if bar_start == self._forecast_bar:
+            return []
+
+        service = self.prediction_service
+        windows = {}
+        for symbol in dict.fromkeys(symbols):
+            if not service.has_model(symbol):
+                continue
+            prices = self.db.get_historical_columns(
+                symbol, now - 2 * service.sequence_length * bar, now, fields=('timestamp', 'price'), resolution=bar
+            )['price']
+            if len(prices) >= service.sequence_length:
+                windows[symbol] = prices.reshape(-1, 1)
+        predictions = service.predict_batch(windows) if windows else {}
+        self._forecast_bar = bar_start
+
+        return [
+            {'symbol': symbol, 'predicted_price': price, 'horizon_minutes': TRAINING_RESOLUTION_MINUTES, 'timestamp': now}
+            for symbol, price in predictions.items()
+        ]
+
+    def checkpoint_indicators(self):
+        """Persist incremental indicator state so a restart can resume from it"""
+        self.db.save_indicator_state(self.indicators.to_document())
+
+    def health_check(self):
+        """Check every component that exposes a health probe"""
+        status = {}
+
+        for name, component in self.components().items():
+            probe = getattr(component, 'health_check', None)
+            if probe is None:
+                continue
+            try:
+                status[name] = bool(probe())
+            except Exception as e:
+                print(f"Health check failed for {name}: {e}")
+                status[name] = False
+
+        self._last_health_check = time.monotonic()
+        return status
+
+    @contextmanager
+    def tick(self):
+        """Run one pipeline tick against the shared components"""
+        if self._closed:
+            raise Exception("Pipeline runtime has been shut down")
+
+        start = time.perf_counter()
+
+        # Only probe components periodically, not on every tick
+        if time.monotonic() - self._last_health_check >= HEALTH_CHECK_INTERVAL:
+            unhealthy = [name for name, ok in self.health_check().items() if not ok]
+            if unhealthy:
+                print(f"Unhealthy components: {', '.join(unhealthy)}")
+
+        overhead = time.perf_counter() - start
+        self.stats['last_tick_overhead_seconds'] = overhead
+        self.stats['total_tick_overhead_seconds'] += overhead
+
+        try:
+            yield self
+        finally:
+            self.stats['ticks'] += 1
+            self.stats['last_tick_seconds'] = time.perf_counter() - start
+
+    def shutdown(self):
+        """Flush and close every component in reverse build order"""
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            self.checkpoint_indicators()
+        except Exception as e:
+            print(f"Failed to checkpoint indicator state: {e}")
+
+        for name, component in reversed(list(self.components().items())):
+            close = getattr(component, 'close', None)
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                print(f"Failed to close {name}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
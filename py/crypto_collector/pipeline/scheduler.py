@@ -0,0 +1,140 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+from config.settings import PIPELINE_MAX_WORKERS
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+
+class StageScheduler:
+    """Run pipeline stages concurrently as soon as their dependencies finish"""
+
+    def __init__(self, max_workers=PIPELINE_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
+        self.stages: Dict[str, Stage] = {}
+
+    def add_stage(self, name, func, depends_on=()):
+        """Register a stage; func receives the results of its dependencies as keyword arguments"""
+        if name in self.stages:
+            raise Exception(f"Stage already registered: {name}")
+        self.stages[name] = Stage(name, func, tuple(depends_on))
+
+    def clear(self):
+        """Forget registered stages so the scheduler can be reused for the next tick"""
+        self.stages = {}
+
+    def _validate(self):
+        """Check that every dependency exists and the graph has no cycles"""
+        for stage in self.stages.values():
+            for dep in stage.depends_on:
+                if dep not in self.stages:
+                    raise Exception(f"Stage {stage.name} depends on unknown stage {dep}")
+
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise Exception(f"Dependency cycle detected at stage {name}")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _run_stage(self, stage, kwargs):
+        start = time.perf_counter()
+        try:
+            return stage.func(**kwargs), None, start, time.perf_counter()
+        except Exception as e:
+            return None, e, start, time.perf_counter()
+
+    def run(self):
+        """Execute all stages and return their results and timing report"""
+        self._validate()
+
+        results, errors, timings = {}, {}, {}
+        skipped: List[str] = []
+        pending = dict(self.stages)
+        running = {}
+        tick_start = time.perf_counter()
+
+        while pending or running:
+            # Submit every stage whose dependencies have all completed
+            for name, stage in list(pending.items()):
+                if any(dep in errors or dep in skipped for dep in stage.depends_on):
+                    skipped.append(name)
+                    del pending[name]
+                    continue
+                if all(dep in results for dep in stage.depends_on):
+                    kwargs = {dep: results[dep] for dep in stage.depends_on}
+                    running[self.executor.submit(self._run_stage, stage, kwargs)] = name
+                    del pending[name]
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                value, error, start, end = future.result()
+                timings[name] = {
+                    'start': start - tick_start,
+                    'end': end - tick_start,
+                    'seconds': end - start
+                }
+                if error is None:
+                    results[name] = value
+                else:
+                    errors[name] = error
+
+        report = {
+            'wall_seconds': time.perf_counter() - tick_start,
+            'stages': timings,
+            'critical_path': self._critical_path(timings),
+            'skipped': skipped,
+            'errors': {name: str(e) for name, e in errors.items()}
+        }
+        return results, report
+
+    def _critical_path(self, timings):
+        """Walk back from the last stage to finish through its latest-finishing dependency"""
+        if not timings:
+            return []
+
+        path = [max(timings, key=lambda name: timings[name]['end'])]
+        while True:
+            deps = [dep for dep in self.stages[path[-1]].depends_on if dep in timings]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda name: timings[name]['end']))
+
+        return list(reversed(path))
+
+    def close(self):
+        """Stop the worker threads"""
+        self.executor.shutdown(wait=True)
+
+def format_report(report):
+    """Render a stage timing report as readable lines"""
+    lines = [f"Tick finished in {report['wall_seconds']:.2f}s"]
+    for name, timing in sorted(report['stages'].items(), key=lambda item: item[1]['start']):
+        lines.append(
+            f"  {name:<24} {timing['start']:7.2f}s -> {timing['end']:7.2f}s ({timing['seconds']:.2f}s)"
+        )
+    if report['critical_path']:
+        lines.append(f"  critical path: {' -> '.join(report['critical_path'])}")
+    for name, error in report['errors'].items():
+        lines.append(f"  failed: {name}: {error}")
+    if report['skipped']:
+        lines.append(f"  skipped: {', '.join(report['skipped'])}")
+    return "\n".join(lines)
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from config.settings import (
+    PRICE_MODEL_DIR, TRAINING_HISTORY_DAYS, TRAINING_EPOCHS, TRAINING_THREADS_PER_JOB, TRAINING_WORKERS,
+    TRAINING_RESOLUTION_MINUTES, TRAINING_FINE_TUNE_EPOCHS, TRAINING_FINE_TUNE_DAYS, TRAINING_DRIFT_THRESHOLD
+)
+
+# TensorFlow is imported inside the jobs: the parent never needs it, and each worker
+# must cap its thread pools before TensorFlow starts them
+
+def symbol_dir(symbol, directory=PRICE_MODEL_DIR):
+    """Artifact directory of one symbol, so parallel jobs never share a file"""
+    return os.path.join(directory, symbol.lower())
+
+def saved_symbols(directory=PRICE_MODEL_DIR):
+    """Symbols with a saved model in directory"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, name, 'meta.json'))
+    )
+
+def read_history(db_handler, symbol, since=None, days=TRAINING_HISTORY_DAYS):
+    """Historical prices for one symbol since a timestamp (or the last days), indexed by timestamp"""
+    return db_handler.get_historical_columns(
+        symbol=symbol,
+        start_date=since if since is not None else pd.Timestamp.now() - pd.Timedelta(days=days),
+        end_date=pd.Timestamp.now(),
+        fields=('timestamp', 'price'),
+        # A fixed bucket size, or a short incremental range would be read from raw samples
+        resolution=pd.Timedelta(minutes=TRAINING_RESOLUTION_MINUTES).to_pytimedelta(),
+        as_frame=True
+    ).set_index('timestamp')
+
+def load_history(symbol, since=None):
+    """read_history over a connection of the worker's own"""
+    from database.db_handler import DatabaseHandler
+
+    db_handler = DatabaseHandler(write_behind=False)
+    try:
+        return read_history(db_handler, symbol, since)
+    finally:
+        db_handler.close()
+
+def _limit_threads(threads):
+    """Give each worker process its own share of the cores"""
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def train_symbol(symbol, loader=load_history, directory=PRICE_MODEL_DIR, epochs=TRAINING_EPOCHS, warm_start=True):
+    """Train and save one symbol's model; runs inside a worker process
+
+    With warm_start the previous model is fine-tuned on the data since its
+    watermark, plus TRAINING_FINE_TUNE_DAYS of replayed context. It is refit
+    from scratch only when there is no previous model or its validation loss
+    drifts past TRAINING_DRIFT_THRESHOLD times that of the last full fit.
+    """
+    import tensorflow as tf
+    from models.price_predictor import PricePredictor
+
+    start = time.perf_counter()
+    path = symbol_dir(symbol, directory)
+    os.makedirs(path, exist_ok=True)
+    callbacks = {'checkpoint_path': os.path.join(path, 'checkpoint.keras'), 'verbose': 0}
+
+    try:
+        result = None
+        if warm_start and os.path.exists(os.path.join(path, 'meta.json')):
+            result = _fine_tune(symbol, PricePredictor.load(path), loader, path, callbacks)
+
+        if result is None:
+            price_data = loader(symbol)
+            predictor = PricePredictor()
+            if len(price_data) <= 2 * predictor.sequence_length:
+                raise Exception(f"Not enough history for {symbol}: {len(price_data)} rows")
+            history = predictor.train(price_data, epochs=epochs, backup_dir=os.path.join(path, 'backup'), **callbacks)
+            predictor.save(path)
+            result = {
+                'mode': 'full',
+                'rows': len(price_data),
+                'epochs': len(history.history['loss']),
+                'loss': float(history.history['loss'][-1]),
+                'val_loss': predictor.val_loss
+            }
+    finally:
+        tf.keras.backend.clear_session()
+
+    return {**result, 'seconds': time.perf_counter() - start}
+
+def _fine_tune(symbol, predictor, loader, path, callbacks):
+    """Warm-start result, or None when a full refit is needed"""
+    from models.price_predictor import best_val_loss
+
+    if predictor.watermark is None or predictor.val_loss is None:
+        return None
+
+    price_data = loader(symbol, since=predictor.watermark - pd.Timedelta(days=TRAINING_FINE_TUNE_DAYS))
+    new_rows = int((price_data.index > predictor.watermark).sum())
+    if new_rows == 0:
+        return {'mode': 'current', 'rows': 0, 'epochs': 0, 'loss': None, 'val_loss': None}
+    if len(price_data) <= 2 * predictor.sequence_length:
+        return None
+
+    history = predictor.fine_tune(
+        price_data,
+        epochs=TRAINING_FINE_TUNE_EPOCHS,
+        backup_dir=os.path.join(path, 'backup_fine_tune'),
+        **callbacks
+    )
+    val_loss = best_val_loss(history)
+    if val_loss is not None and val_loss > TRAINING_DRIFT_THRESHOLD * predictor.val_loss:
+        print(f"Validation loss for {symbol} drifted to {val_loss:.6f} from {predictor.val_loss:.6f}; refitting")
+        return None
+
+    # val_loss keeps the full fit's value, so drift is always measured against the same reference
+    predictor.save(path)
+    return {
+        'mode': 'fine_tune',
+        'rows': new_rows,
+        'epochs': len(history.history['loss']),
+        'loss': float(history.history['loss'][-1]),
+        'val_loss': val_loss
+    }
+
+class TrainingState:
+    """Per-symbol job results kept in a JSON file, so a rerun skips finished symbols"""
+
+    def __init__(self, path):
+        self.path = path
+        self.jobs = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.jobs = json.load(f)
+
+    def done(self, symbol):
+        return self.jobs.get(symbol, {}).get('status') == 'done'
+
+    def finished(self, symbols):
+        """Whether every symbol has a result, i.e. the last run was not interrupted"""
+        return all(symbol in self.jobs for symbol in symbols)
+
+    def reset(self):
+        self.jobs = {}
+
+    def record(self, symbol, **result):
+        """Store a job result and rewrite the file atomically"""
+        self.jobs[symbol] = {**result, 'finished_at': datetime.utcnow().isoformat()}
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(self.jobs, f, indent=2)
+        os.replace(temporary, self.path)
+
+def train_symbols(symbols, workers=TRAINING_WORKERS, threads=TRAINING_THREADS_PER_JOB, directory=PRICE_MODEL_DIR,
+                  loader=load_history, epochs=TRAINING_EPOCHS, warm_start=True, force=False):
+    """Train every symbol across a process pool
+
+    An interrupted run is resumed: symbols it already trained are skipped.
+    Once a run has a result for every symbol, the next call starts a new one.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    state = TrainingState(os.path.join(directory, 'training_state.json'))
+    if force or state.finished(symbols):
+        state.reset()
+    pending = [symbol for symbol in symbols if not state.done(symbol)]
+    if not pending:
+        return state.jobs
+
+    workers = min(workers or max(1, (os.cpu_count() or 1) // threads), len(pending))
+    print(f"Training {len(pending)} symbols on {workers} workers, {threads} threads each")
+
+    # Spawned workers start without the parent's TensorFlow or MongoDB state
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_limit_threads,
+        initargs=(threads,)
+    ) as pool:
+        futures = {
+            pool.submit(train_symbol, symbol, loader, directory, epochs, warm_start): symbol
+            for symbol in pending
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Training failed for {symbol}: {e}")
+                state.record(symbol, status='failed', error=str(e))
+                continue
+            state.record(symbol, status='done', **result)
+            print(f"Trained {symbol} ({result['mode']}) in {result['seconds']:.1f}s, {result['epochs']} epochs")
+
+    return state.jobs
@@ -0,0 +1,73 @@
+import time
+import argparse
+import numpy as np
+from alerts.rule_engine import AlertRule, RuleEngine
+
+CATEGORIES = ['MEME', 'DeFi', 'L1', 'GameFi', 'Privacy', 'Infrastructure']
+
+def build_engine(symbols, rules_per_symbol, rng):
+    engine = RuleEngine([
+        AlertRule('price_change', threshold=5.0),
+        AlertRule('volume_spike', field='volume_24h', threshold=20.0, direction='up'),
+        AlertRule('macd_cross', kind='cross', field='macd', reference='macd_signal')
+    ])
+    for category in CATEGORIES:
+        engine.add_rule(AlertRule('price_change', threshold=float(rng.uniform(3, 15)), category=category))
+    engine.set_categories({symbol: [CATEGORIES[i % len(CATEGORIES)]] for i, symbol in enumerate(symbols)})
+
+    for symbol in symbols:
+        engine.add_rule(AlertRule('price_change', threshold=float(rng.uniform(1, 10)), symbol=symbol))
+        for level in range(rules_per_symbol - 1):
+            engine.add_rule(AlertRule(
+                f"price_level_{level}", kind='cross', reference=float(rng.uniform(50, 150)), symbol=symbol
+            ))
+    return engine
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-tick alert rule evaluation")
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--rules-per-symbol', type=int, default=10)
+    parser.add_argument('--ticks', type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = [f"coin{i}" for i in range(args.symbols)]
+    engine = build_engine(symbols, args.rules_per_symbol, rng)
+    total_rules = (
+        len(engine.global_rules)
+        + sum(len(rules) for rules in engine.category_rules.values())
+        + sum(len(rules) for rules in engine.symbol_rules.values())
+    )
+
+    # Random-walk ticks, round-robin over the symbols at 100 ticks/s
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, args.ticks)))
+    ticks = [
+        {
+            'symbol': symbols[i % args.symbols],
+            'price': float(prices[i]),
+            'volume_24h': float(rng.uniform(1e6, 2e6)),
+            'macd': float(rng.normal()),
+            'macd_signal': float(rng.normal())
+        }
+        for i in range(args.ticks)
+    ]
+
+    # First pass compiles each symbol's rule list and seeds baselines
+    for tick in ticks[:args.symbols]:
+        engine.evaluate(tick['symbol'], tick, now=0.0)
+
+    latencies = np.empty(args.ticks)
+    clock = time.perf_counter
+    for i, tick in enumerate(ticks):
+        start = clock()
+        engine.evaluate(tick['symbol'], tick, now=i * 0.01)
+        latencies[i] = clock() - start
+
+    print(f"{total_rules} rules over {args.symbols} symbols, {args.ticks} ticks")
+    print(f"  per tick: p50 {np.percentile(latencies, 50) * 1e6:.1f}us  "
+          f"p99 {np.percentile(latencies, 99) * 1e6:.1f}us  max {latencies.max() * 1e6:.1f}us")
+    print(f"  throughput: {args.ticks / latencies.sum():,.0f} ticks/s")
+    print(f"  alerts: {engine.stats['alerts']}  suppressed by cooldown: {engine.stats['suppressed']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from exporters.data_exporter import DataExporter
+from models.crypto_data import PriceBatch
+from config.settings import EXPORT_FORMATS, EXPORT_SCHEDULES
+
+def make_tick(coins, timestamp, rng):
+    """Datasets shaped like the five a pipeline tick exports"""
+    symbols = [f"coin{i}" for i in range(coins)]
+    prices = PriceBatch(symbol=symbols, price=rng.uniform(1, 1000, coins), timestamp=[timestamp] * coins)
+    analysis = prices.to_frame().assign(**{
+        name: rng.normal(size=coins)
+        for name in ('macd', 'macd_signal', 'rsi', 'bb_mavg', 'bb_high', 'bb_low', 'ma_7', 'ma_14', 'ma_30')
+    })
+    ai_analysis = [
+        {'coin': symbol, 'analysis': 'Neutral outlook with moderate volume. ' * 5, 'timestamp': timestamp}
+        for symbol in symbols
+    ]
+    market_report = {'report': 'Market summary. ' * 50, 'timestamp': timestamp}
+    predictions = {'prediction': 'Sideways. ' * 20, 'timestamp': timestamp}
+    return {
+        'prices': prices, 'analysis': analysis, 'ai_analysis': ai_analysis,
+        'market_report': market_report, 'predictions': predictions
+    }
+
+def run(schedules, ticks, coins):
+    """Mean per-tick export time, and the time to write the periodic files at the end"""
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    with tempfile.TemporaryDirectory() as path:
+        exporter = DataExporter(schedules=schedules, path=path, parquet_path=f"{path}/parquet")
+        elapsed = []
+        for tick in range(ticks):
+            datasets = make_tick(coins, start + timedelta(minutes=5 * tick), rng)
+            tick_start = time.perf_counter()
+            for data_type, data in datasets.items():
+                exporter.export_data(data, data_type)
+            elapsed.append(time.perf_counter() - tick_start)
+
+        period_start = time.perf_counter()
+        exporter.flush_periods()
+        period_time = time.perf_counter() - period_start
+        exporter.close()
+    return float(np.mean(elapsed)), period_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-tick Excel export with an hourly workbook")
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--ticks', type=int, default=12, help="ticks per hour at a 5 minute interval")
+    args = parser.parse_args()
+
+    per_tick = dict(EXPORT_SCHEDULES, excel='tick')
+    hourly = dict(EXPORT_SCHEDULES, excel='hourly')
+
+    tick_mean, _ = run(per_tick, args.ticks, args.coins)
+    hourly_mean, workbook_time = run(hourly, args.ticks, args.coins)
+
+    print(f"{args.coins} coins, {args.ticks} ticks, formats {', '.join(EXPORT_FORMATS)}")
+    print(f"  excel per tick: {tick_mean:6.3f}s per tick")
+    print(f"  excel hourly:   {hourly_mean:6.3f}s per tick + {workbook_time:.3f}s per hourly workbook "
+          f"({hourly_mean + workbook_time / args.ticks:.3f}s amortized)")
+    print(f"  per-tick speedup: {tick_mean / hourly_mean:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import time
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from database.db_handler import DatabaseHandler
+from config.settings import DB_NAME
+
+def seed(db, symbol, rows, interval):
+    """Insert `rows` samples `interval` seconds apart ending now"""
+    db.prices.delete_many({'symbol': symbol})
+    end = datetime.utcnow().replace(microsecond=0)
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.001, rows)))
+    batch = []
+    for i, price in enumerate(prices):
+        batch.append({
+            'symbol': symbol,
+            'price': float(price),
+            'timestamp': end - timedelta(seconds=interval * (rows - i)),
+            'source': 'benchmark'
+        })
+        if len(batch) == 10000:
+            db.prices.insert_many(batch)
+            batch = []
+    if batch:
+        db.prices.insert_many(batch)
+    return end - timedelta(seconds=interval * rows), end
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare document and columnar historical reads")
+    parser.add_argument('--rows', type=int, default=100000)
+    # Keep the seeded range inside raw retention so both paths read the raw collection
+    parser.add_argument('--interval', type=int, default=10, help="seconds between seeded samples")
+    parser.add_argument('--mock', action='store_true', help="use mongomock instead of a live server")
+    args = parser.parse_args()
+
+    handler = DatabaseHandler(write_behind=False)
+    if args.mock:
+        import mongomock
+        handler.client = mongomock.MongoClient()
+    handler.db = handler.client[f"{DB_NAME}_benchmark"]
+
+    symbol = 'bench'
+    start_date, end_date = seed(handler.db, symbol, args.rows, args.interval)
+
+    # Current path: full documents as a list of dicts, then a DataFrame
+    documents, doc_time, doc_peak = measure(
+        lambda: pd.DataFrame(handler.get_historical_data(symbol, start_date, end_date)['prices'])
+    )
+    columns, col_time, col_peak = measure(
+        lambda: handler.get_historical_columns(symbol, start_date, end_date, as_frame=True)
+    )
+
+    assert len(documents) == len(columns)
+    print(f"{args.rows} rows")
+    print(f"  documents: {doc_time:7.2f}s  peak {doc_peak / 2 ** 20:8.1f} MiB")
+    print(f"  columnar:  {col_time:7.2f}s  peak {col_peak / 2 ** 20:8.1f} MiB")
+    print(f"  peak memory reduction: {doc_peak / max(col_peak, 1):.1f}x")
+
+    handler.client.drop_database(f"{DB_NAME}_benchmark")
+    handler.close()
+
+if __name__ == "__main__":
+    main()
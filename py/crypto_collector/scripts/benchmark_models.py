@@ -0,0 +1,76 @@
+import gc
+import time
+import argparse
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from models.crypto_data import PriceData, PriceBatch, record_document
+
+@dataclass
+class DictPriceData:
+    """The previous, non-slotted PriceData"""
+    symbol: str
+    price: float
+    timestamp: datetime
+
+def make_columns(rows, coins):
+    start = datetime(2024, 1, 1)
+    symbols = [f"coin{i % coins}" for i in range(rows)]
+    prices = np.random.default_rng(0).uniform(1, 1000, rows).tolist()
+    timestamps = [start + timedelta(minutes=5 * (i // coins)) for i in range(rows)]
+    return symbols, prices, timestamps
+
+def timed(func):
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def retained(func):
+    """Bytes still allocated by the result of `func`, timed separately since tracemalloc slows allocation"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-object and columnar price representations")
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+
+    rows = args.coins * args.ticks
+    symbols, prices, timestamps = make_columns(rows, args.coins)
+
+    candidates = {
+        'dataclass': lambda: [DictPriceData(*values) for values in zip(symbols, prices, timestamps)],
+        'slotted': lambda: [PriceData(*values) for values in zip(symbols, prices, timestamps)],
+        'PriceBatch': lambda: PriceBatch(symbol=symbols, price=prices, timestamp=timestamps)
+    }
+    conversions = {
+        'dataclass': (lambda data: [vars(item).copy() for item in data], pd.DataFrame),
+        'slotted': (lambda data: [record_document(item) for item in data], pd.DataFrame),
+        'PriceBatch': (PriceBatch.to_documents, PriceBatch.to_frame)
+    }
+
+    print(f"{rows} rows ({args.coins} coins x {args.ticks} ticks)")
+    print(f"{'':12} {'build':>8} {'retained':>10} {'documents':>10} {'frame':>8}")
+    for name, build in candidates.items():
+        memory = retained(build)
+        data, build_time = timed(build)
+        to_documents, to_frame = conversions[name]
+        _, documents_time = timed(lambda: to_documents(data))
+        _, frame_time = timed(lambda: to_frame(data))
+        print(
+            f"{name:12} {build_time:7.3f}s {memory / 2 ** 20:8.1f}MiB "
+            f"{documents_time:9.3f}s {frame_time:7.3f}s"
+        )
+        del data
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import time
+import argparse
+import tempfile
+import threading
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+from models.price_predictor import PricePredictor
+from models.prediction_service import PredictionService
+from pipeline.training import symbol_dir
+
+def make_models(symbols, directory, rng, sequence_length=60):
+    """Untrained models with per-symbol scalers; inference cost doesn't depend on the weights' values"""
+    windows = {}
+    for symbol in symbols:
+        predictor = PricePredictor(sequence_length)
+        prices = np.cumsum(rng.normal(size=sequence_length * 4)) + rng.uniform(10, 1000)
+        predictor.scaler = MinMaxScaler().fit(prices.reshape(-1, 1))
+        predictor.model = predictor.create_model((sequence_length, 1))
+        predictor.save(symbol_dir(symbol, directory))
+        windows[symbol] = prices[-sequence_length:].reshape(-1, 1)
+    return windows
+
+def percentiles(samples):
+    return np.percentile(samples, 50) * 1000, np.percentile(samples, 99) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of batched multi-symbol price prediction on CPU")
+    parser.add_argument('--symbols', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeats', type=int, default=50)
+    parser.add_argument('--baseline', type=int, default=20, help="symbols timed with per-model calls")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for count in args.symbols:
+        symbols = [f"coin{i}" for i in range(count)]
+        with tempfile.TemporaryDirectory() as directory:
+            windows = make_models(symbols, directory, rng)
+            service = PredictionService(symbols, directory=directory)
+
+            # Per-symbol Keras calls, the cost of one prediction per coin per tick
+            predictors = [PricePredictor.load(symbol_dir(symbol, directory)) for symbol in symbols[:args.baseline]]
+            for predictor, symbol in zip(predictors, symbols):
+                predictor.predict(windows[symbol])
+            start = time.perf_counter()
+            for predictor, symbol in zip(predictors, symbols):
+                predictor.predict(windows[symbol])
+            per_model = (time.perf_counter() - start) / len(predictors)
+
+            # Parity with the Keras models on the symbols loaded above
+            batched = service.predict_batch({symbol: windows[symbol] for symbol in symbols[:args.baseline]})
+            error = max(abs(batched[symbol] - predictor.predict(windows[symbol])) / abs(batched[symbol])
+                        for predictor, symbol in zip(predictors, symbols))
+
+            service.predict_batch(windows)
+            samples = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                service.predict_batch(windows)
+                samples.append(time.perf_counter() - start)
+            batch_p50, batch_p99 = percentiles(samples)
+
+            # Every symbol submitted from concurrent callers, merged by the micro-batcher
+            latencies = []
+            def caller(chunk):
+                for symbol in chunk:
+                    start = time.perf_counter()
+                    service.predict(symbol, windows[symbol])
+                    latencies.append(time.perf_counter() - start)
+            for _ in range(max(1, args.repeats // 10)):
+                threads = [threading.Thread(target=caller, args=(symbols[i::8],)) for i in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            submit_p50, submit_p99 = percentiles(latencies)
+            service.close()
+
+        print(f"{count} symbols:")
+        print(f"  per-model predict: {per_model * 1000:7.2f}ms per symbol, {per_model * count * 1000:8.1f}ms per tick")
+        print(f"  predict_batch:     p50 {batch_p50:7.1f}ms  p99 {batch_p99:7.1f}ms per tick "
+              f"({per_model * count * 1000 / batch_p50:.0f}x), max relative error {error:.1e}")
+        print(f"  submit (8 callers): p50 {submit_p50:6.1f}ms  p99 {submit_p99:7.1f}ms per request, "
+              f"{service.stats['requests'] / max(service.stats['batches'], 1):.0f} requests per batch")
+
+if __name__ == "__main__":
+    main()
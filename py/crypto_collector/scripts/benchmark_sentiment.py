@@ -0,0 +1,44 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import torch
+from models.sentiment_analyzer import SentimentAnalyzer
+
+def make_market_data(rows, rng):
+    """Market rows with realistic spreads of magnitude, so text lengths vary"""
+    return pd.DataFrame({
+        'price': np.round(10 ** rng.uniform(-4, 5, rows), 6),
+        'volume_24h': np.round(10 ** rng.uniform(3, 11, rows), 2),
+        'market_cap': np.round(10 ** rng.uniform(6, 12, rows)),
+        'price_change_24h': np.round(rng.normal(0, 5, rows), 2)
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CPU sentiment throughput across batch sizes")
+    parser.add_argument('--texts', type=int, default=1024)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64, 128])
+    parser.add_argument('--threads', type=int, default=0, help="torch intra-op threads, 0 keeps the default")
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer(num_threads=args.threads)
+    market_data = make_market_data(args.texts, np.random.default_rng(0))
+
+    start = time.perf_counter()
+    texts = analyzer.market_texts(market_data)
+    text_time = time.perf_counter() - start
+    print(f"{args.texts} texts built in {text_time * 1000:.1f}ms, {torch.get_num_threads()} torch threads")
+
+    # Warm up allocator and kernels before timing
+    analyzer.score_texts(texts[:16], batch_size=16)
+
+    baseline = None
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        analyzer.score_texts(texts, batch_size=batch_size)
+        rate = args.texts / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"  batch {batch_size:4d}: {rate:8.1f} texts/s  ({rate / baseline:.1f}x batch {args.batch_sizes[0]})")
+
+if __name__ == "__main__":
+    main()
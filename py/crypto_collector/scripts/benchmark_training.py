@@ -0,0 +1,61 @@
+import os
+import time
+import zlib
+import argparse
+import tempfile
+from functools import partial
+import numpy as np
+import pandas as pd
+from pipeline.training import train_symbols, train_symbol
+from config.settings import TRAINING_RESOLUTION_MINUTES
+
+ROWS = int(os.getenv("BENCHMARK_TRAINING_ROWS", 5000))
+
+def synthetic_history(symbol, since=None, rows=ROWS):
+    """A random walk per symbol, standing in for the database in worker processes"""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    index = pd.date_range('2024-01-01', periods=rows, freq=f'{TRAINING_RESOLUTION_MINUTES}min', name='timestamp')
+    history = pd.DataFrame({'price': np.cumsum(rng.normal(size=rows)) + 1000}, index=index)
+    return history if since is None else history[history.index >= since]
+
+def retrain(rows, new_rows, epochs):
+    """Nightly retraining cost: fine-tuning yesterday's model against refitting from scratch"""
+    with tempfile.TemporaryDirectory() as directory:
+        train_symbol('coin0', partial(synthetic_history, rows=rows), directory, epochs, warm_start=False)
+        for warm_start in (True, False):
+            result = train_symbol(
+                'coin0', partial(synthetic_history, rows=rows + new_rows), directory, epochs, warm_start=warm_start
+            )
+            print(f"  {result['mode']:>9}: {result['seconds']:7.1f}s, {result['epochs']} epochs, "
+                  f"val loss {result['val_loss']:.6f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure multi-symbol training wall-clock time against worker count")
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()])
+    parser.add_argument('--epochs', type=int, default=2)
+    parser.add_argument('--retrain', type=int, default=0, metavar='NEW_ROWS',
+                        help="instead, compare warm-start and full retraining after NEW_ROWS new buckets")
+    args = parser.parse_args()
+
+    if args.retrain:
+        print(f"{ROWS} rows + {args.retrain} new, up to {args.epochs} epochs")
+        retrain(ROWS, args.retrain, args.epochs)
+        return
+
+    symbols = [f"coin{i}" for i in range(args.symbols)]
+    print(f"{args.symbols} symbols x {ROWS} rows, {args.epochs} epochs, {os.cpu_count()} cores")
+
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            jobs = train_symbols(symbols, workers=workers, threads=1, directory=directory,
+                                 loader=synthetic_history, epochs=args.epochs)
+            elapsed = time.perf_counter() - start
+        done = sum(job['status'] == 'done' for job in jobs.values())
+        baseline = baseline or elapsed
+        print(f"  {workers:3d} workers: {elapsed:7.1f}s  ({baseline / elapsed:.1f}x, {done}/{args.symbols} done)")
+
+if __name__ == "__main__":
+    main()
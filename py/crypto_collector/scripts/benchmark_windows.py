@@ -0,0 +1,57 @@
+import time
+import resource
+import argparse
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+def legacy_windows(predictor, data):
+    """The previous prepare_data: one copied slice per window"""
+    scaled_data = predictor.scaler.fit_transform(data)
+    X, y = [], []
+    for i in range(predictor.sequence_length, len(scaled_data)):
+        X.append(scaled_data[i-predictor.sequence_length:i])
+        y.append(scaled_data[i, 0])
+    return np.array(X), np.array(y)
+
+def measure(method, rows):
+    """Prep time and peak RSS growth in a fresh process, so runs don't share a high-water mark"""
+    from models.price_predictor import PricePredictor
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({'price': np.cumsum(rng.normal(size=rows)) + 1000})
+    predictor = PricePredictor()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if method == 'loop':
+        X, y = legacy_windows(predictor, data)
+    elif method == 'view':
+        X, y = predictor.prepare_data(data, validation_split=0.2)
+    else:
+        # Build the pipelines and stream one epoch through them, as fit would
+        train, validation, _ = predictor.datasets(data, validation_split=0.2, batch_size=32)
+        for dataset in (train, validation):
+            for _ in dataset:
+                pass
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, (peak - baseline) / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PricePredictor window generation time and memory")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--methods', nargs='+', default=['loop', 'view', 'dataset'])
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{'rows':>10} {'method':>8} {'time':>10} {'peak RSS':>12}")
+    for rows in args.rows:
+        for method in args.methods:
+            with context.Pool(1) as pool:
+                elapsed, peak_mib = pool.apply(measure, (method, rows))
+            print(f"{rows:>10} {method:>8} {elapsed:>9.3f}s {peak_mib:>9.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import sys
+import time
+import argparse
+import numpy as np
+from models.sentiment_analyzer import SentimentAnalyzer
+from models.model_registry import get_sentiment_model
+from scripts.benchmark_sentiment import make_market_data
+from config.settings import SENTIMENT_MODEL, SENTIMENT_PARITY_MIN_AGREEMENT
+
+def latencies(analyzer, market_data, calls, rows, rng):
+    """analyze_market_data latency over calls on random row subsets, as the pipeline would see it"""
+    samples = []
+    for _ in range(calls):
+        subset = market_data.iloc[rng.choice(len(market_data), rows, replace=False)]
+        start = time.perf_counter()
+        analyzer.analyze_market_data(subset)
+        samples.append(time.perf_counter() - start)
+    return np.percentile(samples, 50) * 1000, np.percentile(samples, 99) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Check quantized/ONNX sentiment backends against the FP32 model")
+    parser.add_argument('--backends', nargs='+', default=['int8', 'onnx'])
+    parser.add_argument('--texts', type=int, default=1000)
+    parser.add_argument('--calls', type=int, default=50, help="analyze_market_data calls for latency percentiles")
+    parser.add_argument('--rows', type=int, default=100, help="market rows per call")
+    args = parser.parse_args()
+
+    market_data = make_market_data(args.texts, np.random.default_rng(0))
+    texts = SentimentAnalyzer.market_texts(market_data)
+
+    reference = SentimentAnalyzer(backend='torch', cache_size=0)
+    expected = reference.score_texts(texts)
+    print(f"torch: loaded in {get_sentiment_model(SENTIMENT_MODEL, 'torch').load_seconds:.2f}s")
+
+    failed = False
+    for backend in ['torch'] + args.backends:
+        try:
+            uncached = SentimentAnalyzer(backend=backend, cache_size=0)
+            scores = uncached.score_texts(texts)
+        except Exception as e:
+            print(f"{backend}: unavailable ({e})")
+            continue
+
+        agreement = float(np.mean(scores.argmax(axis=1) == expected.argmax(axis=1)))
+        max_diff = float(np.abs(scores - expected).max())
+        p50, p99 = latencies(uncached, market_data, args.calls, args.rows, np.random.default_rng(1))
+        cached_p50, cached_p99 = latencies(SentimentAnalyzer(backend=backend), market_data, args.calls, args.rows, np.random.default_rng(1))
+
+        ok = agreement >= SENTIMENT_PARITY_MIN_AGREEMENT
+        failed = failed or not ok
+        print(
+            f"{backend}: load {get_sentiment_model(SENTIMENT_MODEL, backend).load_seconds:.2f}s, "
+            f"label agreement {agreement:.1%}, max prob diff {max_diff:.4f} {'ok' if ok else 'BELOW THRESHOLD'}\n"
+            f"  analyze_market_data p50 {p50:.1f}ms p99 {p99:.1f}ms, with cache p50 {cached_p50:.1f}ms p99 {cached_p99:.1f}ms"
+        )
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import json
+import time
+import asyncio
+import argparse
+import websockets
+from config.settings import STREAM_URL
+
+async def record(url, path, duration):
+    """Save raw feed messages with their arrival offsets as JSON lines"""
+    start = time.monotonic()
+    count = 0
+    with open(path, 'w') as f:
+        async with websockets.connect(url) as websocket:
+            while time.monotonic() - start < duration:
+                try:
+                    raw = await asyncio.wait_for(websocket.recv(), duration - (time.monotonic() - start))
+                except asyncio.TimeoutError:
+                    break
+                f.write(json.dumps({'t': time.monotonic() - start, 'message': raw}) + '\n')
+                count += 1
+    print(f"Recorded {count} messages to {path}")
+
+def load(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+async def replay(path, host, port, speed, loop_forever):
+    """Serve recorded messages to every client, keeping their original spacing scaled by `speed`"""
+    messages = load(path)
+
+    async def handler(websocket):
+        while True:
+            start = time.monotonic()
+            for message in messages:
+                if speed > 0:
+                    delay = message['t'] / speed - (time.monotonic() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await websocket.send(message['message'])
+            if not loop_forever:
+                break
+
+    async with websockets.serve(handler, host, port):
+        print(f"Replaying {len(messages)} messages on ws://{host}:{port} at {speed}x")
+        await asyncio.Future()
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a ticker feed or replay it from a local WebSocket server")
+    parser.add_argument('path', help="JSON lines file of recorded messages")
+    parser.add_argument('--record', action='store_true', help="record from --url instead of replaying")
+    parser.add_argument('--url', default=STREAM_URL)
+    parser.add_argument('--duration', type=float, default=60, help="seconds to record")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed factor, 0 sends as fast as possible")
+    parser.add_argument('--loop', action='store_true', help="restart the recording when it ends")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.url, args.path, args.duration))
+    else:
+        asyncio.run(replay(args.path, args.host, args.port, args.speed, args.loop))
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,28 @@
-import pandas as pd
+import argparse
+import threading
+from functools import partial
 from models.price_predictor import PricePredictor
 from models.sentiment_analyzer import SentimentAnalyzer
+from models.model_registry import get_sentiment_model
 from models.pattern_recognizer import PatternRecognizer
 from database.db_handler import DatabaseHandler
+from pipeline.training import train_symbols, train_symbol, read_history, symbol_dir
+from config.settings import SENTIMENT_MODEL, SENTIMENT_BACKEND
 
-def train_price_predictor(db_handler: DatabaseHandler, symbol: str):
-    """Train price prediction model for a specific cryptocurrency"""
-    # Get historical data
-    historical_data = db_handler.get_historical_data(
-        symbol=symbol,
-        start_date=pd.Timestamp.now() - pd.Timedelta(days=365),
-        end_date=pd.Timestamp.now()
-    )
+def train_price_predictor(db_handler: DatabaseHandler, symbol: str, warm_start: bool = True):
+    """Train price prediction model for a specific cryptocurrency, fine-tuning the previous one when possible"""
+    result = train_symbol(symbol, loader=partial(read_history, db_handler), warm_start=warm_start)
+    predictor = PricePredictor.load(symbol_dir(symbol))
     
-    # Prepare training data
-    price_data = pd.DataFrame(historical_data['prices'])
-    
-    # Initialize and train model
-    predictor = PricePredictor()
-    history = predictor.train(price_data)
-    
-    return predictor, history
+    return predictor, result
 
-def analyze_market_sentiment(db_handler: DatabaseHandler):
+def analyze_market_sentiment(db_handler: DatabaseHandler, analyzer: SentimentAnalyzer = None):
     """Analyze market sentiment using recent data"""
     # Get recent market data
     recent_data = db_handler.get_latest_market_data()
     
-    # Initialize sentiment analyzer
-    analyzer = SentimentAnalyzer()
+    # Analyzers share the registry's model, so a new one does not reload it
+    analyzer = analyzer or SentimentAnalyzer()
     
     # Analyze sentiment
     sentiment = analyzer.analyze_market_data(recent_data)
@@ -50,25 +44,41 @@ def identify_patterns(db_handler: DatabaseHandler, symbol: str):
     return patterns, clusters
 
 def main():
+    parser = argparse.ArgumentParser(description="Train price models for the supported coins and report sentiment and patterns")
+    parser.add_argument('--symbols', nargs='+', help="defaults to every supported coin with collected info")
+    parser.add_argument('--workers', type=int, default=None, help="parallel symbol jobs")
+    parser.add_argument('--threads', type=int, default=None, help="TensorFlow threads per job")
+    parser.add_argument('--full', action='store_true', help="refit from scratch instead of fine-tuning previous models")
+    parser.add_argument('--force', action='store_true', help="start a new run instead of resuming an interrupted one")
+    args = parser.parse_args()
+
     db_handler = DatabaseHandler()
-    
-    # Train models for each supported cryptocurrency
-    for symbol in ['BTC', 'ETH', 'BNB']:
-        print(f"Training model for {symbol}...")
-        predictor, history = train_price_predictor(db_handler, symbol)
-        print(f"Training completed. Final loss: {history.history['loss'][-1]}")
-        
-        # Save model
-        predictor.model.save(f'models/{symbol}_model.h5')
+    symbols = args.symbols or db_handler.get_coin_symbols()
+    if not symbols:
+        raise Exception("No coin info collected yet; run the collector first or pass --symbols")
+
+    # Load the sentiment model while the training processes run rather than after them
+    preload = threading.Thread(target=get_sentiment_model, args=(SENTIMENT_MODEL, SENTIMENT_BACKEND), daemon=True)
+    preload.start()
+
+    # Train models for each supported cryptocurrency, in parallel and resumably
+    options = {name: value for name, value in (('workers', args.workers), ('threads', args.threads)) if value}
+    jobs = train_symbols(symbols, warm_start=not args.full, force=args.force, **options)
+    failed = [symbol for symbol in symbols if jobs.get(symbol, {}).get('status') != 'done']
+    if failed:
+        print(f"Training failed for: {', '.join(failed)}")
         
     # Analyze market sentiment
     print("Analyzing market sentiment...")
-    sentiment = analyze_market_sentiment(db_handler)
+    preload.join()
+    model = get_sentiment_model(SENTIMENT_MODEL, SENTIMENT_BACKEND)
+    print(f"Sentiment model ({model.backend}) loaded in {model.load_seconds:.2f}s alongside training")
+    sentiment = analyze_market_sentiment(db_handler, SentimentAnalyzer(backend=SENTIMENT_BACKEND))
     print("Overall market sentiment:", sentiment)
     
     # Identify patterns
     print("Identifying patterns...")
-    for symbol in ['BTC', 'ETH', 'BNB']:
+    for symbol in symbols:
         patterns, clusters = identify_patterns(db_handler, symbol)
         print(f"\nPatterns found for {symbol}:", patterns)
         print(f"Price movement clusters for {symbol}:", clusters)
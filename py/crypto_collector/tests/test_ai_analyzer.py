@@ -0,0 +1,133 @@
+import re
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+import pandas as pd
+from analyzers import ai_analyzer
+from analyzers.ai_analyzer import AIAnalyzer
+
+class StubOpenAI(ThreadingHTTPServer):
+    """Chat completions endpoint answering packed prompts with one section per coin"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.requests = []
+        self.rate_limits = []  # Retry-After values of the next responses, sent as 429s
+        self.skip = set()  # Symbols left out of packed answers
+        self.lock = threading.Lock()
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][-1]['content']
+        with self.server.lock:
+            self.server.requests.append(prompt)
+            retry_after = self.server.rate_limits.pop(0) if self.server.rate_limits else None
+
+        if retry_after is not None:
+            self.reply(429, {'error': {'message': 'rate limited', 'type': 'rate_limit'}}, {'Retry-After': retry_after})
+            return
+
+        symbols = re.findall(r"^### (\S+)$", prompt, flags=re.MULTILINE)
+        if symbols:
+            content = "\n\n".join(f"### {symbol}\nOutlook for {symbol}" for symbol in symbols if symbol not in self.server.skip)
+        else:
+            content = "Single-coin outlook"
+        self.reply(200, {
+            'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+        })
+
+    def reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(ai_analyzer, 'OPENAI_API_KEY', 'test-key')
+    server = StubOpenAI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    analyzer = AIAnalyzer(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+    yield server, analyzer
+    analyzer.close()
+    server.shutdown()
+    server.server_close()
+
+def coins(*symbols):
+    return [
+        ({'symbol': symbol, 'price': 100.0 + i, 'market_cap': 1e9, 'volume_24h': 1e7}, {'rsi': 50.0, 'macd': 0.1})
+        for i, symbol in enumerate(symbols)
+    ]
+
+def test_packed_sections_are_split_per_coin(stub):
+    server, analyzer = stub
+    results = analyzer.analyze_market_data_batch(coins('btc', 'eth', 'sol', 'ada', 'xrp', 'dot', 'bnb'), coins_per_prompt=5)
+
+    assert [result['coin'] for result in results] == ['btc', 'eth', 'sol', 'ada', 'xrp', 'dot', 'bnb']
+    assert [result['analysis'] for result in results] == [
+        f"Outlook for {symbol.upper()}" for symbol in ('btc', 'eth', 'sol', 'ada', 'xrp', 'dot', 'bnb')
+    ]
+    assert len(server.requests) == 2
+
+    # A second tick reuses the client (and its loop) and is served from the cache
+    client = analyzer.async_client
+    analyzer.analyze_market_data_batch(coins('btc', 'eth'))
+    assert analyzer.async_client is client
+    assert len(server.requests) == 2
+
+def test_missing_section_is_retried_alone(stub):
+    server, analyzer = stub
+    server.skip = {'ETH'}
+    results = analyzer.analyze_market_data_batch(coins('btc', 'eth', 'sol'), coins_per_prompt=3)
+
+    assert [result['analysis'] for result in results] == ["Outlook for BTC", "Single-coin outlook", "Outlook for SOL"]
+    assert len(server.requests) == 2
+    assert '###' not in server.requests[1]
+
+def test_rate_limit_honors_retry_after(stub):
+    server, analyzer = stub
+    server.rate_limits = ['0.3']
+    start = time.perf_counter()
+    results = analyzer.analyze_market_data_batch(coins('btc', 'eth'), coins_per_prompt=2)
+
+    assert time.perf_counter() - start >= 0.3
+    assert [result['analysis'] for result in results] == ["Outlook for BTC", "Outlook for ETH"]
+    assert len(server.requests) == 2
+
+def test_retry_after_is_capped(stub, monkeypatch):
+    server, analyzer = stub
+    monkeypatch.setattr(ai_analyzer, 'AI_MAX_RETRY_AFTER', 0.1)
+    server.rate_limits = ['3600']
+    start = time.perf_counter()
+    results = analyzer.analyze_market_data_batch(coins('btc'))
+
+    assert time.perf_counter() - start < 5
+    assert results[0]['analysis'] == "Single-coin outlook"
+
+def test_report_and_prediction_hit_cache_across_ticks(stub):
+    server, analyzer = stub
+
+    for tick in range(2):
+        now = pd.Timestamp('2024-01-01 00:00') + pd.Timedelta(minutes=5 * tick)
+        analyses = [{'coin': 'btc', 'analysis': 'Outlook for BTC', 'timestamp': now}]
+        history = {'btc': [{'timestamp': now, 'price': 42000.0 + tick}]}
+        indicators = pd.DataFrame({'symbol': ['btc'], 'price': [42000.0 + tick], 'timestamp': [now],
+                                   'rsi': [55.2], 'macd': [0.101]})
+        analyzer.generate_market_report(analyses)
+        analyzer.predict_price_movement(history, indicators)
+
+    # The second tick only differs in timestamps and sub-quantum price moves
+    assert len(server.requests) == 2
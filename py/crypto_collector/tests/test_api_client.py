@@ -0,0 +1,120 @@
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from utils import api_client
+from utils.api_client import APIClient, TokenBucket
+
+class StubAPI(ThreadingHTTPServer):
+    """Market API answering with an ETag and scripted failures"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.hits = []
+        self.failures = []  # Status codes of the next responses, e.g. 500 or 429
+        self.delay = 0.0
+        self.etag = '"v1"'
+        self.lock = threading.Lock()
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits.append(self.headers.get('If-None-Match'))
+            status = self.server.failures.pop(0) if self.server.failures else None
+        time.sleep(self.server.delay)
+
+        if status is not None:
+            self.send_response(status)
+            if status == 429:
+                self.send_header('Retry-After', '0.2')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if self.headers.get('If-None-Match') == self.server.etag:
+            self.send_response(304)
+            self.send_header('ETag', self.server.etag)
+            self.end_headers()
+            return
+
+        data = json.dumps([{'id': 'bitcoin', 'current_price': 42000.0}]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', self.server.etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def stub():
+    server = StubAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = APIClient(base_url=f"http://127.0.0.1:{server.server_address[1]}", api_key=None,
+                       rate_per_minute=6000, max_retries=3)
+    yield server, client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+def test_token_bucket_spaces_out_requests():
+    bucket = TokenBucket(rate_per_minute=600, burst=2)
+    start = time.perf_counter()
+    for _ in range(5):
+        bucket.acquire()
+    # Two from the burst, then one every 0.1s
+    assert time.perf_counter() - start >= 0.25
+
+def test_unchanged_resource_is_served_from_etag(stub):
+    server, client = stub
+    first = client.get_prices()
+    second = client.get_prices()
+
+    assert first == second == [{'id': 'bitcoin', 'current_price': 42000.0}]
+    assert server.hits == [None, '"v1"']
+    assert client.stats['not_modified'] == 1
+
+    server.etag = '"v2"'
+    client.get_prices()
+    assert client.stats['not_modified'] == 1
+
+def test_concurrent_identical_requests_are_coalesced(stub):
+    server, client = stub
+    server.delay = 0.3
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_prices())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8
+    assert len(server.hits) == 1
+    assert client.stats['coalesced'] == 7
+    assert client.stats['requests'] == 1
+
+def test_server_errors_are_retried_with_backoff(stub, monkeypatch):
+    server, client = stub
+    monkeypatch.setattr(api_client, 'API_BACKOFF_BASE', 0.01)
+    server.failures = [500, 503]
+
+    assert client.get_prices() == [{'id': 'bitcoin', 'current_price': 42000.0}]
+    assert client.stats['retries'] == 2
+    assert client.stats['requests'] == 3
+
+def test_rate_limit_pauses_and_gives_up_after_max_retries(stub):
+    server, client = stub
+    server.failures = [429]
+    start = time.perf_counter()
+    client.get_prices()
+    assert time.perf_counter() - start >= 0.2
+    assert client.stats['rate_limited'] == 1
+
+    server.failures = [500] * 4
+    client.max_retries = 0
+    with pytest.raises(Exception):
+        client.get_coin_info('bitcoin')
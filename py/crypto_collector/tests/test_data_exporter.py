@@ -0,0 +1,37 @@
+import os
+import time
+import pytest
+import pandas as pd
+from exporters.data_exporter import DataExporter
+
+def test_restarted_period_does_not_overwrite_split_exports(tmp_path):
+    exporter = DataExporter(formats=['csv', 'json'], compression='gzip',
+                            schedules={'csv': 'hourly', 'json': 'hourly'}, path=str(tmp_path))
+    state = {'period': '20240101_10', 'frames': {
+        'prices': [pd.DataFrame({'price': [1.0]})],
+        'markets': [pd.DataFrame({'volume_24h': [2.0]})]
+    }}
+
+    first = exporter._write_period('hourly', state)
+    # As after a restart inside the same hour
+    second = exporter._write_period('hourly', state)
+    exporter.close()
+
+    assert first['csv'][0].endswith('hourly_20240101_10_prices.csv.gz')
+    assert not set(first['csv'] + first['json']) & set(second['csv'] + second['json'])
+    assert os.listdir(tmp_path) == ['2024-01-01']
+    assert len(os.listdir(tmp_path / '2024-01-01')) == 8
+
+def test_flush_timeout_is_one_deadline(tmp_path):
+    exporter = DataExporter(formats=['csv'], max_workers=1, path=str(tmp_path))
+    for _ in range(3):
+        exporter._track(exporter.executor.submit(time.sleep, 0.3), "sleep")
+
+    # Each job finishes within the timeout on its own, all three together do not
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        exporter.flush(timeout=0.5)
+    assert time.perf_counter() - start < 0.7
+
+    exporter.flush(timeout=5)
+    exporter.close()
@@ -0,0 +1,76 @@
+import socket
+import pytest
+from alerts.delivery import AlertSink, SMTPSink, SinkWorker
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+class Handler:
+    """Records delivered messages; replies with queued rejections first"""
+
+    def __init__(self):
+        self.messages = []
+        self.rejections = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.rejections:
+            return self.rejections.pop(0)
+        self.messages.append(envelope.content.decode())
+        return '250 OK'
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def smtp():
+    handler = Handler()
+    controller = controller_module.Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    sink = SMTPSink(f"127.0.0.1:{controller.port}", 'collector@example.com', 'ops@example.com', timeout=5)
+    yield handler, sink
+    sink.close()
+    controller.stop()
+
+def alert(symbol):
+    return {'type': 'price_change', 'symbol': symbol, 'message': f"{symbol} moved"}
+
+def test_sink_requires_send():
+    with pytest.raises(TypeError):
+        AlertSink()
+
+def test_reconnects_after_server_drops_connection(smtp):
+    handler, sink = smtp
+    sink.send([alert('btc'), alert('eth')])
+    assert 'Crypto Alerts: 2 alerts' in handler.messages[0]
+
+    # The server ends the idle session; the next digest reconnects once
+    first = sink.server
+    first.docmd('QUIT')
+    sink.send([alert('sol')])
+    assert sink.server is not first
+    assert len(handler.messages) == 2
+
+def test_permanent_rejection_is_not_retried(smtp):
+    handler, sink = smtp
+    handler.rejections = ['550 mailbox unavailable'] * 3
+    worker = SinkWorker(sink, digest_window=0, max_retries=2, backoff_base=0.01)
+    worker.put(alert('btc'))
+
+    assert worker.flush(timeout=5)
+    assert worker.stats['failed'] == 1
+    assert worker.stats['retries'] == 0
+    assert handler.messages == []
+    worker.close()
+
+def test_transient_rejection_is_retried(smtp):
+    handler, sink = smtp
+    handler.rejections = ['451 try again later']
+    worker = SinkWorker(sink, digest_window=0, max_retries=2, backoff_base=0.01)
+    worker.put(alert('btc'))
+
+    assert worker.flush(timeout=5)
+    assert worker.stats['retries'] == 1
+    assert worker.stats['delivered'] == 1
+    assert len(handler.messages) == 1
+    worker.close()
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from analyzers.market_analyzer import MarketAnalyzer
+from analyzers.incremental_indicators import IncrementalIndicators
+from analyzers.indicator_engine import compute_indicators
+from pipeline.runtime import PipelineRuntime
+from config.settings import INDICATOR_SEED_SAMPLES
+
+def test_signals_are_generated_per_symbol():
+    state = IncrementalIndicators()
+    rising = np.linspace(100, 200, 60)
+    falling = np.linspace(200, 100, 60)
+    for up, down in zip(rising, falling):
+        analyzer = MarketAnalyzer(pd.DataFrame({'symbol': ['up', 'down'], 'price': [up, down]}), incremental=state)
+        analyzer.calculate_technical_indicators()
+
+    signals = {(signal['symbol'], signal['indicator']): signal['signal'] for signal in analyzer.generate_signals()}
+    assert signals == {
+        ('up', 'MACD'): 'BUY', ('up', 'RSI'): 'OVERBOUGHT',
+        ('down', 'MACD'): 'SELL', ('down', 'RSI'): 'OVERSOLD'
+    }
+
+def random_panel(symbols, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    panel = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(symbols, samples)), axis=1))
+    # Symbols listed later have shorter histories
+    for row in range(symbols):
+        panel[row, :row * 20] = np.nan
+    return panel
+
+def test_seeded_state_matches_indicator_engine():
+    panel = random_panel(5, 200)
+    symbols = [f"coin{i}" for i in range(5)]
+    state = IncrementalIndicators.from_history(symbols, panel)
+
+    expected = compute_indicators(panel)
+    latest = state.latest(symbols)
+    for name, values in expected.items():
+        np.testing.assert_allclose(latest[name], values[:, -1], rtol=1e-8, atol=1e-8, err_msg=name)
+
+class HistoryDB:
+    """The reads restore_indicators makes, over an in-memory panel"""
+
+    def __init__(self, symbols, panel):
+        self.history = {symbol: row[~np.isnan(row)] for symbol, row in zip(symbols, panel)}
+
+    def load_indicator_state(self):
+        return None
+
+    def get_latest_prices(self):
+        return {symbol: {'price': prices[-1]} for symbol, prices in self.history.items()}
+
+    def get_historical_columns(self, symbol, start_date, end_date, fields, resolution=None):
+        prices = self.history[symbol]
+        return {'timestamp': np.arange(len(prices)), 'price': prices}
+
+def test_restart_without_checkpoint_seeds_from_history():
+    panel = random_panel(3, 250)
+    symbols = ['btc', 'eth', 'sol']
+    runtime = PipelineRuntime.__new__(PipelineRuntime)
+    runtime.db = HistoryDB(symbols, panel)
+    runtime.indicators = IncrementalIndicators()
+    runtime.restore_indicators()
+
+    latest = runtime.indicators.latest(symbols)
+    assert not np.isnan(latest['rsi']).any()
+    assert not np.isnan(latest['macd_signal']).any()
+    # Only the last INDICATOR_SEED_SAMPLES ticks are replayed
+    expected = compute_indicators(panel[:, -INDICATOR_SEED_SAMPLES:])
+    np.testing.assert_allclose(latest['rsi'], expected['rsi'][:, -1], rtol=1e-8)
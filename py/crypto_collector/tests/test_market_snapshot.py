@@ -0,0 +1,41 @@
+from collectors.market_snapshot import MarketSnapshotFetcher
+from collectors.price_collector import PriceCollector
+from database.db_handler import DatabaseHandler
+
+class FlakyAPI:
+    """Serves numbered market pages; pages listed in `failing` raise"""
+
+    def __init__(self):
+        self.failing = set()
+        self.tick = 0
+
+    def get_prices(self, per_page, page):
+        if page in self.failing:
+            raise Exception(f"page {page} timed out")
+        return [
+            {'id': f'coin{page}{i}', 'symbol': f'c{page}{i}', 'current_price': 100.0 + self.tick,
+             'last_updated': f'2024-01-01T00:0{self.tick}:00.000Z'}
+            for i in range(per_page)
+        ]
+
+def test_stale_page_rows_are_not_stored_again():
+    api = FlakyAPI()
+    fetcher = MarketSnapshotFetcher(api, universe_size=4, page_size=2, max_workers=2)
+    collector = PriceCollector(api, fetcher)
+    handler = DatabaseHandler.__new__(DatabaseHandler)
+
+    first = collector.collect()
+    assert not first.stale.any()
+    assert len(handler._time_series_documents(first)) == 4
+
+    # Page 2 fails: its cached rows stay in the snapshot, marked stale
+    api.tick, api.failing = 1, {2}
+    second = collector.collect()
+    assert second['symbol'].tolist() == ['c10', 'c11', 'c20', 'c21']
+    assert second.stale.tolist() == [False, False, True, True]
+    assert fetcher.freshness[2]['status'] == 'stale'
+
+    documents = handler._time_series_documents(second)
+    assert [document['symbol'] for document in documents] == ['c10', 'c11']
+    assert len(second.fresh()) == 2
+    fetcher.close()
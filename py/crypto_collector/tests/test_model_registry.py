@@ -0,0 +1,54 @@
+import time
+import threading
+import pytest
+
+model_registry = pytest.importorskip("models.model_registry")
+
+@pytest.fixture
+def slow_load(monkeypatch):
+    loads = []
+
+    def load(name, backend):
+        loads.append((name, backend))
+        time.sleep(0.2)
+        if backend == 'broken':
+            raise Exception("load failed")
+        return (name, backend)
+
+    monkeypatch.setattr(model_registry, '_load', load)
+    model_registry.unload_sentiment_models()
+    yield loads
+    model_registry.unload_sentiment_models()
+
+def run_all(calls):
+    results = [None] * len(calls)
+
+    def call(index, args):
+        try:
+            results[index] = model_registry.get_sentiment_model(*args)
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=call, args=(i, args)) for i, args in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_same_model_loads_once(slow_load):
+    results = run_all([('m', 'torch')] * 4)
+    assert slow_load == [('m', 'torch')]
+    assert results == [('m', 'torch')] * 4
+
+def test_different_models_load_concurrently(slow_load):
+    start = time.perf_counter()
+    run_all([('m', 'torch'), ('m', 'int8'), ('m', 'onnx')])
+    assert time.perf_counter() - start < 0.5
+
+def test_failed_load_is_retried(slow_load):
+    results = run_all([('m', 'broken')] * 2)
+    assert all(isinstance(result, Exception) for result in results)
+    with pytest.raises(Exception):
+        model_registry.get_sentiment_model('m', 'broken')
+    assert len(slow_load) == 2
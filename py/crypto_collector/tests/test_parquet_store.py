@@ -0,0 +1,48 @@
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+from exporters.parquet_store import ParquetStore, read_range
+
+def tick(minute, symbols):
+    timestamp = pd.Timestamp('2024-01-01 10:00') + pd.Timedelta(minutes=minute)
+    return pd.DataFrame({
+        'symbol': symbols,
+        'price': [float(i + minute) for i in range(len(symbols))],
+        'timestamp': [timestamp] * len(symbols)
+    })
+
+def test_flush_writes_one_file_per_day_sorted_by_symbol(tmp_path):
+    store = ParquetStore(str(tmp_path), flush_seconds=0, row_group_size=50)
+    symbols = [f"c{i:03d}" for i in range(300)][::-1]
+    for minute in (0, 5):
+        store.append(tick(minute, symbols), 'prices')
+
+    directory = tmp_path / 'prices' / 'date=2024-01-01'
+    parts = sorted(os.listdir(directory))
+    assert len(parts) == 2
+
+    metadata = pq.ParquetFile(directory / parts[0]).metadata
+    column = metadata.schema.names.index('symbol')
+    ranges = [
+        (metadata.row_group(i).column(column).statistics.min, metadata.row_group(i).column(column).statistics.max)
+        for i in range(metadata.num_row_groups)
+    ]
+    assert ranges[0] == ('c000', 'c049')
+    assert ranges == sorted(ranges)
+
+    frame = read_range('prices', symbols=['c007', 'c250'], root=str(tmp_path))
+    assert sorted(frame['symbol'].unique()) == ['c007', 'c250']
+    assert len(frame) == 4
+    assert set(frame['date']) == {'2024-01-01'}
+
+def test_compaction_keeps_symbol_order(tmp_path):
+    store = ParquetStore(str(tmp_path), flush_seconds=0)
+    for minute in range(0, 40, 5):
+        store.append(tick(minute, ['eth', 'btc']), 'prices')
+    assert store.compact(min_files=8) == 1
+
+    directory = tmp_path / 'prices' / 'date=2024-01-01'
+    [part] = os.listdir(directory)
+    table = pq.read_table(directory / part)
+    assert table['symbol'].to_pylist() == ['btc'] * 8 + ['eth'] * 8
+    assert table['timestamp'].to_pylist() == sorted(table['timestamp'].to_pylist()[:8]) * 2
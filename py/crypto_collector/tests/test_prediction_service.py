@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from sklearn.preprocessing import MinMaxScaler
+from models.price_predictor import PricePredictor
+from models.prediction_service import PredictionService
+from pipeline.runtime import PipelineRuntime
+from pipeline.training import symbol_dir, saved_symbols
+
+SEQUENCE_LENGTH = 12
+SYMBOLS = ['btc', 'eth', 'sol']
+
+@pytest.fixture
+def saved_models(tmp_path):
+    """Untrained models with their own random weights and price ranges, saved like train_symbol does"""
+    rng = np.random.default_rng(7)
+    windows = {}
+    for symbol in SYMBOLS:
+        predictor = PricePredictor(SEQUENCE_LENGTH)
+        prices = np.cumsum(rng.normal(size=SEQUENCE_LENGTH * 4)) + rng.uniform(10, 1000)
+        predictor.scaler = MinMaxScaler().fit(prices.reshape(-1, 1))
+        predictor.model = predictor.create_model((SEQUENCE_LENGTH, 1))
+        predictor.save(symbol_dir(symbol, str(tmp_path)))
+        windows[symbol] = prices.reshape(-1, 1)
+    return str(tmp_path), windows
+
+def keras_predict(directory, symbol, window):
+    """Reference: the saved Keras model's own predict on the scaled last window"""
+    predictor = PricePredictor.load(symbol_dir(symbol, directory))
+    scaled = predictor.scaler.transform(window[-SEQUENCE_LENGTH:])
+    output = predictor.model.predict(scaled[None], verbose=0)
+    return float(predictor.scaler.inverse_transform(output)[0, 0])
+
+def test_batched_forward_matches_keras(saved_models):
+    directory, windows = saved_models
+    service = PredictionService(saved_symbols(directory), directory=directory)
+    try:
+        batched = service.predict_batch(windows)
+        queued = {symbol: service.predict(symbol, windows[symbol], timeout=30) for symbol in SYMBOLS}
+    finally:
+        service.close()
+
+    for symbol in SYMBOLS:
+        expected = keras_predict(directory, symbol, windows[symbol])
+        assert batched[symbol] == pytest.approx(expected, rel=1e-4)
+        assert queued[symbol] == pytest.approx(expected, rel=1e-4)
+    assert len({round(value, 3) for value in batched.values()}) == len(SYMBOLS)
+    assert service.stats['batches'] >= 1
+
+class HistoryDB:
+    def __init__(self, windows):
+        self.windows = windows
+        self.reads = 0
+
+    def get_historical_columns(self, symbol, start_date, end_date, fields, resolution):
+        self.reads += 1
+        return {'price': self.windows[symbol][:, 0]}
+
+def test_runtime_forecasts_once_per_bar(saved_models):
+    directory, windows = saved_models
+    runtime = PipelineRuntime.__new__(PipelineRuntime)
+    runtime.db = HistoryDB(windows)
+    runtime._forecast_bar = None
+    runtime.prediction_service = runtime.load_prediction_service(directory)
+    try:
+        now = datetime(2024, 1, 1, 10, 5)
+        forecasts = runtime.forecast_prices(['btc', 'eth', 'doge'], now=now)
+        assert [forecast['symbol'] for forecast in forecasts] == ['btc', 'eth']
+        assert forecasts[0]['predicted_price'] == pytest.approx(keras_predict(directory, 'btc', windows['btc']), rel=1e-4)
+
+        # Later ticks in the same hourly bar reuse nothing and read nothing
+        assert runtime.forecast_prices(['btc', 'eth'], now=now + timedelta(minutes=50)) == []
+        assert runtime.db.reads == 2
+        assert len(runtime.forecast_prices(['btc'], now=now + timedelta(minutes=55))) == 1
+    finally:
+        runtime.prediction_service.close()
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+import mongomock
+from database import rollups
+
+def record_rollups(monkeypatch):
+    calls = []
+    monkeypatch.setattr(rollups, 'rollup', lambda db, collection, suffix, since: calls.append((collection, suffix, since)))
+    return calls
+
+def test_first_run_covers_all_raw_samples(monkeypatch):
+    calls = record_rollups(monkeypatch)
+    rollups.run_rollups(mongomock.MongoClient().db, now=datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc))
+    assert {since for _, _, since in calls} == {None}
+
+def test_downtime_is_backfilled_from_watermark(monkeypatch):
+    db = mongomock.MongoClient().db
+    calls = record_rollups(monkeypatch)
+    rollups.run_rollups(db, now=datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc))
+
+    # Down for five days: the next run reaches back to the last one, not just the lookback
+    calls.clear()
+    rollups.run_rollups(db, now=datetime(2024, 1, 15, 9, 0, tzinfo=timezone.utc))
+    since = {suffix: since for _, suffix, since in calls}
+    assert since['1h'] == datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc)
+    assert since['1d'] == datetime(2024, 1, 10, tzinfo=timezone.utc)
+
+def test_recent_run_keeps_lookback(monkeypatch):
+    db = mongomock.MongoClient().db
+    calls = record_rollups(monkeypatch)
+    rollups.run_rollups(db, now=datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc))
+
+    calls.clear()
+    rollups.run_rollups(db, now=datetime(2024, 1, 10, 13, 30, tzinfo=timezone.utc))
+    since = {suffix: since for _, suffix, since in calls}
+    assert since['1h'] == datetime(2024, 1, 10, 11, 0, tzinfo=timezone.utc)
+    assert since['1d'] == datetime(2024, 1, 8, tzinfo=timezone.utc)
+
+def test_failed_run_keeps_watermark(monkeypatch):
+    db = mongomock.MongoClient().db
+    record_rollups(monkeypatch)
+    rollups.run_rollups(db, now=datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc))
+
+    def fail(*args):
+        raise Exception("merge failed")
+
+    monkeypatch.setattr(rollups, 'rollup', fail)
+    with pytest.raises(Exception):
+        rollups.run_rollups(db, now=datetime(2024, 1, 11, tzinfo=timezone.utc))
+    assert rollups._watermark(db, '1h') == datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc)
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+def test_long_range_reads_daily_rollup():
+    assert rollups.resolve_source('prices', NOW - timedelta(days=365), now=NOW) == 'prices_1d'
+
+def test_default_resolution_scales_with_range():
+    assert rollups.resolve_source('prices', NOW - timedelta(days=7), now=NOW) == 'prices_1h'
+    assert rollups.resolve_source('prices', NOW - timedelta(days=1), now=NOW) == 'prices'
+    # A short window deep in the past still reads hourly buckets where they are kept
+    start = NOW - timedelta(days=100)
+    assert rollups.resolve_source('prices', start, now=NOW, end_date=start + timedelta(days=2)) == 'prices_1h'
+
+def test_explicit_resolution_picks_coarsest_fitting_source():
+    start = NOW - timedelta(days=365)
+    assert rollups.resolve_source('prices', start, timedelta(hours=1), now=NOW) == 'prices_1h'
+    assert rollups.resolve_source('prices', NOW - timedelta(days=3), timedelta(minutes=5), now=NOW) == 'prices'
+    # Raw samples have aged out, so the finest source that still covers the range serves it
+    assert rollups.resolve_source('prices', NOW - timedelta(days=60), timedelta(minutes=5), now=NOW) == 'prices_1h'
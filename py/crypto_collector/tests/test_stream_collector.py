@@ -0,0 +1,85 @@
+import json
+import time
+import socket
+import asyncio
+import threading
+from alerts.alert_system import AlertSystem
+from collectors.stream_collector import StreamCollector
+from scripts import replay_ticks
+
+BAR_START = 1_700_000_100  # A 5-minute boundary, in seconds
+
+class RecordingAlerts(AlertSystem):
+    """Alert system that keeps what it is asked to send"""
+
+    def __init__(self):
+        super().__init__(sinks=[])
+        self.sent = []
+
+    def send_alert(self, alert_data):
+        self.sent.append(alert_data)
+
+def ticker(offset, **prices):
+    return json.dumps([
+        {'e': '24hrMiniTicker', 'E': (BAR_START + offset) * 1000, 's': f"{symbol.upper()}USDT", 'c': str(price)}
+        for symbol, price in prices.items()
+    ])
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def replay(path, port):
+    """Serve a recording with the replay script on a background loop"""
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(replay_ticks.replay(str(path), '127.0.0.1', port, speed=1.0, loop_forever=False))
+
+    def target():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    time.sleep(0.3)
+    return loop, task, thread
+
+def test_replayed_feed_fires_alerts_on_polling_bars(tmp_path):
+    recording = tmp_path / 'ticks.jsonl'
+    messages = [
+        ticker(0, btc=100.0, eth=2000.0),
+        ticker(60, btc=103.0),
+        ticker(120, btc=106.0),
+        ticker(310, eth=2010.0)
+    ]
+    recording.write_text(''.join(
+        json.dumps({'t': 0.1 * i, 'message': message}) + '\n' for i, message in enumerate(messages)
+    ))
+    port = free_port()
+    loop, task, server = replay(recording, port)
+
+    alerts = RecordingAlerts()
+    stream = StreamCollector(alerts, url=f"ws://127.0.0.1:{port}", reconnect_delay=60, bar_seconds=300)
+    stream.set_reference_prices({'btc': 100.0, 'eth': 2000.0})
+    stream.warm_up()
+    try:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and stream.stats['processed'] + stream.stats['coalesced'] < 5:
+            time.sleep(0.05)
+    finally:
+        stream.close()
+        loop.call_soon_threadsafe(task.cancel)
+        server.join()
+
+    assert [(alert['type'], alert['symbol'], round(alert['change'], 2)) for alert in alerts.sent] == [
+        ('PRICE_ALERT', 'btc', 6.0)
+    ]
+    # Five ticks, but only eth has moved past a bar: one indicator sample, its bar's last price
+    assert stream.indicators.symbols == ['eth']
+    assert stream.indicators.count.tolist() == [1]
+    assert stream.indicators.last_price.tolist() == [2000.0]
+    assert stream.bars == {'btc': (BAR_START // 300, 106.0), 'eth': (BAR_START // 300 + 1, 2010.0)}
@@ -0,0 +1,47 @@
+import pytest
+import mongomock
+from database.write_buffer import WriteBehindBuffer
+
+def make_buffer(tmp_path, **options):
+    db = mongomock.MongoClient().db
+    return db, WriteBehindBuffer(db, flush_interval=0.05, spill_path=str(tmp_path / "spill.jsonl"), **options)
+
+def test_invalid_document_does_not_stop_writer(tmp_path):
+    db, buffer = make_buffer(tmp_path)
+    buffer.put('prices', [{'symbol': 'btc'}, {'symbol': 'bad', 'price': object()}, {'symbol': 'eth'}])
+
+    assert buffer.flush(timeout=5)
+    assert buffer.is_alive()
+    assert sorted(db.prices.distinct('symbol')) == ['btc', 'eth']
+    assert buffer.stats['rejected'] == 1
+
+    # Later batches still land
+    buffer.put('prices', [{'symbol': 'sol'}])
+    assert buffer.flush(timeout=5)
+    assert db.prices.count_documents({}) == 3
+    buffer.close()
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_flush_reports_dead_writer(tmp_path):
+    class Stop(BaseException):
+        pass
+
+    db, buffer = make_buffer(tmp_path)
+
+    def die():
+        raise Stop()
+
+    buffer._take_batch = die
+    with buffer.condition:
+        buffer.condition.notify_all()
+    buffer.thread.join(timeout=5)
+    assert not buffer.is_alive()
+
+    # Queued documents can no longer be written, and flush must say so
+    with buffer.condition:
+        buffer.pending.append(('prices', {'symbol': 'btc'}))
+    assert buffer.flush(timeout=1) is False
+
+    # New documents go to the spill file instead of the dead queue
+    buffer.put('prices', [{'symbol': 'eth'}])
+    assert buffer.stats['spilled'] == 1
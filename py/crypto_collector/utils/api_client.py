@@ -0,0 +1,194 @@
+import time
+import random
+import threading
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import (
+    API_KEY, API_KEY_HEADER, API_BASE_URL, TOP_COINS, API_RATE_LIMIT_PER_MINUTE, API_POOL_SIZE,
+    API_TIMEOUT, API_MAX_RETRIES, API_BACKOFF_BASE
+)
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or max(1, rate_per_minute // 6)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for a while, e.g. after the server answered 429"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.updated = self.paused_until
+
+class APIClient:
+    """Pooled, rate-limited HTTP client with conditional requests and request coalescing"""
+
+    def __init__(self, base_url=API_BASE_URL, api_key=API_KEY, rate_per_minute=API_RATE_LIMIT_PER_MINUTE,
+                 pool_size=API_POOL_SIZE, timeout=API_TIMEOUT, max_retries=API_MAX_RETRIES):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = TokenBucket(rate_per_minute)
+
+        # Keep-alive connections shared by every collector
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept'] = 'application/json'
+        if api_key:
+            self.session.headers[API_KEY_HEADER] = api_key
+
+        self.lock = threading.Lock()
+        self.validators = {}
+        self.in_flight = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'coalesced': 0, 'retries': 0, 'rate_limited': 0}
+
+    def get(self, path, params=None):
+        """GET a JSON resource; identical concurrent requests share one round trip"""
+        key = (path, tuple(sorted((params or {}).items())))
+        with self.lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.in_flight[key] = future
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._fetch(path, params, key)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def _count(self, name):
+        """Bump a counter; collectors on several threads share the client"""
+        with self.lock:
+            self.stats[name] += 1
+
+    def _fetch(self, path, params, key):
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+
+            # Conditional request: an unchanged resource costs a 304 and no body
+            headers = {}
+            cached = self.validators.get(key)
+            if cached is not None:
+                if cached['etag']:
+                    headers['If-None-Match'] = cached['etag']
+                if cached['last_modified']:
+                    headers['If-Modified-Since'] = cached['last_modified']
+
+            try:
+                self._count('requests')
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise Exception(f"Request to {path} failed: {e}")
+                self._backoff(attempt)
+                continue
+
+            if response.status_code == 304 and cached is not None:
+                self._count('not_modified')
+                return cached['payload']
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    raise Exception(f"Request to {path} failed with status {response.status_code}")
+                if response.status_code == 429:
+                    self._count('rate_limited')
+                    # Hold every caller back, not just this one
+                    self.limiter.pause(self._retry_after(response, attempt))
+                else:
+                    self._backoff(attempt)
+                continue
+
+            response.raise_for_status()
+            payload = response.json()
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.validators[key] = {'etag': etag, 'last_modified': last_modified, 'payload': payload}
+            return payload
+
+    def _retry_after(self, response, attempt):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return self._backoff_delay(attempt)
+
+    def _backoff_delay(self, attempt):
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, API_BACKOFF_BASE * (2 ** attempt))
+
+    def _backoff(self, attempt):
+        self._count('retries')
+        time.sleep(self._backoff_delay(attempt))
+
+    def get_prices(self, per_page=TOP_COINS, page=1):
+        """Market snapshot of the top coins by market cap"""
+        return self.get('/coins/markets', {
+            'vs_currency': 'usd',
+            'order': 'market_cap_desc',
+            'per_page': per_page,
+            'page': page,
+            'sparkline': 'false'
+        })
+
+    def get_coin_info(self, coin_id):
+        """Descriptive information for a single coin"""
+        return self.get(f'/coins/{coin_id}', {
+            'localization': 'false',
+            'tickers': 'false',
+            'market_data': 'false',
+            'community_data': 'false',
+            'developer_data': 'false'
+        })
+
+    def close(self):
+        self.session.close()
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def get_shared_client():
+    """Process-wide client so every collector shares one pool, rate limit and cache"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = APIClient()
+        return _shared_client